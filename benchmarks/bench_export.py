@@ -0,0 +1,144 @@
+"""
+Benchmark: Exportação CSV/TXT (Escrita Linha a Linha vs. Formatação Vetorizada).
+
+Compara as implementações anteriores de export_to_csv (csv.DictWriter sobre
+uma lista de dicionários) e export_to_txt (str() por valor num ciclo Python),
+reproduzidas abaixo como referência, com os escritores vetorizados atuais de
+core.data_exporter, incluindo a injeção da coluna filtrada.
+
+Os dados são sintéticos e gerados em memória (sem base de dados); os
+ficheiros são escritos numa pasta temporária.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_export --rows 1000000
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import os
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+import core.data_exporter as data_exporter
+
+
+def _legacy_export_to_csv(data: List[Dict[str, Any]], filename: str,
+                          filtered_col: Optional[List[float]] = None) -> None:
+    """Implementação anterior (csv.DictWriter, cópia e injeção por linha)."""
+    export_data = [d.copy() for d in data]
+    if filtered_col and len(filtered_col) == len(export_data):
+        for i, row in enumerate(export_data):
+            row['tensao_filtrada_mv'] = round(filtered_col[i], 2)
+    with open(filename, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=export_data[0].keys())
+        writer.writeheader()
+        writer.writerows(export_data)
+
+
+def _legacy_export_to_txt(data: List[Dict[str, Any]], filename: str,
+                          filtered_col: Optional[List[float]] = None) -> None:
+    """Implementação anterior (str() por valor, uma escrita por linha)."""
+    keys = list(data[0].keys())
+    if filtered_col:
+        keys.append('tensao_filtrada_mv')
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.write('\t'.join(keys) + '\n')
+        for i, row in enumerate(data):
+            values = [str(row.get(k, '')) for k in row.keys()]
+            if filtered_col and i < len(filtered_col):
+                values.append(f"{filtered_col[i]:.2f}")
+            f.write('\t'.join(values) + '\n')
+
+
+def synthetic_columns(n_rows: int) -> Dict[str, np.ndarray]:
+    """Vetores por coluna com o formato de database.get_telemetry_columns (1 kHz, alguns nulos)."""
+    rng = np.random.default_rng(0)
+    t = np.arange(n_rows, dtype=np.int64)
+    columns = {
+        'timestamp_amostra_ms': 1000 + t,
+        'valor_adc': (t % 4096).astype('f8'),
+        'tensao_mv': 1650 + 1500 * np.sin(t / 500.0),
+        'sinal_controle': rng.uniform(0, 100, n_rows),
+        'tensao_estimada_mv': 1650 + rng.normal(0, 50, n_rows),
+        'erro_obs_mv': rng.normal(0, 5, n_rows),
+        'estado_1': rng.normal(0, 1, n_rows),
+        'estado_2': rng.normal(0, 1, n_rows),
+        'estado_3': rng.normal(0, 1, n_rows),
+    }
+    # Os canais chegam do firmware como float32 (valores fracionários).
+    for name in columns:
+        if name != 'timestamp_amostra_ms':
+            columns[name] = columns[name].astype(np.float32).astype('f8')
+    columns['erro_obs_mv'][::50] = np.nan
+    return columns
+
+
+def _as_dicts(columns: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+    """Lista de dicionários equivalente à de database.get_telemetry_for_experiment."""
+    names = list(columns.keys())
+    values = [columns[c].tolist() for c in names]
+    values[0] = [int(v) for v in values[0]]
+    rows = [dict(zip(names, row)) for row in zip(*values)]
+    for row in rows:
+        if row['erro_obs_mv'] != row['erro_obs_mv']:
+            row['erro_obs_mv'] = None
+    return rows
+
+
+def _time_call(label: str, fn: Callable[[], None], path: str, repeats: int) -> float:
+    # As mensagens de progresso dos exportadores são suprimidas durante a medição.
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn()  # Aquecimento (cache do SO e alocações).
+        best = float("inf")
+        for _ in range(repeats):
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+    size_mb = os.path.getsize(path) / 2**20
+    print(f"  {label:<40} {best:8.3f} s   {size_mb:7.1f} MiB   {size_mb / best:7.1f} MiB/s")
+    return best
+
+
+def run(n_rows: int, repeats: int, out_dir: str) -> None:
+    print(f"\n=== {n_rows:,} linhas (com tensao_filtrada_mv) ===")
+    columns = synthetic_columns(n_rows)
+    rows = _as_dicts(columns)
+    filtered = np.convolve(columns['tensao_estimada_mv'], np.ones(8) / 8, mode='same')
+    filtered_list = filtered.tolist()
+
+    csv_path = os.path.join(out_dir, "bench.csv")
+    txt_path = os.path.join(out_dir, "bench.txt")
+
+    legacy_csv = _time_call("CSV anterior (csv.DictWriter)",
+                            lambda: _legacy_export_to_csv(rows, csv_path, filtered_list), csv_path, repeats)
+    new_csv = _time_call("CSV vetorizado (vetores por coluna)",
+                         lambda: data_exporter.export_to_csv(columns, csv_path, filtered), csv_path, repeats)
+    _time_call("CSV vetorizado (lista de dicionários)",
+               lambda: data_exporter.export_to_csv(rows, csv_path, filtered_list), csv_path, repeats)
+
+    legacy_txt = _time_call("TXT anterior (str() por valor)",
+                            lambda: _legacy_export_to_txt(rows, txt_path, filtered_list), txt_path, repeats)
+    new_txt = _time_call("TXT vetorizado (vetores por coluna)",
+                         lambda: data_exporter.export_to_txt(columns, txt_path, filtered), txt_path, repeats)
+
+    print(f"  Aceleração: CSV {legacy_csv / new_csv:.1f}x, TXT {legacy_txt / new_txt:.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000])
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_rows in args.rows:
+            run(n_rows, args.repeats, tmp)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+"""
+Microbenchmarks dos Caminhos Críticos (com Linhas de Base JSON).
+
+Mede, com dados sintéticos de dimensão realista, aquecimento e repetições:
+    * udp_server.decode_datagram (struct.unpack_from de 5 amostras);
+    * RingBuffer.append / extend / get_data;
+    * GraphManager.append_plot_data e animation_update_callback (backend Agg);
+    * database.insert_data_batch e get_telemetry_for_experiment (SQLite temporário);
+    * data_exporter.export_to_csv / export_to_txt / export_to_npy.
+
+Cada caso reporta a mediana e o mínimo por chamada e o débito (operações/s).
+--save grava os resultados como linha de base; --compare confronta-os com uma
+linha de base anterior e assinala as regressões acima do limiar (código de
+saída 1), para uso manual ou em integração contínua.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_hot_paths --save benchmarks/baselines/hot_paths.json
+    python -m benchmarks.bench_hot_paths --compare benchmarks/baselines/hot_paths.json --threshold 1.25
+    python -m benchmarks.bench_hot_paths --only ring decode
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import struct
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+
+import config.settings as settings
+import core.data_exporter as data_exporter
+import core.database as database
+import core.udp_server as udp_server
+from benchmarks.bench_export import synthetic_columns, _as_dicts
+from ui.plot_manager import GraphManager, RingBuffer
+
+# Um caso: (nome, função sem argumentos, operações por chamada, unidade da operação).
+Case = Tuple[str, Callable[[], Any], int, str]
+
+
+def _measure(fn: Callable[[], Any], warmup: int, repeats: int, min_time_sec: float) -> List[float]:
+    """
+    Tempos por chamada (s). Cada repetição agrupa chamadas suficientes para
+    durar pelo menos min_time_sec, diluindo o custo do relógio.
+    """
+    for _ in range(warmup):
+        fn()
+
+    start = time.perf_counter()
+    fn()
+    single = max(time.perf_counter() - start, 1e-7)
+    number = max(1, int(min_time_sec / single))
+
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number)
+    return samples
+
+
+def _synthetic_datagram(index: int = 0) -> bytes:
+    return b''.join(
+        struct.pack(udp_server.TELEMETRY_STRUCT_FORMAT, index + i, 50.0, 1650.0 + i, 2048.0,
+                    1649.0, 1.0, 0.1, 0.2, 0.3)
+        for i in range(udp_server.SAMPLES_PER_PACKET)
+    )
+
+
+def _telemetry_items(n: int) -> List[Dict[str, Any]]:
+    """Amostras no formato da fila (como produzidas pela receção UDP)."""
+    now = datetime.now()
+    items = []
+    for p in range(n // udp_server.SAMPLES_PER_PACKET):
+        items.extend(udp_server.decode_datagram(_synthetic_datagram(p * udp_server.SAMPLES_PER_PACKET), now, 1.0))
+    return items
+
+
+def decode_cases() -> List[Case]:
+    buffer = _synthetic_datagram()
+    now = datetime.now()
+    return [("decode_datagram", lambda: udp_server.decode_datagram(buffer, now, 1.0),
+             udp_server.SAMPLES_PER_PACKET, "amostras")]
+
+
+def ring_cases() -> List[Case]:
+    ring = RingBuffer(3000)
+    block = np.random.default_rng(0).normal(size=500)
+    for v in block:
+        ring.append(v)
+
+    def append_5() -> None:
+        for _ in range(5):
+            ring.append(1.0)
+
+    return [
+        ("ring_append", append_5, 5, "amostras"),
+        ("ring_extend_500", lambda: ring.extend(block), 500, "amostras"),
+        ("ring_get_data_3000", ring.get_data, 3000, "amostras"),
+    ]
+
+
+def plot_cases() -> List[Case]:
+    fig, ax = plt.subplots()
+    plotter = GraphManager(fig, ax, max_points=3000)
+    plotter.select_layout(settings.DASHBOARD_LAYOUTS["Visão Completa"])
+    fig.canvas.draw()
+
+    items = _telemetry_items(3000)
+    for item in items:
+        plotter.append_plot_data(item)
+
+    # 33 amostras por quadro a 1 kHz; os timestamps avançam para provocar deslocamento do eixo.
+    frame_items = items[:35]
+    state = {'t': items[-1]['timestamp_amostra_ms']}
+
+    def append_frame() -> None:
+        for item in frame_items:
+            state['t'] += 1
+            item['timestamp_amostra_ms'] = state['t']
+            plotter.append_plot_data(item)
+
+    def animation_frame() -> None:
+        append_frame()
+        plotter.animation_update_callback(0)
+
+    return [
+        ("graph_append_plot_data", append_frame, len(frame_items), "amostras"),
+        ("graph_animation_update", animation_frame, 1, "quadros"),
+    ]
+
+
+def database_cases(tmp: str) -> List[Case]:
+    database.DB_FILE = os.path.join(tmp, "bench_hot_paths.db")
+    with contextlib.redirect_stdout(io.StringIO()):
+        database.init_db()
+    conn = sqlite3.connect(database.DB_FILE)
+    cursor = conn.cursor()
+    cursor.execute("INSERT INTO experimentos (timestamp_inicio, status) VALUES ('2024-01-01T00:00:00', 'completed')")
+    insert_exp = cursor.lastrowid
+    cursor.execute("INSERT INTO experimentos (timestamp_inicio, status) VALUES ('2024-01-01T00:00:00', 'completed')")
+    read_exp = cursor.lastrowid
+    conn.commit()
+    conn.close()
+
+    batch = _telemetry_items(500)
+    for item in batch:
+        item['id_experimento'] = insert_exp
+
+    read_rows = _telemetry_items(100_000)
+    for item in read_rows:
+        item['id_experimento'] = read_exp
+    database.insert_data_batch(read_rows)
+
+    return [
+        ("db_insert_data_batch_500", lambda: database.insert_data_batch(batch), len(batch), "linhas"),
+        ("db_get_telemetry_100k", lambda: database.get_telemetry_for_experiment(read_exp), len(read_rows), "linhas"),
+    ]
+
+
+def export_cases(tmp: str) -> List[Case]:
+    n_rows = 100_000
+    columns = synthetic_columns(n_rows)
+    rows = _as_dicts(columns)
+    path = os.path.join(tmp, "bench_export")
+
+    def quiet(fn: Callable[[], Any]) -> Callable[[], Any]:
+        def run() -> None:
+            with contextlib.redirect_stdout(io.StringIO()):
+                fn()
+        return run
+
+    return [
+        ("export_csv_100k", quiet(lambda: data_exporter.export_to_csv(rows, path + ".csv")), n_rows, "linhas"),
+        ("export_txt_100k", quiet(lambda: data_exporter.export_to_txt(rows, path + ".txt")), n_rows, "linhas"),
+        ("export_npy_100k", quiet(lambda: data_exporter.export_to_npy(rows, path + ".npy")), n_rows, "linhas"),
+    ]
+
+
+GROUPS: Dict[str, Callable[..., List[Case]]] = {
+    'decode': decode_cases,
+    'ring': ring_cases,
+    'plot': plot_cases,
+    'database': database_cases,
+    'export': export_cases,
+}
+
+
+def run(groups: List[str], warmup: int, repeats: int, min_time_sec: float) -> Dict[str, Dict[str, Any]]:
+    results: Dict[str, Dict[str, Any]] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        original_db = database.DB_FILE
+        try:
+            for group in groups:
+                factory = GROUPS[group]
+                cases = factory(tmp) if group in ('database', 'export') else factory()
+                for name, fn, ops, unit in cases:
+                    samples = _measure(fn, warmup, repeats, min_time_sec)
+                    median = statistics.median(samples)
+                    results[name] = {
+                        'median_sec': median,
+                        'min_sec': min(samples),
+                        'stdev_sec': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+                        'ops_per_call': ops,
+                        'unit': unit,
+                        'ops_per_sec': ops / median,
+                    }
+                    print(f"  {name:<28} {median * 1e6:12.2f} µs/chamada   {ops / median:14,.0f} {unit}/s")
+        finally:
+            database.DB_FILE = original_db
+    return results
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline_path: str, threshold: float) -> bool:
+    """Imprime a razão atual/linha de base por caso; devolve False se houver regressões."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)['results']
+
+    ok = True
+    print(f"\n=== Comparação com {baseline_path} (limiar {threshold:g}x) ===")
+    for name, current in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            print(f"  {name:<28} (sem linha de base)")
+            continue
+        ratio = current['median_sec'] / reference['median_sec']
+        flag = "REGRESSÃO" if ratio > threshold else ("melhoria" if ratio < 1.0 / threshold else "")
+        ok = ok and ratio <= threshold
+        print(f"  {name:<28} {ratio:6.2f}x  {flag}")
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", nargs="+", choices=list(GROUPS.keys()), default=list(GROUPS.keys()))
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--repeats", type=int, default=7)
+    parser.add_argument("--min-time", type=float, default=0.05, help="Duração mínima de cada repetição (s).")
+    parser.add_argument("--save", help="Grava os resultados como linha de base JSON.")
+    parser.add_argument("--compare", help="Linha de base JSON com que comparar.")
+    parser.add_argument("--threshold", type=float, default=1.25, help="Razão a partir da qual há regressão.")
+    args = parser.parse_args()
+
+    print(f"=== Microbenchmarks ({', '.join(args.only)}) ===")
+    results = run(args.only, args.warmup, args.repeats, args.min_time)
+
+    if args.save:
+        directory = os.path.dirname(args.save)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({
+                'generated_at': datetime.now().isoformat(timespec='seconds'),
+                'python': sys.version.split()[0],
+                'numpy': np.__version__,
+                'platform': platform.platform(),
+                'results': results,
+            }, f, indent=2, ensure_ascii=False)
+        print(f"\nLinha de base gravada em {args.save}")
+
+    if args.compare and not compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark: Leitura de Telemetria (Dicionários vs. Vetores Colunares NumPy).
+
+Compara database.get_telemetry_for_experiment (sqlite3.Row -> dict por linha)
+com database.get_telemetry_columns (fetchmany -> vetores pré-alocados) numa
+base de dados sintética e temporária.
+
+A leitura por dicionários retém ~650 MiB por milhão de amostras (mais o
+registo do tracemalloc), pelo que 3M já esgota uma máquina de 6 GiB e 10M
+exigiria mais de 16 GiB; por omissão medem-se 1M e 2M.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_telemetry_read --rows 1000000 2000000
+"""
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Iterator, Tuple
+
+import core.database as database
+
+
+def _synthetic_rows(exp_id: int, n_rows: int) -> Iterator[Tuple]:
+    """Gera amostras de 1 kHz com forma de onda plausível (sem alocar a sessão inteira)."""
+    for i in range(n_rows):
+        yield (exp_id, "2024-01-01T00:00:00", 1000 + i, i % 4096, (i * 7) % 3300,
+               float(i % 100), 1650.0, 0.5, 1.0, 2.0, 3.0)
+
+
+def build_session(n_rows: int) -> int:
+    """Cria (em database.DB_FILE) uma sessão concluída com n_rows amostras."""
+    database.init_db()
+    conn = sqlite3.connect(database.DB_FILE)
+    cursor = conn.cursor()
+    cursor.execute(
+        "INSERT INTO experimentos (timestamp_inicio, timestamp_fim, status) VALUES (?, ?, 'completed')",
+        ("2024-01-01T00:00:00", "2024-01-01T01:00:00")
+    )
+    exp_id = cursor.lastrowid
+    cursor.executemany("""
+        INSERT INTO telemetria (
+            id_experimento, timestamp_recebimento, timestamp_amostra_ms,
+            valor_adc, tensao_mv, sinal_controle, tensao_estimada_mv, erro_obs_mv,
+            estado_1, estado_2, estado_3
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, _synthetic_rows(exp_id, n_rows))
+    conn.commit()
+    conn.close()
+    return exp_id
+
+
+def _time_call(label: str, fn: Callable[[], object], repeats: int) -> float:
+    # Aquecimento (cache de páginas do SQLite e do SO) com medição do pico de memória Python.
+    tracemalloc.start()
+    fn()
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    print(f"  {label:<42} {best:8.3f} s   pico {peak / 2**20:8.1f} MiB")
+    return best
+
+
+def run(n_rows: int, repeats: int) -> None:
+    print(f"\n=== {n_rows:,} amostras ===")
+    exp_id = build_session(n_rows)
+
+    legacy = _time_call("get_telemetry_for_experiment (dict/linha)",
+                        lambda: database.get_telemetry_for_experiment(exp_id), repeats)
+    columnar = _time_call("get_telemetry_columns (todas as colunas)",
+                          lambda: database.get_telemetry_columns(exp_id), repeats)
+    _time_call("get_telemetry_columns (tensao_mv)",
+               lambda: database.get_telemetry_columns(exp_id, ["tensao_mv"]), repeats)
+    _time_call("get_telemetry_columns (structured)",
+               lambda: database.get_telemetry_columns(exp_id, structured=True), repeats)
+    _time_call("get_telemetry_columns (janela de 10 s)",
+               lambda: database.get_telemetry_columns(exp_id, t_min_ms=1000, t_max_ms=11000), repeats)
+
+    print(f"  Aceleração (todas as colunas): {legacy / columnar:.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000_000, 2_000_000])
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_rows in args.rows:
+            database.DB_FILE = os.path.join(tmp, f"bench_{n_rows}.db")
+            run(n_rows, args.repeats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+"""
+Ensaio de Carga de Ponta a Ponta (Receção UDP -> Filas -> SQLite / Gráfico).
+
+Arranca, sem interface gráfica, os componentes reais do pipeline: a thread de
+receção UDP (core.udp_server), o DB Writer (core.db_writer) com gravação
+ativa numa base de dados temporária, e um consumidor que emula a thread Tk
+(process_queue a cada 33 ms + GraphManager.animation_update_callback sobre o
+backend Agg). A fonte é o simulador da planta (core.plant_simulator) em
+patamares de taxa crescentes.
+
+Por patamar são medidos:
+    * débito por etapa (datagramas enviados/recebidos, amostras enfileiradas,
+      consumidas pelo gráfico e persistidas);
+    * profundidade de data_queue e db_queue (média e máxima);
+    * amostras descartadas em cada queue.Full e datagramas perdidos no socket;
+    * latência de ponta a ponta, da receção do datagrama ao commit SQLite;
+    * CPU por thread (Linux: /proc/self/task/<tid>/stat).
+
+O relatório JSON permite comparar execuções entre versões.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.load_test --rates 1000 2000 5000 10000 20000 --duration 10 --out load_test.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+
+import config.settings as settings
+import core.database as database
+import core.db_writer as db_writer
+import core.udp_server as udp_server
+from core.metrics import registry
+from core.plant_simulator import PlantSimulator
+from core.shared_state import data_queue, db_queue
+from ui.plot_manager import GraphManager
+
+# Período (s) de amostragem da profundidade das filas e do consumidor gráfico.
+QUEUE_SAMPLE_SEC: float = 0.05
+FRAME_PERIOD_SEC: float = 0.033
+
+
+class _CommitProbe:
+    """
+    Envolve database.insert_data_batch para medir linhas persistidas, o instante
+    do último commit e a latência receção -> commit do item mais antigo e mais
+    recente de cada lote.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.latencies_ms: List[float] = []
+        self.last_commit: Optional[float] = None
+        self._insert = database.insert_data_batch
+        self._lock = threading.Lock()
+
+    def install(self) -> None:
+        database.insert_data_batch = self._instrumented
+
+    def _instrumented(self, batch: List[Dict[str, Any]], conn: Any = None) -> None:
+        self._insert(batch, conn)
+        committed = datetime.now()
+        if not batch:
+            return
+        with self._lock:
+            self.rows += len(batch)
+            self.last_commit = time.perf_counter()
+            for item in (batch[0], batch[-1]):
+                received = item.get('timestamp_recebimento')
+                if received:
+                    delta = committed - datetime.fromisoformat(received)
+                    self.latencies_ms.append(delta.total_seconds() * 1000.0)
+
+    def take(self) -> Dict[str, Any]:
+        with self._lock:
+            rows, latencies, last_commit = self.rows, self.latencies_ms, self.last_commit
+            self.rows, self.latencies_ms, self.last_commit = 0, [], None
+        return {'rows': rows, 'latencies_ms': latencies, 'last_commit': last_commit}
+
+
+class _HeadlessConsumer:
+    """Emula a thread Tk: drena data_queue e executa o quadro de animação a cada 33 ms."""
+
+    def __init__(self, max_points: int = 3000):
+        self.fig, ax = plt.subplots()
+        self.plotter = GraphManager(self.fig, ax, max_points=max_points)
+        self.plotter.select_layout(settings.DASHBOARD_LAYOUTS["Visão Completa"])
+        self.fig.canvas.draw()
+        self.samples = 0
+        self.frame_ms: List[float] = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="headless-ui", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join(timeout=1.0)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            start = time.perf_counter()
+            while not data_queue.empty():
+                self.plotter.append_plot_data(data_queue.get_nowait())
+                self.samples += 1
+            self.plotter.animation_update_callback(0)
+            elapsed = time.perf_counter() - start
+            self.frame_ms.append(elapsed * 1000.0)
+            time.sleep(max(0.0, FRAME_PERIOD_SEC - elapsed))
+
+    def take(self) -> Dict[str, Any]:
+        samples, frames = self.samples, self.frame_ms
+        self.samples, self.frame_ms = 0, []
+        return {'samples': samples, 'frame_ms': frames}
+
+
+# Contadores da receção (core.metrics) usados no relatório.
+_RECEIVER_COUNTERS: Dict[str, str] = {
+    'datagrams': 'udp_datagrams_total',
+    'invalid': 'udp_invalid_datagrams_total',
+    'samples': 'udp_samples_total',
+    'data_queue_drops': 'data_queue_drops_total',
+    'db_queue_drops': 'db_queue_drops_total',
+}
+
+
+def _receiver_counts() -> Dict[str, int]:
+    return {key: registry.counter(name).value for key, name in _RECEIVER_COUNTERS.items()}
+
+
+def _thread_cpu_seconds() -> Dict[str, float]:
+    """Tempo de CPU (utilizador + sistema) por thread nomeada; vazio fora de Linux."""
+    ticks = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+    result: Dict[str, float] = {}
+    for thread in threading.enumerate():
+        tid = getattr(thread, "native_id", None)
+        path = f"/proc/self/task/{tid}/stat"
+        if tid is None or not os.path.exists(path):
+            continue
+        try:
+            with open(path) as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            # Campos 14 e 15 (utime, stime), contados a partir do estado (campo 3).
+            result[thread.name] = (int(fields[11]) + int(fields[12])) / ticks
+        except (OSError, IndexError, ValueError):
+            continue
+    return result
+
+
+def _percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    if not values:
+        return {'p50': None, 'p95': None, 'p99': None, 'max': None}
+    arr = np.asarray(values)
+    return {
+        'p50': round(float(np.percentile(arr, 50)), 3),
+        'p95': round(float(np.percentile(arr, 95)), 3),
+        'p99': round(float(np.percentile(arr, 99)), 3),
+        'max': round(float(arr.max()), 3),
+    }
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def run_step(rate_hz: float, duration_sec: float, port: int, probe: _CommitProbe,
+             consumer: _HeadlessConsumer, drain_sec: float) -> Dict[str, Any]:
+    """
+    Um patamar de taxa: simulador durante duration_sec, seguido de drenagem das filas.
+
+    Todos os débitos usam a mesma base temporal (window_sec): do arranque do
+    patamar ao último commit, ou ao fim do envio se este for posterior. O tempo
+    até a db_queue esvaziar após o envio é reportado à parte (drain_sec).
+    """
+    stats_before = _receiver_counts()
+    cpu_before = _thread_cpu_seconds()
+    probe.take()
+    consumer.take()
+
+    simulator = PlantSimulator(rate_hz, telemetry_port=port, command_port=0, initial_setpoint=1.5, seed=0)
+    depth_data: List[int] = []
+    depth_db: List[int] = []
+    start = time.perf_counter()
+    simulator.start(duration_sec)
+    while simulator.running:
+        depth_data.append(data_queue.qsize())
+        depth_db.append(db_queue.qsize())
+        time.sleep(QUEUE_SAMPLE_SEC)
+    send_end = time.perf_counter()
+    send_elapsed = send_end - start
+
+    # Drenagem: aguarda que a db_queue esvazie (com limite) para contabilizar os commits.
+    drain_deadline = send_end + drain_sec
+    while db_queue.qsize() > 0 and time.perf_counter() < drain_deadline:
+        time.sleep(QUEUE_SAMPLE_SEC)
+    drain_elapsed = time.perf_counter() - send_end
+    time.sleep(1.2)  # Um ciclo de descarga temporal do DB Writer.
+    elapsed = time.perf_counter() - start
+
+    cpu_after = _thread_cpu_seconds()
+    stats_after = _receiver_counts()
+    received = {k: stats_after[k] - stats_before[k] for k in stats_before}
+    commits = probe.take()
+    ui = consumer.take()
+    sent = simulator.stats['sent']
+    last_commit = commits['last_commit'] if commits['last_commit'] is not None else send_end
+    window = max(send_elapsed, last_commit - start)
+
+    return {
+        'rate_hz': rate_hz,
+        'duration_sec': round(send_elapsed, 3),
+        'window_sec': round(window, 3),
+        'drain_sec': round(drain_elapsed, 3),
+        'throughput_per_sec': {
+            'datagrams_sent': round(sent / window, 1),
+            'datagrams_received': round(received['datagrams'] / window, 1),
+            'samples_received': round(received['samples'] / window, 1),
+            'samples_plotted': round(ui['samples'] / window, 1),
+            'rows_committed': round(commits['rows'] / window, 1),
+        },
+        'counts': {
+            'datagrams_sent': sent,
+            'datagrams_received': received['datagrams'],
+            'socket_loss': max(0, sent - received['datagrams']),
+            'invalid_datagrams': received['invalid'],
+            'samples_received': received['samples'],
+            'data_queue_drops': received['data_queue_drops'],
+            'db_queue_drops': received['db_queue_drops'],
+            'samples_plotted': ui['samples'],
+            'rows_committed': commits['rows'],
+            'db_queue_backlog_at_end': db_queue.qsize(),
+        },
+        'queue_depth': {
+            'data_queue_mean': round(float(np.mean(depth_data)), 1) if depth_data else 0,
+            'data_queue_max': max(depth_data, default=0),
+            'db_queue_mean': round(float(np.mean(depth_db)), 1) if depth_db else 0,
+            'db_queue_max': max(depth_db, default=0),
+        },
+        'latency_receive_to_commit_ms': _percentiles(commits['latencies_ms']),
+        'ui_frame_ms': _percentiles(ui['frame_ms']),
+        'db_flush_ms_max': round(db_writer.flush_stats['max_ms'], 3),
+        # CPU sobre todo o intervalo medido pelos contadores (envio, drenagem e ciclo final).
+        'cpu_percent_per_thread': {
+            name: round(100.0 * (cpu_after[name] - cpu_before.get(name, 0.0)) / elapsed, 1)
+            for name in sorted(cpu_after)
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rates", type=float, nargs="+", default=[1000, 2000, 5000, 10000, 20000])
+    parser.add_argument("--duration", type=float, default=10.0, help="Duração de cada patamar (s).")
+    parser.add_argument("--drain", type=float, default=10.0, help="Tempo máximo de drenagem da db_queue (s).")
+    parser.add_argument("--port", type=int, default=15000, help="Porta UDP do recetor durante o ensaio.")
+    parser.add_argument("--out", default="load_test_report.json")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_FILE = os.path.join(tmp, "load_test.db")
+        database.init_db()
+        settings.UDP_TELEMETRY_PORT = args.port
+
+        probe = _CommitProbe()
+        probe.install()
+        udp_server.start_network_threads()
+        db_writer.start_db_writer_thread()
+        consumer = _HeadlessConsumer()
+        consumer.start()
+        database.start_new_experiment()
+        time.sleep(0.5)
+
+        steps = []
+        for rate in args.rates:
+            print(f"\n=== Patamar {rate:,.0f} Hz durante {args.duration:g} s ===")
+            step = run_step(rate, args.duration, args.port, probe, consumer, args.drain)
+            counts = step['counts']
+            print(f"  Enviados {counts['datagrams_sent']:,} | recebidos {counts['datagrams_received']:,} | "
+                  f"descartes data_queue {counts['data_queue_drops']:,} | persistidas {counts['rows_committed']:,} | "
+                  f"latência p95 {step['latency_receive_to_commit_ms']['p95']} ms | drenagem {step['drain_sec']:.2f} s")
+            steps.append(step)
+
+        database.close_current_experiment()
+        consumer.stop()
+        db_writer.stop_db_writer_thread()
+
+    report = {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'git_revision': _git_revision(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'parameters': {'rates_hz': args.rates, 'step_duration_sec': args.duration},
+        'steps': steps,
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\nRelatório escrito em {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,6 +16,118 @@ COLOR_THEME: str = "blue"
 
 DB_PATH: str = "motor_data.db"
 
+# Tamanhos de balde (em amostras) da pirâmide de decimação min/max por experimento.
+# Cada nível deve ser múltiplo do anterior.
+DECIMATION_LEVELS: tuple = (10, 100, 1000)
+
+# Intervalo (s) entre checkpoints PASSIVE do WAL (thread dedicada, ver core.wal_checkpoint).
+WAL_CHECKPOINT_INTERVAL_SEC: float = 2.0
+
+# Amostras pendentes entre a receção e o DB Writer (5 min a 1 kHz). Com a fila
+# cheia (disco parado) as novas amostras são descartadas e contadas em
+# db_queue_drops_total, em vez de a memória crescer sem limite.
+DB_QUEUE_MAXSIZE: int = 300_000
+
+# Arquivo de experimentos antigos em segmentos .npz (pasta relativa à raiz do projeto).
+# Experimentos concluídos há mais de ARCHIVE_AFTER_DAYS dias são arquivados no arranque;
+# um valor negativo desativa o arquivo automático.
+ARCHIVE_DIR: str = "archive"
+ARCHIVE_AFTER_DAYS: float = 90.0
+
+# --- Sinais Derivados (core.derived_signals) ---
+
+# Parâmetros por omissão dos filtros aplicados à tensão no gráfico em tempo real e na exportação.
+FILTER_EMA_ALPHA: float = 0.1
+FILTER_MA_WINDOW: int = 20
+FILTER_BUTTERWORTH_CUTOFF_HZ: float = 10.0
+FILTER_BUTTERWORTH_ORDER: int = 2
+FILTER_RMS_WINDOW: int = 50
+
+# --- Painel Espetral (PSD de Welch no painel em tempo real) ---
+
+# Amostras mais recentes analisadas, comprimento de cada segmento da FFT
+# (resolução = fs / SPECTRUM_NPERSEG) e intervalo mínimo entre recálculos.
+SPECTRUM_WINDOW_SAMPLES: int = 2048
+SPECTRUM_NPERSEG: int = 256
+SPECTRUM_UPDATE_INTERVAL_SEC: float = 0.5
+
+# --- Painel em Tempo Real (Grelha Multi-Painel) ---
+
+# Vistas múltiplas disponíveis na barra lateral (famílias de GraphManager por ordem de leitura).
+DASHBOARD_LAYOUTS: dict = {
+    "Controle + Erro + Estados": ("controle_tensao", "erro_observador", "estados_sistema"),
+    "Diagnóstico de Ruído": ("controle_tensao", "valor_adc", "espectro", "ciclo"),
+    "Visão Completa": ("controle_tensao", "valor_adc", "erro_observador",
+                       "estados_sistema", "ciclo", "espectro"),
+}
+DASHBOARD_GRID_COLUMNS: int = 2
+
+# Intervalo mínimo (s) entre atualizações de cada família; omissas atualizam a cada quadro.
+DASHBOARD_PANEL_INTERVAL_SEC: dict = {
+    "ciclo": 0.1,
+    "espectro": SPECTRUM_UPDATE_INTERVAL_SEC,
+}
+
+# Folga (fração da largura) com que o eixo de tempo avança quando os dados saem da vista.
+DASHBOARD_X_SCROLL_STEP: float = 0.25
+
+# Orçamento de cada quadro de animação (ms), igual ao período do FuncAnimation.
+FRAME_BUDGET_MS: float = 33.0
+
+# --- Gravação por Gatilho (core.trigger) ---
+
+# Canal e modo do gatilho: "above"/"below" (limiar), "rising"/"falling" (flanco
+# que cruza TRIGGER_LEVEL) ou "setpoint" (mudança da referência enviada).
+TRIGGER_CHANNEL: str = "tensao_mv"
+TRIGGER_MODE: str = "rising"
+TRIGGER_LEVEL: float = 1650.0
+
+# Janela incluída antes do disparo e duração da gravação após o disparo (ms
+# no relógio do firmware); a janela prévia é limitada a um máximo de amostras.
+TRIGGER_PRE_MS: int = 500
+TRIGGER_POST_MS: int = 2000
+TRIGGER_PRE_MAX_SAMPLES: int = 100_000
+
+# Rearma automaticamente após cada gravação (caso contrário, disparo único).
+TRIGGER_AUTO_REARM: bool = False
+
+# --- Captura de Datagramas em Bruto (core.capture) ---
+
+# Pasta das capturas (relativa à raiz do projeto) e ativação automática no arranque.
+CAPTURE_DIR: str = "captures"
+CAPTURE_ON_STARTUP: bool = False
+
+# Datagramas pendentes entre a receção e a thread de escrita da captura; com a
+# fila cheia (disco lento) os datagramas deixam de ser capturados e são contados.
+CAPTURE_QUEUE_MAXSIZE: int = 20_000
+
+# --- Reprodução de Experimentos (core.playback) ---
+
+# Amostras lidas da base de dados por bloco e fatores de velocidade disponíveis no painel.
+PLAYBACK_CHUNK_SAMPLES: int = 20_000
+PLAYBACK_SPEEDS: tuple = (0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 50.0)
+
+# --- Servidor HTTP de Métricas (core.metrics_server) ---
+
+# Servidor local (127.0.0.1) com /metrics (Prometheus), /metrics.json, /status e /latest.
+METRICS_HTTP_ENABLED: bool = False
+METRICS_HTTP_PORT: int = 9108
+
+# --- Perfilagem (core.profiling; main.py --profile ou variável de ambiente) ---
+
+PROFILE_ENV_VAR: str = "INTERFACE_PLANTA_PROFILE"
+PROFILE_DIR: str = "profiles"
+PROFILE_DUMP_INTERVAL_SEC: float = 30.0
+# Período dos instantâneos tracemalloc (0 desativa; o rastreio abranda a execução).
+PROFILE_TRACEMALLOC_INTERVAL_SEC: float = 60.0
+PROFILE_TRACEMALLOC_FRAMES: int = 1
+PROFILE_TRACEMALLOC_TOP: int = 15
+
+# --- Modo sem Interface Gráfica (main.py --headless, core.headless) ---
+
+HEADLESS_STATUS_INTERVAL_SEC: float = 30.0
+HEADLESS_SHUTDOWN_TIMEOUT_SEC: float = 10.0
+
 # --- Configurações de Rede (Comunicação UDP ESP32) ---
 
 ESP_IP: str = "192.168.4.1"
@@ -0,0 +1,217 @@
+"""
+Arquivo Hierárquico de Experimentos Antigos (Segmentos .npz).
+
+Move a telemetria bruta de experimentos concluídos há mais de uma idade
+configurável (settings.ARCHIVE_AFTER_DAYS) para ficheiros de segmento
+comprimidos, um por experimento, mantendo a base de dados compacta.
+O registo em 'experimentos' e a pirâmide de decimação permanecem; a coluna
+'arquivo_segmento' aponta para o ficheiro e as leituras em core.database
+passam a ser servidas a partir dele de forma transparente.
+
+Uso em linha de comandos (a partir da raiz do projeto):
+    python -m core.archive --days 30
+    python -m core.archive --id 12 15
+"""
+
+import argparse
+import os
+import sqlite3
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+import numpy as np
+
+import config.settings as settings
+import core.database as database
+import core.decimation as decimation
+import core.segment_store as segment_store
+
+
+def _archive_dir() -> str:
+    return os.path.join(database.BASE_DIR, settings.ARCHIVE_DIR)
+
+
+def _segment_relpath(exp_id: int) -> str:
+    return os.path.join(settings.ARCHIVE_DIR, f"experimento_{exp_id:06d}.npz")
+
+
+def _read_reception_timestamps(exp_id: int, expected: int) -> np.ndarray:
+    """
+    timestamp_recebimento (texto ISO) convertido para datetime64[us], na ordem das amostras.
+
+    A ordenação (timestamp_amostra_ms, id) é a mesma de database.get_telemetry_columns,
+    pelo que o vetor alinha posição a posição com as restantes colunas mesmo com
+    timestamps de amostra repetidos.
+    """
+    result = np.empty(expected, dtype="datetime64[us]")
+    conn = sqlite3.connect(database.DB_FILE)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT timestamp_recebimento FROM telemetria
+            WHERE id_experimento = ?
+            ORDER BY timestamp_amostra_ms ASC, id ASC
+        """, (exp_id,))
+        filled = 0
+        while True:
+            rows = cursor.fetchmany(database.COLUMNAR_FETCH_SIZE)
+            if not rows:
+                break
+            block = np.array([r[0] for r in rows], dtype="datetime64[us]")
+            result[filled:filled + len(block)] = block
+            filled += len(block)
+        return result[:filled]
+    finally:
+        conn.close()
+
+
+def _experiment_status(exp_id: int) -> Optional[str]:
+    """Status atual de um experimento (None se inexistente ou ilegível)."""
+    try:
+        conn = sqlite3.connect(database.DB_FILE)
+        try:
+            row = conn.execute("SELECT status FROM experimentos WHERE id = ?", (exp_id,)).fetchone()
+        finally:
+            conn.close()
+    except Exception:
+        return None
+    return row[0] if row else None
+
+
+def archive_experiment(exp_id: int) -> bool:
+    """
+    Arquiva a telemetria bruta de um experimento concluído num segmento .npz.
+
+    Sequência segura contra interrupções: (1) garante a pirâmide, (2) grava o
+    segmento de forma atómica e valida-o, (3) publica o ponteiro em
+    'experimentos' e só então (4) expurga as linhas brutas em blocos.
+    Só experimentos 'completed' são arquivados: a condição é verificada à
+    entrada e de novo, atomicamente, na publicação do ponteiro (uma sessão em
+    gravação, reservada ou em remoção nunca perde as linhas brutas).
+
+    Returns:
+        bool: True se o experimento ficou arquivado.
+    """
+    if database.get_archive_segment(exp_id):
+        return True
+
+    status = _experiment_status(exp_id)
+    if status != 'completed':
+        print(f"Arquivo: experimento {exp_id} não está concluído (status {status}); ignorado.")
+        return False
+
+    if not decimation.has_pyramid(exp_id):
+        decimation.build_pyramid(exp_id)
+
+    columns = database.get_telemetry_columns(exp_id)
+    total = len(columns["timestamp_amostra_ms"])
+    if total == 0:
+        print(f"Arquivo: experimento {exp_id} sem telemetria; ignorado.")
+        return False
+
+    try:
+        columns["timestamp_recebimento"] = _read_reception_timestamps(exp_id, total)
+    except Exception as e:
+        print(f"Arquivo: timestamp_recebimento ilegível no experimento {exp_id} ({e}); omitido.")
+
+    relpath = _segment_relpath(exp_id)
+    segment_path = os.path.join(database.BASE_DIR, relpath)
+    try:
+        segment_store.write_segment(segment_path, columns)
+        with np.load(segment_path) as npz:
+            if len(npz["timestamp_amostra_ms"]) != total:
+                raise IOError("contagem de amostras divergente após gravação")
+    except Exception as e:
+        print(f"ERRO ao gravar o segmento do experimento {exp_id}: {e}")
+        segment_store.remove_segment(segment_path)
+        return False
+
+    try:
+        conn = database.connect_for_write()
+        published = conn.execute(
+            "UPDATE experimentos SET arquivo_segmento = ? WHERE id = ? AND status = 'completed'",
+            (relpath, exp_id)
+        ).rowcount
+        conn.commit()
+        if not published:
+            conn.close()
+            segment_store.remove_segment(segment_path)
+            print(f"Arquivo: experimento {exp_id} deixou de estar concluído durante o arquivo; ignorado.")
+            return False
+        database._delete_in_chunks(conn, "telemetria", "id", exp_id, database.DELETE_CHUNK_ROWS, lambda _n: None)
+        conn.close()
+    except Exception as e:
+        print(f"ERRO ao publicar o arquivo do experimento {exp_id}: {e}")
+        return False
+
+    size_mb = os.path.getsize(segment_path) / 2**20
+    print(f"--- EXPERIMENTO ARQUIVADO --- ID: {exp_id} ({total} amostras, {size_mb:.1f} MiB) ---")
+    return True
+
+
+def get_archivable_experiments(max_age_days: Optional[float] = None) -> List[int]:
+    """
+    IDs de experimentos concluídos, não arquivados, terminados há mais de max_age_days.
+
+    Por omissão usa settings.ARCHIVE_AFTER_DAYS; valores nulos ou negativos desativam o arquivo.
+    """
+    if max_age_days is None:
+        max_age_days = settings.ARCHIVE_AFTER_DAYS
+    if max_age_days is None or max_age_days < 0:
+        return []
+    cutoff = (datetime.now() - timedelta(days=max_age_days)).isoformat()
+    try:
+        conn = sqlite3.connect(database.DB_FILE)
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT id FROM experimentos
+            WHERE status = 'completed'
+            AND arquivo_segmento IS NULL
+            AND timestamp_fim IS NOT NULL
+            AND timestamp_fim < ?
+            ORDER BY id ASC
+        """, (cutoff,))
+        ids = [row[0] for row in cursor.fetchall()]
+        conn.close()
+        return ids
+    except Exception as e:
+        print(f"ERRO ao inventariar experimentos arquiváveis: {e}")
+        return []
+
+
+def archive_old_experiments(max_age_days: Optional[float] = None) -> int:
+    """
+    Arquiva todos os experimentos mais antigos do que a idade configurada.
+
+    Args:
+        max_age_days (Optional[float]): Idade mínima; por omissão settings.ARCHIVE_AFTER_DAYS.
+            Valores nulos ou negativos desativam o arquivo.
+
+    Returns:
+        int: Número de experimentos arquivados.
+    """
+    archived = 0
+    for exp_id in get_archivable_experiments(max_age_days):
+        if archive_experiment(exp_id):
+            archived += 1
+    return archived
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Arquiva experimentos antigos em segmentos .npz.")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--days", type=float, default=None,
+                       help=f"Idade mínima em dias (por omissão {settings.ARCHIVE_AFTER_DAYS}).")
+    group.add_argument("--id", type=int, nargs="+", help="Arquiva apenas os IDs indicados.")
+    args = parser.parse_args()
+
+    database.init_db()
+    if args.id:
+        archived = sum(1 for exp_id in args.id if archive_experiment(exp_id))
+    else:
+        archived = archive_old_experiments(args.days)
+    print(f"Arquivo: {archived} experimento(s) arquivado(s).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Exportação Paralela em Lote de Experimentos.
+
+Exporta conjuntos de experimentos (selecionados por intervalo de IDs, datas
+ou etiqueta) para CSV, TXT ou NPY de forma concorrente num pool de processos.
+Cada processo abre a sua própria ligação SQLite apenas de leitura e percorre
+a sessão em blocos (database.iter_telemetry_chunks), pelo que a memória por
+processo é limitada e independente da duração dos experimentos.
+
+Uso em linha de comandos (a partir da raiz do projeto):
+    python -m core.batch_export --id-range 10 50 --format csv --out exportacoes/
+    python -m core.batch_export --since 2025-03-01 --until 2025-06-30 --format npy
+    python -m core.batch_export --tag semestre-1 --workers 4
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, Any, List, Optional
+
+import core.database as database
+import core.data_exporter as data_exporter
+
+EXPORT_FORMATS = ("csv", "txt", "npy")
+
+
+def export_experiment_worker(db_file: str, exp_id: int, out_dir: str, fmt: str) -> Dict[str, Any]:
+    """
+    Tarefa executada em cada processo do pool: exporta um experimento.
+
+    Args:
+        db_file (str): Caminho da base de dados (explícito: os processos podem ser 'spawned').
+        exp_id (int): Identificador da sessão.
+        out_dir (str): Pasta de destino.
+        fmt (str): 'csv', 'txt' ou 'npy'.
+
+    Returns:
+        Dict[str, Any]: Resumo com 'exp_id', 'path', 'rows', 'bytes', 'seconds' e 'error'.
+    """
+    database.DB_FILE = db_file
+    path = os.path.join(out_dir, f"sessao_telemetria_{exp_id}.{fmt}")
+    start = time.perf_counter()
+    summary = {'exp_id': exp_id, 'path': path, 'rows': 0, 'bytes': 0, 'seconds': 0.0, 'error': None}
+
+    try:
+        chunks = database.iter_telemetry_chunks(exp_id)
+        if fmt == "csv":
+            summary['rows'] = data_exporter.export_chunks_to_csv(chunks, path)
+        elif fmt == "txt":
+            summary['rows'] = data_exporter.export_chunks_to_txt(chunks, path)
+        else:
+            bounds = database.get_experiment_time_bounds(exp_id)
+            summary['rows'] = data_exporter.export_chunks_to_npy(chunks, path, bounds[2] if bounds else 0)
+        summary['bytes'] = os.path.getsize(path)
+    except Exception as e:
+        summary['error'] = str(e)
+
+    summary['seconds'] = time.perf_counter() - start
+    return summary
+
+
+def batch_export(exp_ids: List[int], out_dir: str, fmt: str = "csv",
+                 workers: Optional[int] = None,
+                 progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    Exporta vários experimentos em paralelo e agrega as métricas de débito.
+
+    Args:
+        exp_ids (List[int]): Sessões a exportar.
+        out_dir (str): Pasta de destino (criada se necessário).
+        fmt (str): 'csv', 'txt' ou 'npy'.
+        workers (Optional[int]): Número de processos (por omissão, os núcleos disponíveis).
+        progress_callback (Optional[Callable]): Invocado após cada experimento com
+            {'done', 'total', 'rows', 'bytes', 'elapsed', 'rows_per_sec', 'last'}.
+
+    Returns:
+        Dict[str, Any]: Progresso final acrescido de 'results' (resumo por experimento).
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Formato de exportação inválido: {fmt}")
+    os.makedirs(out_dir, exist_ok=True)
+
+    start = time.perf_counter()
+    progress: Dict[str, Any] = {
+        'done': 0, 'total': len(exp_ids), 'rows': 0, 'bytes': 0,
+        'elapsed': 0.0, 'rows_per_sec': 0.0, 'last': None
+    }
+    results = []
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(export_experiment_worker, database.DB_FILE, exp_id, out_dir, fmt)
+            for exp_id in exp_ids
+        ]
+        for future in as_completed(futures):
+            summary = future.result()
+            results.append(summary)
+
+            progress['done'] += 1
+            progress['rows'] += summary['rows']
+            progress['bytes'] += summary['bytes']
+            progress['elapsed'] = time.perf_counter() - start
+            progress['rows_per_sec'] = progress['rows'] / progress['elapsed'] if progress['elapsed'] else 0.0
+            progress['last'] = summary
+            if progress_callback:
+                progress_callback(dict(progress))
+
+    progress['results'] = sorted(results, key=lambda r: r['exp_id'])
+    return progress
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Exportação paralela de experimentos em lote.")
+    parser.add_argument("--ids", type=int, nargs="+", help="IDs explícitos.")
+    parser.add_argument("--id-range", type=int, nargs=2, metavar=("MIN", "MAX"), help="Intervalo inclusivo de IDs.")
+    parser.add_argument("--since", help="Data inicial AAAA-MM-DD (inclusiva).")
+    parser.add_argument("--until", help="Data final AAAA-MM-DD (inclusiva).")
+    parser.add_argument("--tag", help="Etiqueta exata dos experimentos.")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+    parser.add_argument("--out", default="exportacoes", help="Pasta de destino.")
+    parser.add_argument("--workers", type=int, default=None, help="Número de processos.")
+    args = parser.parse_args()
+
+    database.init_db()
+    if args.ids:
+        exp_ids = args.ids
+    else:
+        id_min, id_max = args.id_range if args.id_range else (None, None)
+        exp_ids = database.select_experiments(id_min, id_max, args.since, args.until, args.tag)
+
+    if not exp_ids:
+        print("Exportação em lote: nenhum experimento corresponde aos critérios.")
+        return
+
+    print(f"Exportação em lote: {len(exp_ids)} experimento(s) para {args.out} ({args.format.upper()})...")
+
+    def report(p: Dict[str, Any]) -> None:
+        last = p['last']
+        status = f"ERRO: {last['error']}" if last['error'] else f"{last['rows']} linhas em {last['seconds']:.2f} s"
+        print(f"  [{p['done']}/{p['total']}] #{last['exp_id']}: {status} | "
+              f"{p['rows_per_sec']:,.0f} linhas/s, {p['bytes'] / 2**20 / max(p['elapsed'], 1e-9):.1f} MiB/s")
+
+    final = batch_export(exp_ids, args.out, args.format, args.workers, report)
+    errors = sum(1 for r in final['results'] if r['error'])
+    print(f"Exportação em lote concluída: {final['rows']:,} linhas, {final['bytes'] / 2**20:.1f} MiB "
+          f"em {final['elapsed']:.2f} s ({errors} erro(s)).")
+
+
+if __name__ == "__main__":
+    main()
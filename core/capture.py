@@ -0,0 +1,231 @@
+"""
+Captura Binária de Datagramas em Bruto e Reprodução Temporalmente Fiel.
+
+A captura regista cada datagrama recebido pela thread de receção UDP, tal
+como chegou (incluindo os de comprimento inválido), com o instante de
+receção monotónico, num ficheiro binário compacto:
+
+    cabeçalho:  b'IPCAP001'
+    registo:    <QH (instante monotónico em ns, comprimento) + bytes do datagrama
+
+A reprodução reenvia uma captura para a porta de telemetria respeitando os
+intervalos originais (1x), acelerados N vezes, ou tão depressa quanto
+possível, transformando sessões de laboratório em ensaios de carga
+repetíveis de todo o pipeline.
+
+Uso (a partir da raiz do projeto):
+    python -m core.capture info captures/captura_2024-01-01_10-00-00.ipcap
+    python -m core.capture replay captures/captura_2024-01-01_10-00-00.ipcap --speed 4
+    python -m core.capture replay captures/captura_2024-01-01_10-00-00.ipcap --speed max
+"""
+
+import argparse
+import os
+import queue
+import socket
+import struct
+import threading
+import time
+from datetime import datetime
+from typing import BinaryIO, Dict, Iterator, Optional, Tuple
+
+import config.settings as settings
+from core.metrics import registry
+
+CAPTURE_MAGIC: bytes = b'IPCAP001'
+RECORD_HEADER = struct.Struct('<QH')
+
+# Buffer de escrita do ficheiro (usado apenas pela thread de escrita).
+WRITE_BUFFER_BYTES: int = 1 << 20
+
+_drops = registry.counter('capture_drops_total', "Datagramas não capturados com a fila de captura cheia")
+
+
+class CaptureWriter:
+    """
+    Escritor sequencial de capturas (uma única thread produtora: a de receção).
+
+    A thread de receção apenas enfileira (instante, datagrama) numa fila
+    limitada (settings.CAPTURE_QUEUE_MAXSIZE); o ficheiro é escrito por uma
+    thread própria ("capture-writer"). Com a fila cheia o datagrama não é
+    capturado e é contado em drops (e em capture_drops_total), sem nunca
+    bloquear a receção.
+    """
+
+    _STOP = object()
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.records = 0
+        self.bytes = 0
+        self.drops = 0
+        self._file: Optional[BinaryIO] = open(path, 'wb', buffering=WRITE_BUFFER_BYTES)
+        self._file.write(CAPTURE_MAGIC)
+        self._queue: queue.Queue = queue.Queue(maxsize=settings.CAPTURE_QUEUE_MAXSIZE)
+        self._closed = False
+        self._thread = threading.Thread(target=self._writer_loop, name="capture-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, timestamp_ns: int, datagram: bytes) -> None:
+        if self._closed:
+            return
+        try:
+            self._queue.put_nowait((timestamp_ns, datagram))
+        except queue.Full:
+            self.drops += 1
+            _drops.inc()
+
+    def _writer_loop(self) -> None:
+        f = self._file
+        failed = False
+        while True:
+            item = self._queue.get()
+            if item is self._STOP:
+                break
+            if failed:
+                continue  # Continua a drenar até ao fecho, para que close() nunca bloqueie.
+            timestamp_ns, datagram = item
+            try:
+                f.write(RECORD_HEADER.pack(timestamp_ns, len(datagram)))
+                f.write(datagram)
+            except OSError as e:
+                print(f"Captura: Erro de escrita em {self.path} ({e}); captura interrompida.")
+                self._closed = failed = True
+                continue
+            self.records += 1
+            self.bytes += len(datagram)
+
+    def close(self) -> None:
+        """Escreve os datagramas ainda enfileirados e fecha o ficheiro."""
+        if self._file is None:
+            return
+        self._closed = True
+        self._queue.put(self._STOP)
+        self._thread.join()
+        self._file.close()
+        self._file = None
+
+
+def default_capture_path() -> str:
+    """Caminho com data/hora em settings.CAPTURE_DIR (relativo à raiz do projeto)."""
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    return os.path.join(base_dir, settings.CAPTURE_DIR, f"captura_{timestamp}.ipcap")
+
+
+def read_capture(path: str) -> Iterator[Tuple[int, bytes]]:
+    """Itera (instante monotónico em ns, datagrama) pela ordem de receção."""
+    with open(path, 'rb') as f:
+        if f.read(len(CAPTURE_MAGIC)) != CAPTURE_MAGIC:
+            raise ValueError(f"Ficheiro não é uma captura válida: {path}")
+        header_size = RECORD_HEADER.size
+        while True:
+            header = f.read(header_size)
+            if len(header) < header_size:
+                return
+            timestamp_ns, length = RECORD_HEADER.unpack(header)
+            datagram = f.read(length)
+            if len(datagram) < length:  # Registo truncado (captura interrompida).
+                return
+            yield timestamp_ns, datagram
+
+
+def capture_info(path: str) -> Dict[str, float]:
+    """Resumo de uma captura: datagramas, bytes, duração e taxa média."""
+    records = total_bytes = 0
+    first_ns = last_ns = 0
+    for timestamp_ns, datagram in read_capture(path):
+        if records == 0:
+            first_ns = timestamp_ns
+        last_ns = timestamp_ns
+        records += 1
+        total_bytes += len(datagram)
+    duration = (last_ns - first_ns) / 1e9
+    return {
+        'records': records,
+        'bytes': total_bytes,
+        'duration_sec': duration,
+        'datagrams_per_sec': (records - 1) / duration if duration > 0 else 0.0,
+    }
+
+
+def replay(path: str, speed: Optional[float] = 1.0, host: str = "127.0.0.1",
+           port: int = settings.UDP_TELEMETRY_PORT,
+           stop_event: Optional[threading.Event] = None) -> Dict[str, float]:
+    """
+    Reenvia uma captura para host:port.
+
+    Args:
+        speed (Optional[float]): Fator de aceleração sobre os intervalos originais
+            (1.0 = tempo real); None envia sem pausas (velocidade máxima).
+        stop_event (Optional[threading.Event]): Interrompe a reprodução quando ativado.
+
+    Returns:
+        Dict[str, float]: Datagramas enviados, duração efetiva e atraso máximo face ao agendamento.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 1 << 20)
+    sent = 0
+    max_lag = 0.0
+    first_ns: Optional[int] = None
+    start = time.perf_counter()
+
+    try:
+        for timestamp_ns, datagram in read_capture(path):
+            if stop_event is not None and stop_event.is_set():
+                break
+            if first_ns is None:
+                first_ns = timestamp_ns
+
+            if speed is not None:
+                due = start + (timestamp_ns - first_ns) / 1e9 / speed
+                delay = due - time.perf_counter()
+                # Espera ativa apenas no último milissegundo (granularidade de time.sleep).
+                if delay > 0.001:
+                    time.sleep(delay - 0.001)
+                while time.perf_counter() < due:
+                    pass
+                max_lag = max(max_lag, time.perf_counter() - due)
+
+            sock.sendto(datagram, (host, port))
+            sent += 1
+    finally:
+        sock.close()
+
+    elapsed = time.perf_counter() - start
+    return {'sent': sent, 'elapsed_sec': elapsed, 'max_lag_ms': max_lag * 1000.0}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    info_parser = commands.add_parser("info", help="Resumo de uma captura.")
+    info_parser.add_argument("path")
+
+    replay_parser = commands.add_parser("replay", help="Reenvia uma captura para o recetor.")
+    replay_parser.add_argument("path")
+    replay_parser.add_argument("--speed", default="1", help="Fator de aceleração (1, 2, 10, ...) ou 'max'.")
+    replay_parser.add_argument("--host", default="127.0.0.1")
+    replay_parser.add_argument("--port", type=int, default=settings.UDP_TELEMETRY_PORT)
+    replay_parser.add_argument("--loop", type=int, default=1, help="Número de repetições.")
+    args = parser.parse_args()
+
+    if args.command == "info":
+        info = capture_info(args.path)
+        print(f"{info['records']:,} datagramas | {info['bytes'] / 2**20:.1f} MiB | "
+              f"{info['duration_sec']:.1f} s | {info['datagrams_per_sec']:.0f} datagramas/s")
+        return
+
+    speed = None if args.speed == "max" else float(args.speed)
+    for _ in range(args.loop):
+        result = replay(args.path, speed, args.host, args.port)
+        print(f"Reprodução: {result['sent']:,} datagramas em {result['elapsed_sec']:.2f} s "
+              f"({result['sent'] / max(result['elapsed_sec'], 1e-9):,.0f}/s, atraso máx. {result['max_lag_ms']:.2f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,84 +4,341 @@ Módulo de Exportação de Dados.
 Este módulo fornece funcionalidades para exportar os dados de telemetria
 recuperados do banco de dados para formatos de arquivo comuns (CSV, TXT, NPY),
 facilitando a análise externa em ferramentas como Excel, MATLAB ou scripts Python.
+
+A formatação de texto é vetorizada: cada coluna é convertida em ponto fixo
+para uma matriz de bytes NumPy, e cada bloco de EXPORT_BLOCK_ROWS linhas é
+escrito no ficheiro numa única operação, sem conversões str() nem
+dicionários por linha. Cada valor real é escrito com os algarismos
+significativos (até FLOAT_SIGNIFICANT_DIGITS) que reconstroem o mesmo
+float32, o tipo enviado pelo firmware, sem zeros finais; COLUMN_PRECISION
+fixa a precisão de colunas específicas.
 """
 
-import csv
+import os
 import numpy as np
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable, Sequence, Union
+
+# Esquema do array estruturado produzido pelas exportações NPY.
+NPY_DTYPE = [
+    ('timestamp_amostra_ms', 'i8'),
+    ('valor_adc', 'i4'),
+    ('tensao_mv', 'i4'),
+    ('sinal_controle', 'f8'),
+    ('tensao_estimada_mv', 'f8'),
+    ('erro_obs_mv', 'f8')
+]
+
+# Casas decimais fixas por coluna nas exportações de texto (CSV/TXT); as
+# restantes colunas reais usam precisão adaptativa (_float_precision).
+COLUMN_PRECISION: Dict[str, int] = {
+    'timestamp_amostra_ms': 0,
+    'tensao_filtrada_mv': 2
+}
+
+# Algarismos significativos que garantem a reconstrução exata de um float32.
+FLOAT_SIGNIFICANT_DIGITS: int = 9
+
+# Linhas formatadas e escritas por operação (limita a memória da matriz de bytes).
+EXPORT_BLOCK_ROWS: int = 100_000
+
+# Acima deste módulo (já escalado) o ponto fixo em int64 deixa de ser exato.
+_FIXED_POINT_LIMIT: float = 1e17
+
+# Potências de 10 tabeladas (evita np.power elemento a elemento).
+_POW10: np.ndarray = 10.0 ** np.arange(64)
+_POW10_INT: np.ndarray = 10 ** np.arange(18, dtype=np.int64)
+
+ExportData = Union[List[Dict[str, Any]], Dict[str, np.ndarray]]
+
+
+def _as_columns(data: ExportData) -> Dict[str, np.ndarray]:
+    """Normaliza a entrada (lista de dicionários ou vetores por coluna) para vetores NumPy."""
+    if isinstance(data, dict):
+        return {k: np.asarray(v) for k, v in data.items()}
+    keys = list(data[0].keys())
+    # None -> NaN na conversão para float64.
+    return {k: np.array([row.get(k) for row in data], dtype='f8') for k in keys}
+
+
+def _row_count(columns: Dict[str, np.ndarray]) -> int:
+    return len(next(iter(columns.values()))) if columns else 0
+
+
+def _with_filtered_column(columns: Dict[str, np.ndarray],
+                          filtered_col: Optional[Sequence[float]]) -> Dict[str, np.ndarray]:
+    """Acrescenta 'tensao_filtrada_mv' (alinhada ao início; linhas em falta ficam nulas)."""
+    if filtered_col is None or len(filtered_col) == 0:
+        return columns
+    n = _row_count(columns)
+    filtered = np.full(n, np.nan)
+    m = min(n, len(filtered_col))
+    filtered[:m] = np.asarray(filtered_col, dtype='f8')[:m]
+    columns = dict(columns)
+    columns['tensao_filtrada_mv'] = filtered
+    return columns
+
+
+def _fallback_field(values: np.ndarray, precision: Optional[int], null_token: str) -> np.ndarray:
+    """Formatação escalar (inf, magnitudes fora do ponto fixo) como matriz de bytes."""
+    spec = f".{FLOAT_SIGNIFICANT_DIGITS}g" if precision is None else f".{precision}f"
+    text = [null_token if v != v else format(v, spec) for v in values.astype('f8').tolist()]
+    encoded = np.array(text, dtype='S')
+    return encoded.view(np.uint8).reshape(len(text), encoded.dtype.itemsize)
+
+
+def _ascii_digits(values: np.ndarray, n_digits: int) -> np.ndarray:
+    """Matriz (n, n_digits) com os dígitos ASCII de inteiros não negativos, com zeros à esquerda."""
+    # Divisões sucessivas em uint32 quando possível (mais rápidas) e numa matriz
+    # transposta, para que cada dígito seja escrito numa linha contígua.
+    dtype = np.uint32 if len(values) == 0 or values.max() < 2 ** 32 else np.uint64
+    remaining = values.astype(dtype)
+    ten = dtype(10)
+    digits = np.empty((n_digits, len(values)), dtype=np.uint8)
+    for k in range(n_digits - 1, -1, -1):
+        quotient = remaining // ten
+        digits[k] = remaining - quotient * ten
+        remaining = quotient
+    digits += ord('0')
+    return np.ascontiguousarray(digits.T)
+
+
+def _float_field(values: np.ndarray, null_token: str) -> np.ndarray:
+    """
+    Coluna real com o menor número de algarismos significativos (até
+    FLOAT_SIGNIFICANT_DIGITS) que reconstrói o mesmo float32 de cada valor.
+
+    Cada valor é arredondado às suas próprias casas decimais e as partes
+    inteira e decimal são codificadas em separado, pelo que o texto de um
+    valor não depende do resto do bloco (exportações em streaming e de bloco
+    único são idênticas). Valores fora do ponto fixo (inf, >= 1e17 ou com
+    mais de 17 casas) usam a formatação escalar, apenas nessas linhas.
+    """
+    x = values.astype('f8', copy=False)
+    n = len(x)
+    nulls = np.isnan(x)
+    magnitude = np.abs(np.where(nulls, 0.0, x))
+    nonzero = np.isfinite(magnitude) & (magnitude > 0)
+    exponent = np.zeros(n, dtype=np.int64)
+    exponent[nonzero] = np.floor(np.log10(magnitude[nonzero])).astype(np.int64)
+    decimals = np.where(nonzero, np.maximum(FLOAT_SIGNIFICANT_DIGITS - 1 - exponent, 0), 0)
+
+    # Menos algarismos quando já reconstroem o mesmo float32 (1651.92 e não 1651.92004).
+    # Basta começar em 6: representações mais curtas surgem aí com zeros finais, que são removidos.
+    target = magnitude.astype(np.float32)
+    pending = nonzero.copy()
+    for digits in range(6, FLOAT_SIGNIFICANT_DIGITS):
+        if not pending.any():
+            break
+        candidate = np.minimum(np.maximum(digits - 1 - exponent, 0), len(_POW10) - 1)
+        scale = _POW10[candidate]
+        exact = pending & ((np.rint(magnitude * scale) / scale).astype(np.float32) == target)
+        decimals[exact] = candidate[exact]
+        pending &= ~exact
+
+    scalar = ~nulls & ((magnitude >= _FIXED_POINT_LIMIT) | np.isinf(magnitude) | (decimals >= len(_POW10_INT)))
+    decimals[scalar] = 0
+    magnitude[scalar] = 0.0
+    rounded = np.rint(magnitude * _POW10[decimals]).astype(np.int64)
+    unit = _POW10_INT[decimals]
+    integer, fraction = np.divmod(rounded, unit)
+    precision = int(decimals.max()) if n else 0
+    fraction *= _POW10_INT[precision - decimals]
+
+    # Layout: [sinal][dígitos inteiros][.][precision dígitos decimais]; bytes nulos são descartados.
+    int_digits = len(str(int(integer.max()))) if n else 1
+    scalar_text = [format(v, f".{FLOAT_SIGNIFICANT_DIGITS}g") for v in x[scalar].tolist()]
+    parts = [np.zeros((n, 1), dtype=np.uint8), _ascii_digits(integer, int_digits)]
+    # Zeros à esquerda da parte inteira (exceto o das unidades).
+    significant = np.ones(n, dtype=np.int64)
+    for k in range(1, int_digits):
+        significant += integer >= _POW10_INT[k]
+    parts[1][np.arange(int_digits)[None, :] < (int_digits - significant)[:, None]] = 0
+    if precision:
+        decimal_part = _ascii_digits(fraction, precision)
+        # Zeros finais da parte decimal e o ponto, se esta ficar vazia.
+        trailing = np.logical_and.accumulate(decimal_part[:, ::-1] == ord('0'), axis=1)[:, ::-1]
+        decimal_part[trailing] = 0
+        parts.append(np.where(trailing[:, :1], 0, ord('.')).astype(np.uint8))
+        parts.append(decimal_part)
+    field = np.concatenate(parts, axis=1)
+    field[(x < 0) & (rounded > 0), 0] = ord('-')
+
+    width = max(len(null_token), max(map(len, scalar_text), default=0))
+    if width > field.shape[1]:
+        field = np.concatenate((np.zeros((n, width - field.shape[1]), dtype=np.uint8), field), axis=1)
+
+    special = np.flatnonzero(nulls | scalar)
+    if len(special):
+        field[special] = 0
+        texts = [null_token] * len(special)
+        scalar_rows = iter(scalar_text)
+        for i, row in enumerate(special.tolist()):
+            if scalar[row]:
+                texts[i] = next(scalar_rows)
+        for row, text in zip(special.tolist(), texts):
+            if text:
+                field[row, :len(text)] = np.frombuffer(text.encode('ascii'), dtype=np.uint8)
+    return field
+
+
+def _fixed_point_field(values: np.ndarray, precision: int, null_token: str) -> np.ndarray:
+    """Formata uma coluna com precision casas decimais fixas (ver _digits_field)."""
+    if values.dtype.kind in 'iu':
+        nulls = np.zeros(len(values), dtype=bool)
+        negative = values < 0
+        magnitude = np.abs(values.astype(np.int64)) * 10 ** precision
+    else:
+        x = values.astype('f8', copy=False)
+        nulls = np.isnan(x)
+        scaled = np.rint(np.abs(np.where(nulls, 0.0, x)) * 10 ** precision)
+        if len(x) and not (np.all(np.isfinite(scaled)) and scaled.max() < _FIXED_POINT_LIMIT):
+            return _fallback_field(values, precision, null_token)
+        magnitude = scaled.astype(np.int64)
+        negative = x < 0
+    return _digits_field(magnitude, negative, nulls, precision, null_token)
+
+
+def _digits_field(magnitude: np.ndarray, negative: np.ndarray, nulls: np.ndarray,
+                  precision: int, null_token: str) -> np.ndarray:
+    """
+    Formata magnitudes inteiras já escaladas por 10**precision para uma matriz (n, largura) de bytes ASCII.
 
-def export_to_csv(data: List[Dict[str, Any]], filename: str, filtered_col: Optional[List[float]] = None) -> None:
+    Os campos ficam alinhados à direita e preenchidos com bytes nulos, que são
+    descartados na montagem do bloco (_encode_block). Os dígitos são extraídos
+    por divisão inteira vetorizada.
+    """
+    n = len(magnitude)
+    n_digits = max(len(str(int(magnitude.max()))) if n else 1, precision + 1)
+    point = 1 if precision else 0
+    width = max(n_digits + point + 1, len(null_token))
+    field = np.zeros((n, width), dtype=np.uint8)
+
+    remaining = magnitude.copy()
+    row_digits = np.full(n, precision + 1, dtype=np.int64)
+    col = width - 1
+    for k in range(n_digits):
+        digit = (remaining % 10).astype(np.uint8) + ord('0')
+        remaining //= 10
+        if k <= precision:
+            field[:, col] = digit
+        else:
+            present = magnitude >= 10 ** k
+            field[:, col] = np.where(present, digit, 0)
+            row_digits += present
+        col -= 1
+        if point and k == precision - 1:
+            field[:, col] = ord('.')
+            col -= 1
+
+    # '-0.000' é escrito como '0.000'.
+    signed = np.flatnonzero(negative & (magnitude > 0))
+    field[signed, width - 1 - point - row_digits[signed]] = ord('-')
+
+    if nulls.any():
+        field[nulls] = 0
+        if null_token:
+            field[np.ix_(np.flatnonzero(nulls), np.arange(width - len(null_token), width))] = \
+                np.frombuffer(null_token.encode('ascii'), dtype=np.uint8)
+    return field
+
+
+def _encode_block(columns: Dict[str, np.ndarray], start: int, stop: int,
+                  sep: str, null_token: str, newline: str) -> bytes:
+    """Converte as linhas [start, stop) de todas as colunas em texto delimitado."""
+    n = stop - start
+    sep_byte = np.full((n, 1), ord(sep), dtype=np.uint8)
+    parts = []
+    for i, (name, values) in enumerate(columns.items()):
+        if i:
+            parts.append(sep_byte)
+        block = np.asarray(values[start:stop])
+        precision = COLUMN_PRECISION.get(name, 0 if block.dtype.kind in 'iu' else None)
+        if precision is None:
+            parts.append(_float_field(block, null_token))
+        else:
+            parts.append(_fixed_point_field(block, precision, null_token))
+    parts.append(np.tile(np.frombuffer(newline.encode('ascii'), dtype=np.uint8), (n, 1)))
+
+    matrix = np.concatenate(parts, axis=1).ravel()
+    return matrix[matrix != 0].tobytes()
+
+
+def _write_delimited(f, columns: Dict[str, np.ndarray], sep: str, null_token: str,
+                     newline: str, header: bool) -> int:
+    """Escreve cabeçalho (opcional) e linhas em blocos; devolve o número de linhas."""
+    n = _row_count(columns)
+    if header:
+        f.write((sep.join(columns.keys()) + newline).encode('utf-8'))
+    for start in range(0, n, EXPORT_BLOCK_ROWS):
+        f.write(_encode_block(columns, start, min(start + EXPORT_BLOCK_ROWS, n), sep, null_token, newline))
+    return n
+
+
+def export_to_csv(data: ExportData, filename: str, filtered_col: Optional[Sequence[float]] = None) -> None:
     """
     Exporta uma lista de dados para um arquivo CSV (Comma Separated Values).
 
-    O arquivo gerado inclui um cabeçalho com os nomes das chaves do dicionário.
+    O arquivo gerado inclui um cabeçalho com os nomes das colunas; valores
+    nulos ficam como campo vazio.
 
     Args:
-        data (List[Dict[str, Any]]): Lista de dicionários contendo os dados a serem exportados.
+        data (ExportData): Lista de dicionários ou vetores por coluna (database.get_telemetry_columns).
         filename (str): Caminho completo (incluindo nome e extensão) do arquivo de saída.
+        filtered_col (Optional[Sequence[float]]): Sinal filtrado, exportado como 'tensao_filtrada_mv'.
     """
 
-    if not data:
+    if not data or (isinstance(data, dict) and _row_count(data) == 0):
         print("Exportar CSV: Nenhum dado para exportar.")
         return
-    # Cria uma cópia rasa para não alterar os dados originais na memória
-    export_data = [d.copy() for d in data]
 
-    # Injeta a coluna filtrada se fornecida
-    if filtered_col and len(filtered_col) == len(export_data):
-        for i, row in enumerate(export_data):
-            row['tensao_filtrada_mv'] = round(filtered_col[i], 2)
-
-    headers = export_data[0].keys()
+    columns = _with_filtered_column(_as_columns(data), filtered_col)
 
     print(f"Exportando CSV para {filename}...")
     try:
-        with open(filename, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=headers)
-            writer.writeheader()
-            writer.writerows(export_data)
+        with open(filename, 'wb') as f:
+            _write_delimited(f, columns, ',', '', '\r\n', header=True)
         print("Exportação CSV concluída.")
     except Exception as e:
         print(f"ERRO CSV: {e}")
 
-def export_to_txt(data: List[Dict[str, Any]], filename: str, filtered_col: Optional[List[float]] = None) -> None:
+def export_to_txt(data: ExportData, filename: str, filtered_col: Optional[Sequence[float]] = None) -> None:
     """
     Exporta uma lista de dados para um arquivo de texto tabulado (.txt).
 
     Os valores são separados por tabulação ('\\t'), útil para importação
     em softwares que não suportam CSV padrão ou para visualização simples.
+    Valores nulos são escritos como 'None'.
 
     Args:
-        data (List[Dict[str, Any]]): Lista de dicionários contendo os dados.
+        data (ExportData): Lista de dicionários ou vetores por coluna.
         filename (str): Caminho do arquivo de saída.
+        filtered_col (Optional[Sequence[float]]): Sinal filtrado, exportado como 'tensao_filtrada_mv'.
     """
 
-    if not data:
+    if not data or (isinstance(data, dict) and _row_count(data) == 0):
         print("Exportar TXT: Nenhum dado para exportar.")
         return
 
-    # Lógica similar de injeção
-    keys = list(data[0].keys())
-    if filtered_col:
-        keys.append('tensao_filtrada_mv')
+    columns = _with_filtered_column(_as_columns(data), filtered_col)
 
     print(f"Exportando TXT para {filename}...")
     try:
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write('\t'.join(keys) + '\n')
-            for i, row in enumerate(data):
-                values = [str(row.get(k, '')) for k in row.keys()]
-                
-                # Adiciona valor do filtro se existir
-                if filtered_col and i < len(filtered_col):
-                    values.append(f"{filtered_col[i]:.2f}")
-                
-                f.write('\t'.join(values) + '\n')
+        with open(filename, 'wb') as f:
+            _write_delimited(f, columns, '\t', 'None', os.linesep, header=True)
         print("Exportação TXT concluída.")
     except Exception as e:
         print(f"ERRO TXT: {e}")
 
-def export_to_npy(data: List[Dict[str, Any]], filename: str) -> None:
+def _fill_structured(out: np.ndarray, columns: Dict[str, np.ndarray], offset: int, n: int) -> None:
+    """Copia n linhas de vetores por coluna para o array estruturado (nulos inteiros -> 0)."""
+    for name, dtype in NPY_DTYPE:
+        values = np.asarray(columns[name][:n]) if name in columns else np.zeros(n)
+        if np.dtype(dtype).kind == 'i':
+            values = np.nan_to_num(values, nan=0.0)
+        out[name][offset:offset + n] = values
+
+
+def export_to_npy(data: ExportData, filename: str) -> None:
     """
     Exporta os dados para um arquivo binário NumPy (.npy).
 
@@ -95,41 +352,76 @@ def export_to_npy(data: List[Dict[str, Any]], filename: str) -> None:
     - sinal_controle: Ponto flutuante 64-bit (f8)
 
     Args:
-        data (List[Dict[str, Any]]): Lista de dicionários contendo os dados.
+        data (ExportData): Lista de dicionários ou vetores por coluna.
         filename (str): Caminho do arquivo de saída.
     """
 
-    if not data:
+    if not data or (isinstance(data, dict) and _row_count(data) == 0):
         print("Exportar NPY: Nenhum dado para exportar.")
         return
 
-    print(f"Convertendo e exportando {len(data)} linhas para NPY em {filename}...")
+    columns = _as_columns(data)
+    n = _row_count(columns)
+    print(f"Convertendo e exportando {n} linhas para NPY em {filename}...")
     try:
-        # Define o esquema (schema) do array estruturado
-        dtype = [
-            ('timestamp_amostra_ms', 'i8'),
-            ('valor_adc', 'i4'),
-            ('tensao_mv', 'i4'),
-            ('sinal_controle', 'f8'),
-            ('tensao_estimada_mv', 'f8'),
-            ('erro_obs_mv', 'f8')
-        ]
-
-        lista_de_tuplas = [
-            (
-                d.get('timestamp_amostra_ms', 0),
-                d.get('valor_adc', 0),
-                d.get('tensao_mv', 0),
-                d.get('sinal_controle', 0.0),
-                d.get('tensao_estimada_mv', 0.0) if d.get('tensao_estimada_mv') is not None else np.nan,
-                d.get('erro_obs_mv', 0.0) if d.get('erro_obs_mv') is not None else np.nan
-            )
-            for d in data
-        ]
-
-        structured_array = np.array(lista_de_tuplas, dtype=dtype)
+        structured_array = np.empty(n, dtype=NPY_DTYPE)
+        _fill_structured(structured_array, columns, 0, n)
 
         np.save(filename, structured_array)
         print("Exportação NPY concluída.")
     except Exception as e:
-        print(f"ERRO ao exportar para NPY: {e}")
\ No newline at end of file
+        print(f"ERRO ao exportar para NPY: {e}")
+
+def export_chunks_to_csv(chunks: Iterable[Dict[str, np.ndarray]], filename: str) -> int:
+    """
+    Exporta blocos colunares (p.ex. database.iter_telemetry_chunks) para CSV em streaming.
+
+    Produz o mesmo layout de export_to_csv (cabeçalho com os nomes das colunas,
+    nulos como campo vazio) sem reter a sessão em memória.
+
+    Returns:
+        int: Número de linhas escritas.
+    """
+    written = 0
+    with open(filename, 'wb') as f:
+        for chunk in chunks:
+            written += _write_delimited(f, chunk, ',', '', '\r\n', header=(written == 0))
+    return written
+
+
+def export_chunks_to_txt(chunks: Iterable[Dict[str, np.ndarray]], filename: str) -> int:
+    """
+    Exporta blocos colunares para texto tabulado em streaming (layout de export_to_txt).
+
+    Returns:
+        int: Número de linhas escritas.
+    """
+    written = 0
+    with open(filename, 'wb') as f:
+        for chunk in chunks:
+            written += _write_delimited(f, chunk, '\t', 'None', os.linesep, header=(written == 0))
+    return written
+
+
+def export_chunks_to_npy(chunks: Iterable[Dict[str, np.ndarray]], filename: str, total_rows: int) -> int:
+    """
+    Exporta blocos colunares para um array estruturado .npy (esquema NPY_DTYPE).
+
+    O ficheiro é pré-alocado com np.lib.format.open_memmap e preenchido bloco
+    a bloco, pelo que o consumo de memória não depende da duração da sessão.
+
+    Args:
+        total_rows (int): Número total de amostras (dimensiona o ficheiro).
+
+    Returns:
+        int: Número de linhas escritas.
+    """
+    out = np.lib.format.open_memmap(filename, mode='w+', dtype=NPY_DTYPE, shape=(total_rows,))
+    written = 0
+    for chunk in chunks:
+        n = min(_row_count(chunk), total_rows - written)
+        _fill_structured(out, chunk, written, n)
+        written += n
+    out.flush()
+    del out
+    return written
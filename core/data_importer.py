@@ -0,0 +1,223 @@
+"""
+Módulo de Importação de Dados.
+
+Operação inversa de core.data_exporter: carrega ficheiros CSV, TXT (tabulado)
+e NPY (array estruturado) de volta para a base de dados como novos
+experimentos concluídos, permitindo analisá-los no visualizador de histórico.
+
+A interpretação das colunas é vetorizada (NumPy) e a inserção decorre em
+transações curtas de IMPORT_CHUNK_ROWS linhas, para que o DB Writer de uma
+gravação em curso nunca fique bloqueado pelo lock de escrita. Durante a
+importação o experimento tem status 'importing' (não listado); uma
+importação interrompida é expurgada no arranque. São reconhecidas as colunas de telemetria pelo
+nome do cabeçalho (ou do campo NPY); colunas extra, como 'tensao_filtrada_mv',
+são ignoradas e colunas ausentes ficam a NULL.
+
+Uso em linha de comandos (a partir da raiz do projeto):
+    python -m core.data_importer experimento_20.csv sessao_12.npy
+"""
+
+import argparse
+import io
+import itertools
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import numpy as np
+
+import core.database as database
+import core.decimation as decimation
+
+# Linhas interpretadas/inseridas por bloco e transação, e pausa entre transações (cede o lock ao DB Writer).
+IMPORT_CHUNK_ROWS: int = 20_000
+IMPORT_CHUNK_PAUSE_SEC: float = 0.02
+
+
+def _parse_block(body: str, sep: str, n_columns: int) -> np.ndarray:
+    """Converte um bloco de linhas de dados numa matriz float64 (NULL/None/vazio -> NaN)."""
+    # Normalização em bloco (C) dos valores nulos produzidos pelos exportadores:
+    # campos vazios do csv.DictWriter e 'None' do export_to_txt.
+    body = body.replace("None", "nan")
+    empty, filled = sep + sep, sep + "nan" + sep
+    body = body.replace(empty, filled).replace(empty, filled)
+    body = body.replace(sep + "\n", sep + "nan\n").replace("\n" + sep, "\nnan" + sep)
+    if body.startswith(sep):
+        body = "nan" + body
+    if body.endswith(sep):
+        body += "nan"
+
+    matrix = np.loadtxt(io.StringIO(body), delimiter=sep, dtype="f8", ndmin=2)
+    if matrix.shape[0] and matrix.shape[1] != n_columns:
+        raise ValueError(f"{n_columns} colunas no cabeçalho e {matrix.shape[1]} nos dados.")
+    return matrix
+
+
+def _parse_text(filename: str) -> Dict[str, np.ndarray]:
+    """
+    Lê um CSV/TXT com cabeçalho para vetores por coluna (NULL/None/vazio -> NaN).
+
+    O ficheiro é interpretado em blocos de IMPORT_CHUNK_ROWS linhas: cada
+    np.loadtxt retém o GIL, e um único bloco com a sessão inteira pararia as
+    threads de receção e de escrita durante segundos.
+    """
+    with open(filename, "r", encoding="utf-8") as f:
+        header = f.readline().strip()
+        sep = "\t" if "\t" in header else ","
+        names = [h.strip().strip('"') for h in header.split(sep)]
+        blocks = []
+        while True:
+            lines = list(itertools.islice(f, IMPORT_CHUNK_ROWS))
+            if not lines:
+                break
+            blocks.append(_parse_block("".join(lines), sep, len(names)))
+
+    matrix = np.concatenate(blocks) if blocks else np.empty((0, len(names)))
+    return {name: matrix[:, i] for i, name in enumerate(names)}
+
+
+def _parse_npy(filename: str) -> Dict[str, np.ndarray]:
+    """Lê um array estruturado produzido por export_to_npy."""
+    array = np.load(filename, allow_pickle=False)
+    if array.dtype.names is None:
+        raise ValueError("O ficheiro NPY não contém um array estruturado com nomes de colunas.")
+    return {name: array[name] for name in array.dtype.names}
+
+
+def read_experiment_file(filename: str) -> Dict[str, np.ndarray]:
+    """
+    Interpreta um ficheiro exportado e devolve as colunas de telemetria reconhecidas.
+
+    Returns:
+        Dict[str, np.ndarray]: Vetores tipados (TELEMETRY_DTYPES), ordenados no tempo.
+    """
+    ext = os.path.splitext(filename)[1].lower()
+    raw = _parse_npy(filename) if ext == ".npy" else _parse_text(filename)
+
+    if "timestamp_amostra_ms" not in raw:
+        raise ValueError("Coluna obrigatória 'timestamp_amostra_ms' ausente.")
+
+    n = len(raw["timestamp_amostra_ms"])
+    columns = {}
+    for c in database.TELEMETRY_COLUMNS:
+        if c in raw:
+            columns[c] = np.asarray(raw[c]).astype(database.TELEMETRY_DTYPES[c])
+        else:
+            columns[c] = np.full(n, np.nan)
+
+    ts = columns["timestamp_amostra_ms"]
+    if n > 1 and np.any(ts[1:] < ts[:-1]):
+        order = np.argsort(ts, kind="stable")
+        columns = {c: v[order] for c, v in columns.items()}
+    return columns
+
+
+def import_experiment_file(filename: str, build_pyramid: bool = True) -> Optional[int]:
+    """
+    Importa um ficheiro como novo experimento concluído.
+
+    O instante de fim é a data de modificação do ficheiro e o de início é
+    derivado da duração coberta por timestamp_amostra_ms; timestamp_recebimento
+    é reconstruído a partir dessa base.
+
+    Args:
+        filename (str): Caminho do .csv, .txt ou .npy.
+        build_pyramid (bool): Consolida de imediato a pirâmide de decimação.
+
+    Returns:
+        Optional[int]: ID do novo experimento, ou None em caso de falha.
+    """
+    print(f"Importando {filename}...")
+    start = time.perf_counter()
+    try:
+        columns = read_experiment_file(filename)
+    except Exception as e:
+        print(f"ERRO IMPORT: {filename}: {e}")
+        return None
+
+    ts = columns["timestamp_amostra_ms"]
+    if len(ts) == 0:
+        print(f"Importar: {filename} não contém amostras.")
+        return None
+
+    fim = datetime.fromtimestamp(os.path.getmtime(filename))
+    inicio = fim - timedelta(milliseconds=int(ts[-1] - ts[0]))
+    recebimento = np.datetime64(inicio, "ms") + (ts - ts[0]).astype("timedelta64[ms]")
+
+    try:
+        conn = database.connect_for_write()
+    except Exception as e:
+        print(f"ERRO IMPORT: {filename}: {e}")
+        return None
+
+    exp_id = None
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            "INSERT INTO experimentos (timestamp_inicio, timestamp_fim, status) VALUES (?, ?, 'importing')",
+            (inicio.isoformat(), fim.isoformat())
+        )
+        exp_id = cursor.lastrowid
+        conn.commit()
+
+        insert_sql = f"""
+            INSERT INTO telemetria (
+                id_experimento, timestamp_recebimento, {", ".join(database.TELEMETRY_COLUMNS)}
+            ) VALUES (?, ?, {", ".join("?" * len(database.TELEMETRY_COLUMNS))})
+        """
+        arrays = [columns[c] for c in database.TELEMETRY_COLUMNS]
+        for first in range(0, len(ts), IMPORT_CHUNK_ROWS):
+            last = min(first + IMPORT_CHUNK_ROWS, len(ts))
+            # Conversão em bloco por coluna; NaN é convertido em NULL na associação de parâmetros.
+            cursor.executemany(insert_sql, zip(
+                itertools.repeat(exp_id, last - first),
+                np.datetime_as_string(recebimento[first:last], unit="ms").tolist(),
+                *(v[first:last].tolist() for v in arrays)
+            ))
+            conn.commit()
+            time.sleep(IMPORT_CHUNK_PAUSE_SEC)
+
+        cursor.execute("UPDATE experimentos SET status = 'completed' WHERE id = ?", (exp_id,))
+        conn.commit()
+    except Exception as e:
+        print(f"ERRO IMPORT: Falha na transação de {filename}: {e}")
+        conn.rollback()
+        conn.close()
+        if exp_id is not None:
+            database.delete_experiment(exp_id)
+        return None
+    conn.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"--- IMPORTADO --- ID: {exp_id} ({len(ts)} amostras em {elapsed:.2f} s) ---")
+
+    if build_pyramid:
+        decimation.build_pyramid(exp_id)
+    return exp_id
+
+
+def import_files(filenames: List[str], build_pyramid: bool = True) -> List[int]:
+    """Importa vários ficheiros, devolvendo os IDs dos experimentos criados."""
+    imported = []
+    for filename in filenames:
+        exp_id = import_experiment_file(filename, build_pyramid)
+        if exp_id is not None:
+            imported.append(exp_id)
+    return imported
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Importa ficheiros CSV/TXT/NPY como experimentos.")
+    parser.add_argument("files", nargs="+", help="Ficheiros produzidos por core.data_exporter.")
+    parser.add_argument("--no-pyramid", action="store_true",
+                        help="Não consolida a pirâmide de decimação (fica para o preenchimento retroativo).")
+    args = parser.parse_args()
+
+    database.init_db()
+    imported = import_files(args.files, build_pyramid=not args.no_pyramid)
+    print(f"Importação: {len(imported)}/{len(args.files)} ficheiro(s) importado(s): {imported}")
+
+
+if __name__ == "__main__":
+    main()
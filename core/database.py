@@ -4,12 +4,21 @@ Módulo de Gerenciamento de Banco de Dados (SQLite).
 Responsável por todas as operações de persistência de dados. Implementa 
 configurações de alto desempenho (WAL) e resolução de caminho absoluto
 para assegurar a integridade dos dados independente do diretório de chamada.
+As leituras de sessões arquivadas (ver core.archive) são servidas de forma
+transparente a partir dos respetivos segmentos colunares.
 """
 
+import argparse
 import sqlite3
 import os
+import shutil
+import time
+import numpy as np
 from datetime import datetime
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Sequence, Tuple, Callable, Iterator
+
+import core.profiling as profiling
+import core.segment_store as segment_store
 
 # Resolução dinâmica do caminho absoluto base do projeto.
 # Garante a convergência para o mesmo ficheiro físico 'motor_data.db' na raiz do projeto.
@@ -19,6 +28,94 @@ DB_FILE = os.path.join(BASE_DIR, "motor_data.db")
 current_run_id: Optional[int] = None
 is_recording_enabled: bool = False
 
+# Colunas numéricas da telemetria expostas às consultas analíticas.
+# Serve de lista branca para os nomes de coluna interpolados em SQL dinâmico.
+TELEMETRY_COLUMNS: Tuple[str, ...] = (
+    "timestamp_amostra_ms", "valor_adc", "tensao_mv", "sinal_controle",
+    "tensao_estimada_mv", "erro_obs_mv", "estado_1", "estado_2", "estado_3"
+)
+
+
+# Subscritores notificados (com o ID) após a consolidação de cada experimento.
+_close_listeners: List[Callable[[int], None]] = []
+
+
+def add_close_listener(listener: Callable[[int], None]) -> None:
+    """Regista uma rotina a invocar sempre que um experimento é consolidado."""
+    if listener not in _close_listeners:
+        _close_listeners.append(listener)
+
+
+# Tipos NumPy da leitura colunar. Apenas o eixo temporal é inteiro; os restantes
+# canais chegam como float32 do firmware e podem conter NULL (mapeado para NaN).
+TELEMETRY_DTYPES: Dict[str, str] = {c: ('i8' if c == "timestamp_amostra_ms" else 'f8') for c in TELEMETRY_COLUMNS}
+
+# Colunas declaradas INTEGER na tabela telemetria: o SQLite devolve nelas int para valores inteiros.
+_INTEGER_AFFINITY_COLUMNS: Tuple[str, ...] = ("timestamp_amostra_ms", "valor_adc", "tensao_mv")
+
+# Dimensão dos blocos extraídos via fetchmany() nas leituras colunares.
+COLUMNAR_FETCH_SIZE: int = 65536
+
+# Dimensão por omissão (amostras) dos blocos do leitor em streaming.
+STREAM_CHUNK_SIZE: int = 100_000
+
+# Expurgo em blocos: linhas por transação e pausa entre transações, cedendo
+# o lock de escrita ao DB Writer durante gravações ativas.
+DELETE_CHUNK_ROWS: int = 20_000
+DELETE_CHUNK_PAUSE_SEC: float = 0.02
+
+# Páginas libertadas por cada passo de PRAGMA incremental_vacuum em tempo ocioso.
+VACUUM_PAGES_PER_STEP: int = 2000
+
+# Intervalo (s) entre linhas de progresso da migração para auto_vacuum=INCREMENTAL.
+VACUUM_PROGRESS_SEC: float = 5.0
+
+
+def connect_for_write() -> sqlite3.Connection:
+    """
+    Abre uma ligação destinada a escritas, aplicando a política de checkpoint do WAL.
+
+    Durante gravações ativas o auto-checkpoint do SQLite é desligado nesta ligação,
+    para que nenhum commit (em particular os do DB Writer) absorva o custo de um
+    checkpoint; a descarga do WAL fica a cargo de core.wal_checkpoint.
+    """
+    conn = sqlite3.connect(DB_FILE)
+    if is_recording_enabled:
+        conn.execute("PRAGMA wal_autocheckpoint=0;")
+    return conn
+
+
+def connect_writer() -> sqlite3.Connection:
+    """
+    Abre a ligação persistente do DB Writer, com o auto-checkpoint sempre desligado.
+
+    Mantida aberta durante toda a vida da thread de escrita: enquanto existir,
+    o fecho de outras ligações nunca é o "último fecho" que faria o SQLite
+    transferir e apagar o -wal, pelo que os checkpoints ficam exclusivamente a
+    cargo de core.wal_checkpoint.
+    """
+    conn = sqlite3.connect(DB_FILE)
+    conn.execute("PRAGMA wal_autocheckpoint=0;")
+    return conn
+
+
+def connect_read_only() -> sqlite3.Connection:
+    """
+    Abre uma ligação apenas de leitura (URI mode=ro).
+
+    Usada pelos leitores em streaming, incluindo os de processos de exportação
+    paralela, que nunca devem adquirir o lock de escrita nem fazer checkpoints.
+    """
+    return sqlite3.connect(f"file:{DB_FILE}?mode=ro", uri=True)
+
+
+def _validate_columns(columns: Sequence[str]) -> List[str]:
+    """Rejeita nomes de coluna fora da lista branca da telemetria."""
+    invalid = [c for c in columns if c not in TELEMETRY_COLUMNS]
+    if invalid:
+        raise ValueError(f"Colunas de telemetria desconhecidas: {invalid}")
+    return list(columns)
+
 
 def _create_new_experiment() -> Optional[int]:
     """
@@ -66,6 +163,84 @@ def start_new_experiment() -> None:
     _create_new_experiment()
 
 
+def reserve_experiment() -> Optional[int]:
+    """
+    Pré-aloca um registo de experimento com status 'reserved' (gravação por gatilho).
+
+    O disparo, na thread de receção, apenas o ativa em memória
+    (activate_reserved_experiment), sem qualquer I/O nessa thread. Registos
+    'reserved' não usados são removidos por release_reserved_experiment ou no arranque.
+    """
+    try:
+        conn = sqlite3.connect(DB_FILE)
+        try:
+            cursor = conn.execute(
+                "INSERT INTO experimentos (timestamp_inicio, status) VALUES (?, 'reserved')",
+                (datetime.now().isoformat(),)
+            )
+            conn.commit()
+            return cursor.lastrowid
+        finally:
+            conn.close()
+    except Exception as e:
+        print(f"ERRO ao reservar experimento: {e}")
+        return None
+
+
+def release_reserved_experiment(exp_id: int) -> None:
+    """Remove um registo reservado que não chegou a ser ativado."""
+    try:
+        conn = sqlite3.connect(DB_FILE)
+        try:
+            conn.execute("DELETE FROM experimentos WHERE id = ? AND status = 'reserved'", (exp_id,))
+            conn.commit()
+        finally:
+            conn.close()
+    except Exception as e:
+        print(f"ERRO ao libertar a reserva {exp_id}: {e}")
+
+
+def activate_reserved_experiment(exp_id: int) -> None:
+    """Torna exp_id o experimento corrente, apenas em memória (seguro na thread de receção)."""
+    global current_run_id, is_recording_enabled
+    current_run_id = exp_id
+    is_recording_enabled = True
+    print(f"--- NOVO EXPERIMENTO INICIADO (RESERVA) --- ID: {exp_id} ---")
+
+
+def mark_experiment_running(exp_id: int, timestamp_inicio: str) -> None:
+    """Regista em disco o início efetivo de um experimento reservado."""
+    try:
+        conn = sqlite3.connect(DB_FILE)
+        try:
+            conn.execute(
+                "UPDATE experimentos SET timestamp_inicio = ?, status = 'running' WHERE id = ? AND status = 'reserved'",
+                (timestamp_inicio, exp_id)
+            )
+            conn.commit()
+        finally:
+            conn.close()
+    except Exception as e:
+        print(f"ERRO ao ativar o experimento {exp_id}: {e}")
+
+
+def detach_experiment(exp_id: int) -> bool:
+    """
+    Cessa a gravação de exp_id apenas em memória (seguro na thread de receção).
+    A consolidação em disco fica a cargo de consolidate_experiment.
+
+    Returns:
+        bool: Falso se exp_id já não era o experimento corrente.
+    """
+    global current_run_id, is_recording_enabled
+    if current_run_id != exp_id:
+        return False
+    is_recording_enabled = False
+    current_run_id = None
+    print("DB: Gravação I/O SUSPENSA.")
+    return True
+
+
 def close_current_experiment() -> None:
     """Consolida os metadados do experimento corrente e cessa a gravação I/O."""
     global current_run_id, is_recording_enabled
@@ -76,7 +251,19 @@ def close_current_experiment() -> None:
     if current_run_id is None:
         return
 
-    print(f"Consolidando metadados do experimento ID: {current_run_id}...")
+    if consolidate_experiment(current_run_id):
+        current_run_id = None
+
+
+def consolidate_experiment(exp_id: int) -> bool:
+    """
+    Fecha em disco o experimento exp_id (instante final e status 'completed')
+    e notifica os subscritores de consolidação.
+
+    Returns:
+        bool: Verdadeiro se a consolidação foi gravada.
+    """
+    print(f"Consolidando metadados do experimento ID: {exp_id}...")
     try:
         conn = sqlite3.connect(DB_FILE)
         cursor = conn.cursor()
@@ -85,7 +272,7 @@ def close_current_experiment() -> None:
         
         cursor.execute(
             "SELECT timestamp_recebimento FROM telemetria WHERE id_experimento = ? ORDER BY timestamp_recebimento DESC LIMIT 1", 
-            (current_run_id,)
+            (exp_id,)
         )
         last_telemetry_time = cursor.fetchone()
 
@@ -94,15 +281,22 @@ def close_current_experiment() -> None:
 
         cursor.execute(
             "UPDATE experimentos SET timestamp_fim = ?, status = 'completed' WHERE id = ?", 
-            (timestamp_fim, current_run_id)
+            (timestamp_fim, exp_id)
         )
 
         conn.commit()
         conn.close()
-        print(f"--- EXPERIMENTO CONCLUÍDO E INDEXADO --- ID: {current_run_id} ---")
-        current_run_id = None
+        print(f"--- EXPERIMENTO CONCLUÍDO E INDEXADO --- ID: {exp_id} ---")
     except Exception as e:
-        print(f"ERRO ao consolidar experimento {current_run_id}: {e}")
+        print(f"ERRO ao consolidar experimento {exp_id}: {e}")
+        return False
+
+    for listener in _close_listeners:
+        try:
+            listener(exp_id)
+        except Exception as e:
+            print(f"ERRO no subscritor de consolidação ({exp_id}): {e}")
+    return True
 
 
 def init_db() -> None:
@@ -112,7 +306,19 @@ def init_db() -> None:
     """
     conn = sqlite3.connect(DB_FILE)
     cursor = conn.cursor()
-    
+
+    # Recuperação incremental de espaço. Numa base nova o modo aplica-se de
+    # imediato (antes de criar tabelas); em ficheiros pré-existentes exige um
+    # VACUUM integral, que nunca corre no arranque (ver migrate_auto_vacuum).
+    if needs_auto_vacuum_migration(conn):
+        cursor.execute("SELECT COUNT(*) FROM sqlite_master;")
+        if cursor.fetchone()[0] == 0:
+            cursor.execute("PRAGMA auto_vacuum=INCREMENTAL;")
+        else:
+            size_mb = os.path.getsize(DB_FILE) / 2**20
+            print(f"DB: auto_vacuum=INCREMENTAL pendente ({size_mb:.0f} MiB). Com a aplicação fechada, "
+                  f"execute 'python -m core.database --migrate-auto-vacuum' (requer ~2x o espaço em disco).")
+
     cursor.execute("PRAGMA journal_mode=WAL;")
     cursor.execute("PRAGMA synchronous=NORMAL;")
     cursor.execute("PRAGMA cache_size=-64000;")
@@ -143,6 +349,33 @@ def init_db() -> None:
         )
     """)
 
+    # Índice composto para consultas por intervalo temporal (zoom/pan do visualizador).
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_telemetria_exp_ts
+        ON telemetria (id_experimento, timestamp_amostra_ms)
+    """)
+
+    # Pirâmide de decimação min/max/média por experimento, canal e nível (ver core.decimation).
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS telemetria_piramide (
+            id_experimento INTEGER NOT NULL,
+            canal TEXT NOT NULL,
+            nivel INTEGER NOT NULL,
+            balde INTEGER NOT NULL,
+            t_inicio_ms INTEGER NOT NULL,
+            t_fim_ms INTEGER NOT NULL,
+            n_amostras INTEGER NOT NULL,
+            v_min REAL,
+            v_max REAL,
+            v_media REAL,
+            PRIMARY KEY (id_experimento, canal, nivel, balde)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_piramide_tempo
+        ON telemetria_piramide (id_experimento, canal, nivel, t_inicio_ms)
+    """)
+
     for col, def_type in [
         ("timestamp_fim", "TEXT"),
         ("status", "TEXT NOT NULL DEFAULT 'running'"),
@@ -150,7 +383,9 @@ def init_db() -> None:
         ("erro_obs_mv", "REAL"),
         ("estado_1", "REAL"),
         ("estado_2", "REAL"),
-        ("estado_3", "REAL")
+        ("estado_3", "REAL"),
+        ("arquivo_segmento", "TEXT"),
+        ("etiqueta", "TEXT")
     ]:
         try:
             cursor.execute(f"ALTER TABLE experimentos ADD COLUMN {col} {def_type}")
@@ -164,18 +399,23 @@ def init_db() -> None:
     conn.close()
 
 
-def insert_data_batch(batch_data: List[Dict[str, Any]]) -> None:
+@profiling.span('insert_data_batch')
+def insert_data_batch(batch_data: List[Dict[str, Any]], conn: Optional[sqlite3.Connection] = None) -> None:
     """
     Executa a injeção em lote (Bulk Insert) de estruturas de telemetria.
 
     Args:
         batch_data (List[Dict[str, Any]]): Vetor de dicionários contendo métricas.
+        conn (Optional[sqlite3.Connection]): Ligação persistente do chamador (DB Writer,
+            ver connect_writer); omitida, é aberta e fechada uma ligação própria.
     """
     if not batch_data:
         return
 
+    owns_connection = conn is None
     try:
-        conn = sqlite3.connect(DB_FILE)
+        if owns_connection:
+            conn = connect_for_write()
         cursor = conn.cursor()
 
         tuples_to_insert = []
@@ -207,9 +447,13 @@ def insert_data_batch(batch_data: List[Dict[str, Any]]) -> None:
             """, tuples_to_insert)
         
         conn.commit()
-        conn.close()
     except Exception as e:
         print(f"ERRO DE I/O: Falha na transação em lote: {e}")
+        if conn is not None and not owns_connection:
+            conn.rollback()
+    finally:
+        if owns_connection and conn is not None:
+            conn.close()
 
 
 def get_completed_experiments() -> List[Dict[str, Any]]:
@@ -249,8 +493,120 @@ def get_completed_experiments() -> List[Dict[str, Any]]:
         return []
 
 
+def set_experiment_tag(exp_id: int, tag: Optional[str]) -> bool:
+    """Atribui (ou remove, com None) a etiqueta livre de um experimento."""
+    try:
+        conn = sqlite3.connect(DB_FILE)
+        conn.execute("UPDATE experimentos SET etiqueta = ? WHERE id = ?", (tag, exp_id))
+        conn.commit()
+        conn.close()
+        return True
+    except Exception:
+        return False
+
+
+def select_experiments(id_min: Optional[int] = None, id_max: Optional[int] = None,
+                       date_from: Optional[str] = None, date_to: Optional[str] = None,
+                       tag: Optional[str] = None) -> List[int]:
+    """
+    Seleciona experimentos concluídos por intervalo de IDs, de datas e/ou etiqueta.
+
+    Args:
+        id_min (Optional[int]): ID mínimo (inclusivo).
+        id_max (Optional[int]): ID máximo (inclusivo).
+        date_from (Optional[str]): Data inicial 'AAAA-MM-DD' (inclusiva) de timestamp_inicio.
+        date_to (Optional[str]): Data final 'AAAA-MM-DD' (inclusiva) de timestamp_inicio.
+        tag (Optional[str]): Etiqueta exata.
+
+    Returns:
+        List[int]: IDs ordenados de forma crescente.
+    """
+    clauses, params = ["status = 'completed'"], []
+    if id_min is not None:
+        clauses.append("id >= ?")
+        params.append(int(id_min))
+    if id_max is not None:
+        clauses.append("id <= ?")
+        params.append(int(id_max))
+    if date_from:
+        clauses.append("substr(timestamp_inicio, 1, 10) >= ?")
+        params.append(date_from)
+    if date_to:
+        clauses.append("substr(timestamp_inicio, 1, 10) <= ?")
+        params.append(date_to)
+    if tag:
+        clauses.append("etiqueta = ?")
+        params.append(tag)
+
+    try:
+        conn = sqlite3.connect(DB_FILE)
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT id FROM experimentos WHERE {' AND '.join(clauses)} ORDER BY id ASC", params)
+        ids = [row[0] for row in cursor.fetchall()]
+        conn.close()
+        return ids
+    except Exception:
+        return []
+
+
+def get_archive_segment(exp_id: int) -> Optional[str]:
+    """
+    Caminho absoluto do segmento arquivado de uma sessão.
+
+    Returns:
+        Optional[str]: Caminho do .npz, ou None se a telemetria estiver na base de dados.
+    """
+    try:
+        conn = sqlite3.connect(DB_FILE)
+        cursor = conn.cursor()
+        cursor.execute("SELECT arquivo_segmento FROM experimentos WHERE id = ?", (exp_id,))
+        row = cursor.fetchone()
+        conn.close()
+    except Exception:
+        return None
+
+    if not row or not row[0]:
+        return None
+    return row[0] if os.path.isabs(row[0]) else os.path.join(BASE_DIR, row[0])
+
+
+def _archived_columns(segment: str, cols: Sequence[str],
+                      t_min_ms: Optional[int] = None,
+                      t_max_ms: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """Janela temporal (inclusiva) de um segmento arquivado, via pesquisa binária no eixo temporal."""
+    arrays = segment_store.load_segment(segment, list(dict.fromkeys(["timestamp_amostra_ms"] + list(cols))))
+    ts = arrays["timestamp_amostra_ms"]
+    lo = 0 if t_min_ms is None else int(np.searchsorted(ts, t_min_ms, side="left"))
+    hi = len(ts) if t_max_ms is None else int(np.searchsorted(ts, t_max_ms, side="right"))
+    return {c: arrays[c][lo:hi] for c in cols}
+
+
+def _legacy_values(column: str, values: np.ndarray) -> List[Any]:
+    """
+    Valores de um segmento com os tipos de uma leitura SQLite: NaN como None e,
+    nas colunas de afinidade INTEGER, valores inteiros como int.
+    """
+    if values.dtype.kind in "iu":
+        return values.tolist()
+    out = values.astype(object)
+    if column in _INTEGER_AFFINITY_COLUMNS:
+        integral = np.isfinite(values) & (values == np.rint(values))
+        out[integral] = values[integral].astype(np.int64).tolist()
+    out[np.isnan(values)] = None
+    return out.tolist()
+
+
 def get_telemetry_for_experiment(exp_id: int) -> List[Dict[str, Any]]:
     """Extração de matriz de telemetria estruturada para análise analítica."""
+    segment = get_archive_segment(exp_id)
+    if segment:
+        try:
+            arrays = _archived_columns(segment, TELEMETRY_COLUMNS)
+            columns = [_legacy_values(c, arrays[c]) for c in TELEMETRY_COLUMNS]
+            return [dict(zip(TELEMETRY_COLUMNS, row)) for row in zip(*columns)]
+        except Exception:
+            return []
+
     try:
         conn = sqlite3.connect(DB_FILE)
         conn.row_factory = sqlite3.Row
@@ -259,7 +615,7 @@ def get_telemetry_for_experiment(exp_id: int) -> List[Dict[str, Any]]:
             SELECT timestamp_amostra_ms, valor_adc, tensao_mv, sinal_controle, tensao_estimada_mv, erro_obs_mv, estado_1, estado_2, estado_3
             FROM telemetria 
             WHERE id_experimento = ?
-            ORDER BY timestamp_amostra_ms ASC
+            ORDER BY timestamp_amostra_ms ASC, id ASC
         """, (exp_id,))
         data = [dict(row) for row in cursor.fetchall()]
         conn.close()
@@ -268,19 +624,467 @@ def get_telemetry_for_experiment(exp_id: int) -> List[Dict[str, Any]]:
         return []
 
 
-def delete_experiment(exp_id: int) -> bool:
-    """Expurga as referências e dependências I/O associadas a um ID de sessão."""
+def _range_clause(t_min_ms: Optional[int], t_max_ms: Optional[int]) -> Tuple[str, List[int]]:
+    """Fragmento SQL (e parâmetros) para limites temporais opcionais e inclusivos."""
+    clause, params = "", []
+    if t_min_ms is not None:
+        clause += " AND timestamp_amostra_ms >= ?"
+        params.append(int(t_min_ms))
+    if t_max_ms is not None:
+        clause += " AND timestamp_amostra_ms <= ?"
+        params.append(int(t_max_ms))
+    return clause, params
+
+
+def _resolve_columns(columns: Optional[Sequence[str]]) -> List[str]:
+    """Colunas pedidas com timestamp_amostra_ms sempre em primeiro lugar."""
+    requested = list(TELEMETRY_COLUMNS) if columns is None else _validate_columns(columns)
+    return ["timestamp_amostra_ms"] + [c for c in requested if c != "timestamp_amostra_ms"]
+
+
+def get_telemetry_columns(exp_id: int,
+                          columns: Optional[Sequence[str]] = None,
+                          t_min_ms: Optional[int] = None,
+                          t_max_ms: Optional[int] = None,
+                          structured: bool = False) -> Any:
+    """
+    Extração colunar da telemetria para vetores NumPy tipados.
+
+    Conta primeiro as linhas através do índice composto, pré-aloca um vetor por
+    coluna e preenche-os a partir de blocos de fetchmany(), evitando a criação
+    de um dicionário por linha (sqlite3.Row) e a reconversão posterior em arrays.
+
+    Args:
+        exp_id (int): Identificador da sessão.
+        columns (Optional[Sequence[str]]): Subconjunto de TELEMETRY_COLUMNS (todas por omissão).
+            timestamp_amostra_ms é sempre incluído.
+        t_min_ms (Optional[int]): Limite inferior inclusivo de timestamp_amostra_ms.
+        t_max_ms (Optional[int]): Limite superior inclusivo de timestamp_amostra_ms.
+        structured (bool): Devolve um único array estruturado em vez de um dicionário.
+
+    Returns:
+        Dict[str, np.ndarray] | np.ndarray: Vetores por coluna ordenados no tempo
+        (vazios em caso de falha ou ausência de dados).
+    """
+    cols = _resolve_columns(columns)
+    dtype = np.dtype([(c, TELEMETRY_DTYPES[c]) for c in cols])
+    range_sql, range_params = _range_clause(t_min_ms, t_max_ms)
+
+    segment = get_archive_segment(exp_id)
+    if segment:
+        # Sessão arquivada: vistas memory-mapped (só leitura) sobre a cache colunar.
+        try:
+            arrays = _archived_columns(segment, cols, t_min_ms, t_max_ms)
+        except Exception as e:
+            print(f"ERRO na leitura do segmento arquivado do experimento {exp_id}: {e}")
+            arrays = {c: np.empty(0, dtype=TELEMETRY_DTYPES[c]) for c in cols}
+        if not structured:
+            return arrays
+        result = np.empty(len(arrays["timestamp_amostra_ms"]), dtype=dtype)
+        for c in cols:
+            result[c] = arrays[c]
+        return result
+
     try:
         conn = sqlite3.connect(DB_FILE)
         cursor = conn.cursor()
-        cursor.execute("DELETE FROM telemetria WHERE id_experimento = ?", (exp_id,))
+        cursor.execute(
+            f"SELECT COUNT(*) FROM telemetria WHERE id_experimento = ?{range_sql}",
+            [exp_id] + range_params
+        )
+        total = cursor.fetchone()[0]
+
+        result = np.empty(total, dtype=dtype) if structured else \
+            {c: np.empty(total, dtype=TELEMETRY_DTYPES[c]) for c in cols}
+
+        cursor.execute(f"""
+            SELECT {", ".join(cols)}
+            FROM telemetria
+            WHERE id_experimento = ?{range_sql}
+            ORDER BY timestamp_amostra_ms ASC, id ASC
+        """, [exp_id] + range_params)
+
+        filled = 0
+        while filled < total:
+            rows = cursor.fetchmany(COLUMNAR_FETCH_SIZE)
+            if not rows:
+                break
+            # Conversão em bloco: None -> NaN; o eixo temporal (< 2^53) regressa exato a int64.
+            block = np.array(rows, dtype='f8')
+            end = filled + len(block)
+            for i, c in enumerate(cols):
+                result[c][filled:end] = block[:, i]
+            filled = end
+
+        conn.close()
+        return result[:filled] if structured else {c: v[:filled] for c, v in result.items()}
+    except Exception as e:
+        print(f"ERRO na leitura colunar do experimento {exp_id}: {e}")
+        return np.empty(0, dtype=dtype) if structured else {c: np.empty(0, dtype=TELEMETRY_DTYPES[c]) for c in cols}
+
+
+def iter_telemetry_chunks(exp_id: int,
+                          chunk_size: int = STREAM_CHUNK_SIZE,
+                          columns: Optional[Sequence[str]] = None,
+                          t_min_ms: Optional[int] = None,
+                          t_max_ms: Optional[int] = None) -> Iterator[Dict[str, np.ndarray]]:
+    """
+    Leitor em streaming: produz blocos colunares de tamanho fixo de uma sessão.
+
+    A paginação percorre a chave composta (timestamp_amostra_ms, id) do índice
+    idx_telemetria_exp_ts a partir do último par devolvido (keyset), sem OFFSET:
+    cada bloco custa O(chunk_size) independentemente da posição na sessão, e
+    nenhuma transação de leitura fica aberta entre blocos (não retém o WAL).
+
+    Args:
+        exp_id (int): Identificador da sessão.
+        chunk_size (int): Número máximo de amostras por bloco.
+        columns (Optional[Sequence[str]]): Subconjunto de TELEMETRY_COLUMNS (todas por omissão).
+        t_min_ms (Optional[int]): Limite inferior inclusivo de timestamp_amostra_ms.
+        t_max_ms (Optional[int]): Limite superior inclusivo de timestamp_amostra_ms.
+
+    Yields:
+        Dict[str, np.ndarray]: Vetores tipados por coluna, com no máximo chunk_size amostras.
+    """
+    cols = _resolve_columns(columns)
+    chunk_size = max(1, int(chunk_size))
+
+    segment = get_archive_segment(exp_id)
+    if segment:
+        arrays = _archived_columns(segment, cols, t_min_ms, t_max_ms)
+        total = len(arrays["timestamp_amostra_ms"])
+        for start in range(0, total, chunk_size):
+            yield {c: arrays[c][start:start + chunk_size] for c in cols}
+        return
+
+    range_sql, range_params = _range_clause(None, t_max_ms)
+    select_sql = f"SELECT {', '.join(cols)}, id FROM telemetria"
+    order_sql = "ORDER BY timestamp_amostra_ms ASC, id ASC LIMIT ?"
+
+    conn = connect_read_only()
+    try:
+        cursor = conn.cursor()
+        # Primeiro bloco: início do intervalo pedido.
+        first_sql, first_params = _range_clause(t_min_ms, t_max_ms)
+        cursor.execute(
+            f"{select_sql} WHERE id_experimento = ?{first_sql} {order_sql}",
+            [exp_id] + first_params + [chunk_size]
+        )
+
+        while True:
+            rows = cursor.fetchall()
+            if not rows:
+                break
+
+            block = np.array(rows, dtype='f8')
+            yield {c: block[:, i].astype(TELEMETRY_DTYPES[c]) for i, c in enumerate(cols)}
+
+            if len(rows) < chunk_size:
+                break
+
+            # Blocos seguintes: retoma estritamente após o último par (timestamp, id).
+            last_ts, last_id = rows[-1][0], rows[-1][-1]
+            cursor.execute(f"""
+                {select_sql}
+                WHERE id_experimento = ?
+                AND (timestamp_amostra_ms, id) > (?, ?){range_sql}
+                {order_sql}
+            """, [exp_id, last_ts, last_id] + range_params + [chunk_size])
+    finally:
+        conn.close()
+
+
+def get_experiment_time_bounds(exp_id: int) -> Optional[Tuple[int, int, int]]:
+    """
+    Obtém os limites temporais de uma sessão através do índice composto.
+
+    Returns:
+        Optional[Tuple[int, int, int]]: (primeiro timestamp_amostra_ms, último
+        timestamp_amostra_ms, número de amostras), ou None se a sessão estiver vazia.
+    """
+    segment = get_archive_segment(exp_id)
+    if segment:
+        try:
+            ts = _archived_columns(segment, ["timestamp_amostra_ms"])["timestamp_amostra_ms"]
+            return (int(ts[0]), int(ts[-1]), len(ts)) if len(ts) else None
+        except Exception:
+            return None
+
+    try:
+        conn = sqlite3.connect(DB_FILE)
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT MIN(timestamp_amostra_ms), MAX(timestamp_amostra_ms), COUNT(*)
+            FROM telemetria
+            WHERE id_experimento = ?
+        """, (exp_id,))
+        row = cursor.fetchone()
+        conn.close()
+        if not row or row[2] == 0:
+            return None
+        return row[0], row[1], row[2]
+    except Exception:
+        return None
+
+
+def count_telemetry_in_range(exp_id: int, t_min_ms: int, t_max_ms: int) -> int:
+    """Contagem de amostras num intervalo fechado [t_min_ms, t_max_ms] (apenas índice)."""
+    segment = get_archive_segment(exp_id)
+    if segment:
+        try:
+            return len(_archived_columns(segment, ["timestamp_amostra_ms"], t_min_ms, t_max_ms)["timestamp_amostra_ms"])
+        except Exception:
+            return 0
+
+    try:
+        conn = sqlite3.connect(DB_FILE)
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT COUNT(*) FROM telemetria
+            WHERE id_experimento = ? AND timestamp_amostra_ms BETWEEN ? AND ?
+        """, (exp_id, t_min_ms, t_max_ms))
+        count = cursor.fetchone()[0]
+        conn.close()
+        return count
+    except Exception:
+        return 0
+
+
+def get_telemetry_envelope(exp_id: int, t_min_ms: int, t_max_ms: int,
+                           bucket_ms: int, columns: Sequence[str]) -> List[Tuple]:
+    """
+    Decimação min/max agregada no motor SQLite para vistas de conjunto.
+
+    Agrupa o intervalo em baldes de largura fixa (bucket_ms) e devolve, por balde,
+    o instante inicial seguido do mínimo e máximo de cada coluna pedida.
+
+    Returns:
+        List[Tuple]: (t_balde_ms, min_c1, max_c1, min_c2, max_c2, ...).
+    """
+    cols = _validate_columns(columns)
+    bucket_ms = max(1, int(bucket_ms))
+
+    segment = get_archive_segment(exp_id)
+    if segment:
+        try:
+            arrays = _archived_columns(segment, ["timestamp_amostra_ms"] + cols, t_min_ms, t_max_ms)
+            ts = arrays["timestamp_amostra_ms"]
+            if len(ts) == 0:
+                return []
+            keys = (ts - t_min_ms) // bucket_ms
+            starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+            out = [ts[starts]]
+            for c in cols:
+                out.append(np.fmin.reduceat(arrays[c], starts))
+                out.append(np.fmax.reduceat(arrays[c], starts))
+            return list(zip(*[a.tolist() for a in out]))
+        except Exception:
+            return []
+
+    aggregates = ", ".join(f"MIN({c}), MAX({c})" for c in cols)
+    try:
+        conn = sqlite3.connect(DB_FILE)
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT MIN(timestamp_amostra_ms), {aggregates}
+            FROM telemetria
+            WHERE id_experimento = ? AND timestamp_amostra_ms BETWEEN ? AND ?
+            GROUP BY (timestamp_amostra_ms - ?) / ?
+            ORDER BY 1 ASC
+        """, (exp_id, t_min_ms, t_max_ms, t_min_ms, bucket_ms))
+        rows = cursor.fetchall()
+        conn.close()
+        return rows
+    except Exception:
+        return []
+
+
+def _delete_in_chunks(conn: sqlite3.Connection, table: str, key: str, exp_id: int,
+                      chunk_rows: int, on_chunk: Callable[[int], None]) -> None:
+    """Expurga as linhas de um experimento em transações curtas de chunk_rows linhas."""
+    cursor = conn.cursor()
+    while True:
+        cursor.execute(f"""
+            DELETE FROM {table} WHERE ({key}) IN (
+                SELECT {key} FROM {table} WHERE id_experimento = ? LIMIT ?
+            )
+        """, (exp_id, chunk_rows))
+        removed = cursor.rowcount
+        conn.commit()
+        on_chunk(removed)
+        if removed < chunk_rows:
+            break
+        time.sleep(DELETE_CHUNK_PAUSE_SEC)
+
+
+def delete_experiment(exp_id: int,
+                      chunk_rows: int = DELETE_CHUNK_ROWS,
+                      progress_callback: Optional[Callable[[int, int], None]] = None) -> bool:
+    """
+    Expurga as referências e dependências I/O associadas a um ID de sessão.
+
+    A sessão é primeiro marcada como 'deleting' (deixa de ser listada e é
+    retomada no arranque se o processo for interrompido). A telemetria e a
+    pirâmide são removidas em transações curtas e limitadas, para que o
+    DB Writer nunca fique bloqueado por muito tempo. Destina-se a correr
+    fora da thread da UI (ver core.maintenance).
+
+    Args:
+        exp_id (int): Identificador da sessão.
+        chunk_rows (int): Linhas removidas por transação.
+        progress_callback (Optional[Callable[[int, int], None]]): Recebe
+            (amostras removidas, total de amostras) após cada bloco.
+
+    Returns:
+        bool: True se a sessão foi totalmente expurgada.
+    """
+    try:
+        conn = connect_for_write()
+    except Exception as e:
+        print(f"ERRO ao expurgar experimento {exp_id}: {e}")
+        return False
+
+    try:
+        cursor = conn.cursor()
+        cursor.execute("UPDATE experimentos SET status = 'deleting' WHERE id = ?", (exp_id,))
+        cursor.execute("SELECT COUNT(*) FROM telemetria WHERE id_experimento = ?", (exp_id,))
+        total = cursor.fetchone()[0]
+        conn.commit()
+
+        # Liberta já os vetores memory-mapped do segmento (se arquivado).
+        segment = get_archive_segment(exp_id)
+        if segment:
+            segment_store.close_segment(segment)
+
+        progress = {'removed': 0}
+
+        def on_telemetry_chunk(removed: int) -> None:
+            progress['removed'] += removed
+            if progress_callback:
+                progress_callback(progress['removed'], total)
+
+        _delete_in_chunks(conn, "telemetria_piramide", "id_experimento, canal, nivel, balde",
+                          exp_id, chunk_rows, lambda _n: None)
+        _delete_in_chunks(conn, "telemetria", "id", exp_id, chunk_rows, on_telemetry_chunk)
+
+        if segment:
+            segment_store.remove_segment(segment)
+
         cursor.execute("DELETE FROM experimentos WHERE id = ?", (exp_id,))
         conn.commit()
-        conn.close()
+        print(f"--- EXPERIMENTO EXPURGADO --- ID: {exp_id} ({total} amostras) ---")
         return True
+    except Exception as e:
+        print(f"ERRO ao expurgar experimento {exp_id}: {e}")
+        return False
+    finally:
+        conn.close()
+
+
+def get_experiments_pending_deletion() -> List[int]:
+    """IDs de sessões cujo expurgo foi interrompido (status 'deleting')."""
+    try:
+        conn = sqlite3.connect(DB_FILE)
+        cursor = conn.cursor()
+        cursor.execute("SELECT id FROM experimentos WHERE status = 'deleting' ORDER BY id ASC")
+        ids = [row[0] for row in cursor.fetchall()]
+        conn.close()
+        return ids
     except Exception:
+        return []
+
+
+def needs_auto_vacuum_migration(conn: Optional[sqlite3.Connection] = None) -> bool:
+    """Verdadeiro se a base de dados ainda não usa auto_vacuum=INCREMENTAL."""
+    own = conn is None
+    if own:
+        conn = sqlite3.connect(DB_FILE)
+    try:
+        return conn.execute("PRAGMA auto_vacuum;").fetchone()[0] != 2
+    finally:
+        if own:
+            conn.close()
+
+
+def migrate_auto_vacuum() -> bool:
+    """
+    Migração única de uma base pré-existente para auto_vacuum=INCREMENTAL.
+
+    Exige um VACUUM integral: reconstrói o ficheiro inteiro, detém o lock de
+    escrita durante toda a operação e precisa de até ~2x o tamanho da base em
+    disco (cópia temporária e WAL). Por isso corre apenas como passo explícito
+    de linha de comandos, com a aplicação fechada, reportando o tempo decorrido
+    a cada VACUUM_PROGRESS_SEC e a duração total no fim.
+
+    Returns:
+        bool: True se a base ficou em modo incremental.
+    """
+    if not needs_auto_vacuum_migration():
+        print("DB: auto_vacuum=INCREMENTAL já ativo; nada a migrar.")
+        return True
+
+    size = os.path.getsize(DB_FILE)
+    free = shutil.disk_usage(os.path.dirname(DB_FILE)).free
+    if free < 2 * size:
+        print(f"ERRO: espaço livre insuficiente para o VACUUM ({free / 2**20:.0f} MiB livres, "
+              f"~{2 * size / 2**20:.0f} MiB necessários).")
+        return False
+
+    start = time.perf_counter()
+    last_report = [start]
+
+    def report_progress() -> int:
+        now = time.perf_counter()
+        if now - last_report[0] >= VACUUM_PROGRESS_SEC:
+            last_report[0] = now
+            print(f"DB: VACUUM em curso... {now - start:.0f} s ({size / 2**20:.0f} MiB a reconstruir)")
+        return 0
+
+    print(f"DB: A migrar para auto_vacuum=INCREMENTAL (VACUUM de {size / 2**20:.0f} MiB)...")
+    try:
+        conn = sqlite3.connect(DB_FILE)
+        try:
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL;")
+            conn.set_progress_handler(report_progress, 10_000)
+            conn.execute("VACUUM;")
+            conn.set_progress_handler(None, 0)
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE);").fetchall()
+            migrated = not needs_auto_vacuum_migration(conn)
+        finally:
+            conn.close()
+    except Exception as e:
+        print(f"ERRO na migração para auto_vacuum=INCREMENTAL: {e}")
         return False
 
+    print(f"DB: Migração concluída em {time.perf_counter() - start:.1f} s "
+          f"({size / 2**20:.0f} -> {os.path.getsize(DB_FILE) / 2**20:.0f} MiB).")
+    return migrated
+
+
+def incremental_vacuum_step(max_pages: int = VACUUM_PAGES_PER_STEP) -> int:
+    """
+    Devolve ao sistema de ficheiros até max_pages páginas livres.
+
+    Concebida para tempo ocioso: não atua durante gravações ativas.
+
+    Returns:
+        int: Número de páginas livres antes do passo.
+    """
+    if is_experiment_running():
+        return 0
+    try:
+        conn = sqlite3.connect(DB_FILE)
+        cursor = conn.cursor()
+        cursor.execute("PRAGMA freelist_count;")
+        free_pages = cursor.fetchone()[0]
+        if free_pages > 0:
+            cursor.execute(f"PRAGMA incremental_vacuum({int(max_pages)});")
+            cursor.fetchall()
+        conn.close()
+        return free_pages
+    except Exception:
+        return 0
+
 
 def startup_cleanup() -> None:
     """Rotina de salvaguarda para corrupção transacional prévia."""
@@ -298,7 +1102,26 @@ def startup_cleanup() -> None:
             WHERE status = 'running'
         """)
         cursor.execute("UPDATE experimentos SET status = 'completed' WHERE status = 'running' AND timestamp_fim IS NULL")
+        # Reservas do gatilho que nunca dispararam.
+        cursor.execute("DELETE FROM experimentos WHERE status = 'reserved'")
+        # Importações interrompidas: expurgadas em blocos como as eliminações pendentes.
+        cursor.execute("UPDATE experimentos SET status = 'deleting' WHERE status = 'importing'")
         conn.commit()
         conn.close()
     except Exception:
-        pass
\ No newline at end of file
+        pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Manutenção da base de dados de telemetria.")
+    parser.add_argument("--migrate-auto-vacuum", action="store_true",
+                        help="Migra uma base pré-existente para auto_vacuum=INCREMENTAL (VACUUM integral).")
+    args = parser.parse_args()
+
+    if args.migrate_auto_vacuum:
+        raise SystemExit(0 if migrate_auto_vacuum() else 1)
+    parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
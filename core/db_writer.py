@@ -10,9 +10,40 @@ o lote a cada 1 segundo rígido.
 import threading
 import time
 import queue
+import sqlite3
+from typing import Callable, Dict, Any, List
 import core.database as database
+import core.profiling as profiling
+from core.metrics import registry
 from core.shared_state import db_queue
 
+# Latência das transações de descarga (commit incluído), para verificar que
+# se mantém estável durante gravações longas (ver core.wal_checkpoint).
+flush_stats: Dict[str, Any] = {
+    'flushes': 0,
+    'last_ms': 0.0,
+    'max_ms': 0.0,
+    'last_batch_size': 0
+}
+
+
+_flush_ms = registry.histogram('db_flush_ms', "Latência das transações de descarga (ms)")
+_rows_committed = registry.counter('db_rows_committed_total', "Amostras persistidas")
+
+
+def _flush(batch: List[Dict[str, Any]], conn: sqlite3.Connection) -> None:
+    """Persiste o lote e regista a latência da transação."""
+    start = time.perf_counter()
+    database.insert_data_batch(batch, conn)
+    elapsed_ms = (time.perf_counter() - start) * 1000.0
+
+    flush_stats['flushes'] += 1
+    flush_stats['last_ms'] = elapsed_ms
+    flush_stats['max_ms'] = max(flush_stats['max_ms'], elapsed_ms)
+    flush_stats['last_batch_size'] = len(batch)
+    _flush_ms.observe(elapsed_ms)
+    _rows_committed.inc(len(batch))
+
 
 def database_writer_thread() -> None:
     """
@@ -22,9 +53,12 @@ def database_writer_thread() -> None:
     1. Baseado em Tempo: A cada 1.0 segundos.
     2. Baseado em Volume: A cada 500 amostras acumuladas.
     3. Sinal de Shutdown: Descarga mandatória do buffer pendente.
+    4. Barreira (callable): Descarga imediata seguida da invocação do callable.
     """
     print("DB Writer: Daemon alocado e a aguardar fluxos de telemetria.")
-    
+
+    # Ligação persistente: mantém o WAL sob controlo exclusivo de core.wal_checkpoint.
+    conn = database.connect_writer()
     batch = []
     flush_interval_sec = 1.0
     batch_size_limit = 500
@@ -37,10 +71,18 @@ def database_writer_thread() -> None:
             
             if item is None:  # Sinal de Shutdown/Poison Pill
                 if batch:
-                    database.insert_data_batch(batch)
+                    _flush(batch, conn)
                 print("DB Writer: Sinal de interrupção recebido. Buffer purgado. A encerrar.")
                 break
 
+            if callable(item):  # Barreira: tudo o que a precede fica persistido antes da invocação
+                if batch:
+                    _flush(batch, conn)
+                    batch.clear()
+                    last_flush_time = time.time()
+                item()
+                continue
+
             batch.append(item)
             
         except queue.Empty:
@@ -55,20 +97,33 @@ def database_writer_thread() -> None:
 
         # Condição Híbrida: Aciona a gravação SQLite estritamente se houver dados e gatilho ativo.
         if batch and (time_to_flush or size_to_flush):
-            database.insert_data_batch(batch)
+            _flush(batch, conn)
             batch.clear()
             last_flush_time = time.time()
 
+    conn.close()
     print("DB Writer: Daemon finalizado em segurança.")
 
 
 def start_db_writer_thread() -> threading.Thread:
     """Injeta o ciclo de I/O numa subrotina desacoplada."""
-    db_thread = threading.Thread(target=database_writer_thread, daemon=True)
+    db_thread = threading.Thread(target=profiling.thread_target(database_writer_thread, "db-writer"),
+                                 name="db-writer", daemon=True)
     db_thread.start()
     return db_thread
 
 
+def call_after_flush(callback: Callable[[], None]) -> None:
+    """
+    Agenda um callback para depois da persistência de toda a telemetria já enfileirada.
+
+    O callback corre na thread do DB Writer e deve ser leve (p.ex. delegar
+    numa thread de manutenção). Com a db_queue cheia, a chamada aguarda
+    espaço: nunca a invocar a partir da thread de receção.
+    """
+    db_queue.put(callback)
+
+
 def stop_db_writer_thread() -> None:
     """Injeta a diretiva de paragem estrita (Poison Pill) na fila de persistência."""
     try:
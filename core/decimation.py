@@ -0,0 +1,390 @@
+"""
+Pirâmide de Decimação Min/Max por Experimento.
+
+Consolida, para cada experimento e canal, uma hierarquia de níveis de
+agregação com baldes de tamanho fixo em amostras (p.ex. 10, 100 e 1000).
+Cada balde guarda mínimo, máximo e média, permitindo que vistas de conjunto,
+pré-visualizações e relatórios custem tempo proporcional à largura do ecrã
+e não à duração do experimento.
+"""
+
+import sqlite3
+import time
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import config.settings as settings
+import core.database as database
+import core.maintenance as maintenance
+import core.db_writer as db_writer
+
+# Canais agregados na pirâmide (todas as colunas numéricas exceto o eixo temporal).
+PYRAMID_CHANNELS: Tuple[str, ...] = tuple(c for c in database.TELEMETRY_COLUMNS if c != "timestamp_amostra_ms")
+
+# Linhas da pirâmide escritas por transação, e pausa entre transações (cede o lock ao DB Writer).
+PYRAMID_WRITE_CHUNK_ROWS: int = 20_000
+PYRAMID_WRITE_PAUSE_SEC: float = 0.01
+
+
+def _levels() -> List[int]:
+    """Níveis ordenados; cada nível tem de ser múltiplo do anterior."""
+    levels = sorted(set(int(n) for n in settings.DECIMATION_LEVELS))
+    for lower, upper in zip(levels, levels[1:]):
+        if upper % lower != 0:
+            raise ValueError(f"Nível de decimação {upper} não é múltiplo de {lower}.")
+    return levels
+
+
+def has_pyramid(exp_id: int) -> bool:
+    """O nível mais grosseiro é escrito por último, numa só transação: a sua presença implica pirâmide completa."""
+    levels = _levels()
+    if not levels:
+        return False
+    try:
+        conn = sqlite3.connect(database.DB_FILE)
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT 1 FROM telemetria_piramide
+            WHERE id_experimento = ? AND canal = ? AND nivel = ? LIMIT 1
+        """, (exp_id, PYRAMID_CHANNELS[0], levels[-1]))
+        found = cursor.fetchone() is not None
+        conn.close()
+        return found
+    except Exception:
+        return False
+
+
+def _delete_pyramid(conn: sqlite3.Connection, exp_id: int, levels: Sequence[int]) -> None:
+    """Remove a pirâmide em transações curtas, do nível de topo para a base (has_pyramid passa logo a False)."""
+    cursor = conn.cursor()
+    for level in reversed(levels):
+        while True:
+            cursor.execute("""
+                DELETE FROM telemetria_piramide WHERE (id_experimento, canal, nivel, balde) IN (
+                    SELECT id_experimento, canal, nivel, balde FROM telemetria_piramide
+                    WHERE id_experimento = ? AND nivel = ? LIMIT ?
+                )
+            """, (exp_id, level, PYRAMID_WRITE_CHUNK_ROWS))
+            removed = cursor.rowcount
+            conn.commit()
+            if removed < PYRAMID_WRITE_CHUNK_ROWS:
+                break
+            time.sleep(PYRAMID_WRITE_PAUSE_SEC)
+
+
+def _copy_level(reader: sqlite3.Connection, writer: sqlite3.Connection,
+                exp_id: int, level: int, chunk_rows: Optional[int]) -> None:
+    """Copia um nível da tabela temporária para telemetria_piramide, chunk_rows linhas por transação (None: numa só)."""
+    source = reader.execute("""
+        SELECT ?, canal, nivel, balde, t_inicio_ms, t_fim_ms, n_amostras, v_min, v_max, v_media
+        FROM temp._piramide WHERE nivel = ? ORDER BY canal, balde
+    """, (exp_id, level))
+    while True:
+        rows = source.fetchmany(chunk_rows) if chunk_rows else source.fetchall()
+        if not rows:
+            break
+        writer.executemany("INSERT INTO telemetria_piramide VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        if chunk_rows:
+            writer.commit()
+            time.sleep(PYRAMID_WRITE_PAUSE_SEC)
+    writer.commit()
+
+
+def build_pyramid(exp_id: int) -> bool:
+    """
+    Constrói (ou reconstrói) a pirâmide de decimação de um experimento.
+
+    O nível base é agregado a partir da telemetria bruta numa única varredura
+    ordenada pelo índice composto, feita numa ligação apenas de leitura para
+    tabelas temporárias; os níveis superiores são derivados do nível
+    imediatamente inferior, também em memória temporária. Só a cópia final
+    para telemetria_piramide usa o lock de escrita, em transações curtas de
+    PYRAMID_WRITE_CHUNK_ROWS linhas, com o nível de topo por último (ver
+    has_pyramid): sessões longas nunca bloqueiam o DB Writer por segundos.
+
+    Returns:
+        bool: True se a pirâmide foi consolidada.
+    """
+    levels = _levels()
+    if not levels:
+        return False
+
+    base = levels[0]
+    base_aggregates = ", ".join(
+        f"MIN({c}) AS min_{c}, MAX({c}) AS max_{c}, AVG({c}) AS avg_{c}"
+        for c in PYRAMID_CHANNELS
+    )
+
+    try:
+        reader = database.connect_read_only()
+        # Autocommit: nenhuma transação de leitura fica aberta além de cada instrução.
+        reader.isolation_level = None
+        writer = database.connect_for_write()
+        try:
+            _delete_pyramid(writer, exp_id, levels)
+
+            # 1. Nível base: uma única varredura da telemetria bruta para todos os canais.
+            cursor = reader.cursor()
+            cursor.execute("DROP TABLE IF EXISTS temp._piramide_base")
+            cursor.execute("DROP TABLE IF EXISTS temp._piramide")
+            cursor.execute(f"""
+                CREATE TEMP TABLE _piramide_base AS
+                SELECT rn / ? AS balde,
+                       MIN(timestamp_amostra_ms) AS t_inicio_ms,
+                       MAX(timestamp_amostra_ms) AS t_fim_ms,
+                       COUNT(*) AS n_amostras,
+                       {base_aggregates}
+                FROM (
+                    SELECT ROW_NUMBER() OVER (ORDER BY timestamp_amostra_ms) - 1 AS rn,
+                           timestamp_amostra_ms, {", ".join(PYRAMID_CHANNELS)}
+                    FROM telemetria
+                    WHERE id_experimento = ?
+                )
+                GROUP BY rn / ?
+            """, (base, exp_id, base))
+
+            cursor.execute("""
+                CREATE TEMP TABLE _piramide (
+                    canal TEXT NOT NULL, nivel INTEGER NOT NULL, balde INTEGER NOT NULL,
+                    t_inicio_ms INTEGER NOT NULL, t_fim_ms INTEGER NOT NULL, n_amostras INTEGER NOT NULL,
+                    v_min REAL, v_max REAL, v_media REAL,
+                    PRIMARY KEY (nivel, canal, balde)
+                ) WITHOUT ROWID
+            """)
+            for c in PYRAMID_CHANNELS:
+                cursor.execute(f"""
+                    INSERT INTO temp._piramide
+                    SELECT ?, ?, balde, t_inicio_ms, t_fim_ms, n_amostras, min_{c}, max_{c}, avg_{c}
+                    FROM temp._piramide_base
+                """, (c, base))
+            cursor.execute("DROP TABLE temp._piramide_base")
+
+            # 2. Níveis superiores: agregação do nível inferior (média ponderada pelo nº de amostras).
+            for lower, upper in zip(levels, levels[1:]):
+                ratio = upper // lower
+                cursor.execute("""
+                    INSERT INTO temp._piramide
+                    SELECT canal, ?, balde / ?,
+                           MIN(t_inicio_ms), MAX(t_fim_ms), SUM(n_amostras),
+                           MIN(v_min), MAX(v_max),
+                           SUM(v_media * n_amostras) / NULLIF(SUM(n_amostras), 0)
+                    FROM temp._piramide
+                    WHERE nivel = ?
+                    GROUP BY canal, balde / ?
+                """, (upper, ratio, lower, ratio))
+
+            # 3. Cópia em transações curtas; o nível de topo por último, numa só transação.
+            for level in levels[:-1]:
+                _copy_level(reader, writer, exp_id, level, PYRAMID_WRITE_CHUNK_ROWS)
+            _copy_level(reader, writer, exp_id, levels[-1], None)
+            cursor.execute("DROP TABLE temp._piramide")
+        finally:
+            writer.close()
+            reader.close()
+        print(f"Pirâmide de decimação consolidada para o experimento ID: {exp_id} (níveis {levels}).")
+        return True
+    except Exception as e:
+        print(f"ERRO ao consolidar pirâmide do experimento {exp_id}: {e}")
+        return False
+
+
+def get_experiments_without_pyramid() -> List[int]:
+    """IDs de sessões concluídas sem pirâmide (ausente ou interrompida a meio da escrita)."""
+    levels = _levels()
+    if not levels:
+        return []
+    try:
+        conn = sqlite3.connect(database.DB_FILE)
+        cursor = conn.cursor()
+        # Sem linhas no nível de topo: pirâmide ausente ou interrompida a meio da escrita.
+        cursor.execute("""
+            SELECT id FROM experimentos
+            WHERE status = 'completed'
+            AND id NOT IN (SELECT DISTINCT id_experimento FROM telemetria_piramide WHERE nivel = ?)
+            ORDER BY id ASC
+        """, (levels[-1],))
+        pending = [row[0] for row in cursor.fetchall()]
+        conn.close()
+        return pending
+    except Exception as e:
+        print(f"ERRO ao inventariar sessões sem pirâmide: {e}")
+        return []
+
+
+def backfill_pyramids() -> int:
+    """
+    Preenchimento retroativo: consolida pirâmides para sessões antigas que não a possuam.
+
+    Na aplicação, o arranque usa maintenance.submit_each(build_pyramid, ...)
+    para ceder a fila entre sessões; esta variante síncrona serve scripts.
+
+    Returns:
+        int: Número de pirâmides construídas.
+    """
+    built = 0
+    for exp_id in get_experiments_without_pyramid():
+        if build_pyramid(exp_id):
+            built += 1
+    return built
+
+
+def on_experiment_closed(exp_id: int) -> None:
+    """
+    Subscritor de database.close_current_experiment.
+
+    Aguarda a descarga da telemetria pendente no DB Writer e delega a
+    consolidação na thread de manutenção.
+    """
+    db_writer.call_after_flush(lambda: maintenance.submit(build_pyramid, exp_id))
+
+
+def _top_level_bounds(exp_id: int, level: int) -> Tuple[np.ndarray, np.ndarray, int]:
+    """(t_inicio_ms, t_fim_ms) dos baldes do nível dado por ordem de balde, e o total de amostras."""
+    conn = sqlite3.connect(database.DB_FILE)
+    try:
+        rows = conn.execute("""
+            SELECT t_inicio_ms, t_fim_ms, n_amostras FROM telemetria_piramide
+            WHERE id_experimento = ? AND canal = ? AND nivel = ?
+            ORDER BY balde ASC
+        """, (exp_id, PYRAMID_CHANNELS[0], level)).fetchall()
+    finally:
+        conn.close()
+    bounds = np.array(rows, dtype=np.int64).reshape(-1, 3)
+    return bounds[:, 0], bounds[:, 1], int(bounds[:, 2].sum())
+
+
+def _samples_before(exp_id: int, t_ms: int, level: int, starts: np.ndarray,
+                    ends: np.ndarray, total: int) -> int:
+    """
+    Posição (nº de amostras com timestamp < t_ms) na ordenação da pirâmide.
+
+    O balde k do nível começa exatamente na posição level * k. Parte-se do
+    último início de balde <= t_ms que não partilha o timestamp com o fim do
+    balde anterior (um timestamp repetido pode atravessar a fronteira) e conta-se
+    em bruto apenas o troço [início, t_ms), tipicamente menos de um balde.
+    """
+    if len(starts) == 0 or t_ms <= starts[0]:
+        return 0
+    if t_ms > ends[-1]:
+        return total
+    clean = np.concatenate(([True], ends[:-1] < starts[1:]))
+    k = int(np.flatnonzero(clean & (starts <= t_ms))[-1])
+    if starts[k] > t_ms - 1:
+        return level * k
+    return level * k + database.count_telemetry_in_range(exp_id, int(starts[k]), t_ms - 1)
+
+
+def count_samples_in_range(exp_id: int, t_min_ms: int, t_max_ms: int) -> int:
+    """
+    Contagem exata de amostras num intervalo com custo limitado pela pirâmide.
+
+    A contagem é a diferença entre as posições de t_max_ms + 1 e t_min_ms na
+    ordenação por timestamp; cada posição resulta do índice do balde do nível
+    mais grosseiro onde cai, mais uma contagem em bruto (via índice) da franja
+    até ao instante pedido. Sem pirâmide, recorre à contagem indexada da
+    telemetria bruta.
+    """
+    levels = _levels()
+    try:
+        starts, ends, total = _top_level_bounds(exp_id, levels[-1])
+    except Exception:
+        starts = np.empty(0, dtype=np.int64)
+
+    if len(starts) == 0:
+        return database.count_telemetry_in_range(exp_id, t_min_ms, t_max_ms)
+    if t_max_ms < t_min_ms:
+        return 0
+
+    return (_samples_before(exp_id, t_max_ms + 1, levels[-1], starts, ends, total)
+            - _samples_before(exp_id, t_min_ms, levels[-1], starts, ends, total))
+
+
+def _choose_level(levels: Sequence[int], samples_in_range: int, max_buckets: int) -> int:
+    """
+    Nível mais grosseiro que ainda fornece pelo menos max_buckets baldes.
+
+    O reagrupamento final para max_buckets (get_pyramid_envelope) parte assim
+    de até ~10x mais baldes do que o orçamento, e nunca de menos. Se nem o nível
+    mais fino os fornece, usa-se esse.
+    """
+    for level in reversed(levels):
+        if samples_in_range / level >= max_buckets:
+            return level
+    return levels[0]
+
+
+def _regroup(rows: List[Tuple], max_buckets: int) -> List[Tuple]:
+    """Funde baldes consecutivos em max_buckets grupos de tamanho quase igual (min dos min, max dos max)."""
+    if len(rows) <= max_buckets:
+        return rows
+    matrix = np.array(rows, dtype=float)
+    edges = np.linspace(0, len(rows), max_buckets + 1).astype(np.int64)[:-1]
+    out = [matrix[edges, 0]]
+    for j in range(1, matrix.shape[1], 2):
+        out.append(np.fmin.reduceat(matrix[:, j], edges))
+        out.append(np.fmax.reduceat(matrix[:, j + 1], edges))
+    out[0] = out[0].astype(np.int64)
+    return list(zip(*[a.tolist() for a in out]))
+
+
+def get_pyramid_envelope(exp_id: int, t_min_ms: int, t_max_ms: int,
+                         max_buckets: int, channels: Sequence[str],
+                         samples_in_range: Optional[int] = None) -> Optional[List[Tuple]]:
+    """
+    Envelope min/max de um intervalo servido pela pirâmide.
+
+    O custo é proporcional a max_buckets (largura do ecrã), não ao nº de amostras.
+    O formato de saída é idêntico a database.get_telemetry_envelope.
+
+    Returns:
+        Optional[List[Tuple]]: (t_balde_ms, min_c1, max_c1, ...), ou None se a
+        pirâmide não existir (o chamador deve recorrer à telemetria bruta).
+    """
+    cols = list(channels)
+    if any(c not in PYRAMID_CHANNELS for c in cols):
+        raise ValueError(f"Canais fora da pirâmide: {cols}")
+    if not has_pyramid(exp_id):
+        return None
+
+    levels = _levels()
+    max_buckets = max(1, int(max_buckets))
+    if samples_in_range is None:
+        samples_in_range = count_samples_in_range(exp_id, t_min_ms, t_max_ms)
+    level = _choose_level(levels, samples_in_range, max_buckets)
+    # Pré-agrupamento em SQL só se até o nível mais grosseiro exceder muito o orçamento
+    # (arredondado por defeito: nunca menos de max_buckets grupos); o resto em NumPy.
+    group = max(1, samples_in_range // (level * max_buckets))
+
+    try:
+        conn = sqlite3.connect(database.DB_FILE)
+        cursor = conn.cursor()
+        columns_data = []
+        for c in cols:
+            # O limite inferior recua até ao balde que contém t_min_ms (franja parcial).
+            cursor.execute("""
+                SELECT MIN(t_inicio_ms), MIN(v_min), MAX(v_max)
+                FROM telemetria_piramide
+                WHERE id_experimento = ? AND canal = ? AND nivel = ?
+                AND t_inicio_ms BETWEEN COALESCE((
+                    SELECT MAX(t_inicio_ms) FROM telemetria_piramide
+                    WHERE id_experimento = ? AND canal = ? AND nivel = ? AND t_inicio_ms <= ?
+                ), ?) AND ?
+                GROUP BY balde / ?
+                ORDER BY 1 ASC
+            """, (exp_id, c, level, exp_id, c, level, t_min_ms, t_min_ms, t_max_ms, group))
+            columns_data.append(cursor.fetchall())
+        conn.close()
+    except Exception:
+        return None
+
+    if not columns_data or not columns_data[0]:
+        return []
+
+    rows = []
+    for i, base_row in enumerate(columns_data[0]):
+        row = [base_row[0]]
+        for col_rows in columns_data:
+            row.extend(col_rows[i][1:])
+        rows.append(tuple(row))
+    return _regroup(rows, max_buckets)
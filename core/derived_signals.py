@@ -0,0 +1,353 @@
+"""
+Sinais Derivados (Filtros Causais Vetorizados).
+
+Filtros e transformações causais sobre vetores de telemetria: média móvel
+exponencial (EMA), média móvel, passa-baixo Butterworth (cascata de biquads),
+derivada temporal e envelope RMS.
+
+Todos os filtros são objetos com estado: process() recebe um bloco de
+amostras e devolve o bloco filtrado, continuando exatamente onde o bloco
+anterior terminou. A mesma classe serve o gráfico em tempo real (blocos
+pequenos por ciclo de UI, ver ui.plot_manager.GraphManager) e o
+processamento em lote de sessões históricas para exportação (um único bloco
+com a sessão inteira), com resultados idênticos.
+
+As recorrências IIR são avaliadas por blocos na forma de espaço de estados:
+a resposta de estado nulo de cada bloco de BLOCK_SIZE amostras é um produto
+matricial (Toeplitz da resposta impulsional) e apenas o estado de dimensão
+N é propagado sequencialmente entre blocos, evitando um ciclo Python por amostra.
+
+Amostras NaN (pacotes inválidos) são substituídas pelo último valor válido
+na entrada do filtro e permanecem NaN na saída.
+"""
+
+import abc
+import math
+import numpy as np
+from typing import Dict, List, Optional
+
+import config.settings as settings
+
+# Comprimento dos blocos da avaliação matricial das recorrências IIR.
+BLOCK_SIZE: int = 256
+
+# Tipos disponíveis e respetivas designações na interface.
+SIGNAL_KINDS: Dict[str, str] = {
+    'ema': 'EMA',
+    'moving_average': 'Média Móvel',
+    'butterworth': 'Butterworth',
+    'derivative': 'Derivada',
+    'rms_envelope': 'Envelope RMS',
+}
+
+
+class DerivedSignal(abc.ABC):
+    """
+    Interface comum dos sinais derivados com estado.
+
+    As subclasses implementam _process(), que recebe o bloco já sem NaN.
+    """
+
+    def process(self, values: np.ndarray, timestamps_ms: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Filtra um bloco contíguo de amostras, atualizando o estado interno.
+
+        Args:
+            values (np.ndarray): Amostras do bloco.
+            timestamps_ms (Optional[np.ndarray]): Instantes das amostras (ms), quando relevantes.
+
+        Returns:
+            np.ndarray: Bloco filtrado (float64, mesmo comprimento).
+        """
+        values = np.asarray(values, dtype='f8')
+        if len(values) == 0:
+            return np.empty(0)
+        filled, invalid = self._fill_invalid(values)
+        if filled is None:
+            return np.full(len(values), np.nan)
+        out = self._process(filled, timestamps_ms)
+        if invalid is not None:
+            out[invalid] = np.nan
+        return out
+
+    def reset(self) -> None:
+        """Descarta o estado; o próximo bloco é tratado como início do sinal."""
+        self._last_valid: Optional[float] = None
+
+    def _fill_invalid(self, values: np.ndarray):
+        """Substitui NaN pelo último valor válido (inclusive de blocos anteriores)."""
+        invalid = np.isnan(values)
+        if not invalid.any():
+            self._last_valid = values[-1]
+            return values, None
+
+        valid_idx = np.where(invalid, -1, np.arange(len(values)))
+        np.maximum.accumulate(valid_idx, out=valid_idx)
+        if valid_idx[-1] < 0 and self._last_valid is None:
+            return None, invalid
+
+        seed = self._last_valid if self._last_valid is not None else values[valid_idx[valid_idx >= 0][0]]
+        filled = np.where(valid_idx >= 0, values[np.maximum(valid_idx, 0)], seed)
+        self._last_valid = filled[-1]
+        return filled, invalid
+
+    @abc.abstractmethod
+    def _process(self, values: np.ndarray, timestamps_ms: Optional[np.ndarray]) -> np.ndarray:
+        """Filtra um bloco sem amostras inválidas, continuando a partir do estado interno."""
+
+
+class _StateSpaceSection:
+    """
+    Recorrência linear x[n+1] = A x[n] + B u[n], y[n] = C x[n] + D u[n] avaliada por blocos.
+    """
+
+    def __init__(self, A: np.ndarray, B: np.ndarray, C: np.ndarray, D: float, block_size: int = BLOCK_SIZE):
+        self.A, self.B, self.C, self.D = A, B, C, D
+        self.block_size = L = block_size
+        order = A.shape[0]
+
+        powers = [np.eye(order)]
+        for _ in range(L):
+            powers.append(A @ powers[-1])
+        powers_b = np.array([p @ B for p in powers[:L]])                  # A^m B, m = 0..L-1
+
+        impulse = np.concatenate(([D], powers_b[:L - 1] @ C))              # h[0] = D, h[m] = C A^(m-1) B
+        lags = np.arange(L)[:, None] - np.arange(L)[None, :]
+        self._toeplitz = np.where(lags >= 0, impulse[np.clip(lags, 0, None)], 0.0)
+        self._observability = np.array([C @ p for p in powers[:L]])        # C A^i
+        self._powers = powers
+        self._powers_b = powers_b
+        self.state: Optional[np.ndarray] = None
+
+    def steady_state(self, u0: float) -> np.ndarray:
+        """Estado de regime para entrada constante u0 (arranque sem transitório)."""
+        return np.linalg.solve(np.eye(len(self.B)) - self.A, self.B * u0)
+
+    def process(self, u: np.ndarray) -> np.ndarray:
+        if self.state is None:
+            self.state = self.steady_state(u[0])
+
+        L = self.block_size
+        n_blocks, tail = divmod(len(u), L)
+        out = np.empty(len(u))
+
+        if n_blocks:
+            blocks = u[:n_blocks * L].reshape(n_blocks, L)
+            zero_state = blocks @ self._toeplitz.T
+            state_inputs = blocks @ self._powers_b[::-1]
+            block_states = np.empty((n_blocks, len(self.state)))
+            a_block = self._powers[L]
+            x = self.state
+            for b in range(n_blocks):
+                block_states[b] = x
+                x = a_block @ x + state_inputs[b]
+            self.state = x
+            out[:n_blocks * L] = (zero_state + block_states @ self._observability.T).ravel()
+
+        if tail:
+            u_tail = u[n_blocks * L:]
+            out[n_blocks * L:] = self._toeplitz[:tail, :tail] @ u_tail + self._observability[:tail] @ self.state
+            self.state = self._powers[tail] @ self.state + u_tail @ self._powers_b[tail - 1::-1]
+        return out
+
+
+class EMAFilter(DerivedSignal):
+    """
+    Média móvel exponencial: y[n] = alpha * x[n] + (1 - alpha) * y[n-1].
+    """
+
+    def __init__(self, alpha: float = settings.FILTER_EMA_ALPHA):
+        if not 0.0 < alpha <= 1.0:
+            raise ValueError("alpha deve pertencer a ]0, 1].")
+        self.alpha = alpha
+        self.reset()
+
+    def reset(self) -> None:
+        super().reset()
+        a = self.alpha
+        self._section = _StateSpaceSection(np.array([[1.0 - a]]), np.array([a]), np.array([1.0 - a]), a)
+
+    def _process(self, values: np.ndarray, timestamps_ms: Optional[np.ndarray]) -> np.ndarray:
+        return self._section.process(values)
+
+
+class MovingAverageFilter(DerivedSignal):
+    """
+    Média móvel causal de 'window' amostras (somas cumulativas sobre o histórico + bloco).
+    """
+
+    def __init__(self, window: int = settings.FILTER_MA_WINDOW):
+        if window < 1:
+            raise ValueError("A janela deve ter pelo menos uma amostra.")
+        self.window = window
+        self.reset()
+
+    def reset(self) -> None:
+        super().reset()
+        self._history: Optional[np.ndarray] = None
+
+    def _process(self, values: np.ndarray, timestamps_ms: Optional[np.ndarray]) -> np.ndarray:
+        w = self.window
+        if self._history is None:
+            self._history = np.full(w - 1, values[0])
+        extended = np.concatenate((self._history, values))
+        sums = np.concatenate(([0.0], np.cumsum(extended)))
+        self._history = extended[len(extended) - (w - 1):]
+        return (sums[w:] - sums[:-w]) / w
+
+
+class ButterworthLowpass(DerivedSignal):
+    """
+    Passa-baixo Butterworth digital (transformação bilinear) em cascata de secções.
+
+    A frequência de amostragem, quando omitida, é estimada no primeiro bloco a
+    partir da mediana dos intervalos de timestamps_ms.
+    """
+
+    def __init__(self, cutoff_hz: float = settings.FILTER_BUTTERWORTH_CUTOFF_HZ,
+                 order: int = settings.FILTER_BUTTERWORTH_ORDER,
+                 sample_rate_hz: Optional[float] = None):
+        if order < 1:
+            raise ValueError("A ordem deve ser pelo menos 1.")
+        self.cutoff_hz = cutoff_hz
+        self.order = order
+        self.sample_rate_hz = sample_rate_hz
+        self.reset()
+
+    def reset(self) -> None:
+        super().reset()
+        self._sections: Optional[List[_StateSpaceSection]] = None
+
+    def _design(self, sample_rate_hz: float) -> List[_StateSpaceSection]:
+        """Secções biquad (e uma de 1.ª ordem se a ordem for ímpar) na forma de espaço de estados."""
+        fc = min(self.cutoff_hz, 0.49 * sample_rate_hz)
+        k = math.tan(math.pi * fc / sample_rate_hz)
+        sections = []
+
+        for i in range(self.order // 2):
+            q = 1.0 / (2.0 * math.cos(math.pi * (2 * i + 1) / (2 * self.order)))
+            norm = 1.0 / (1.0 + k / q + k * k)
+            b0 = k * k * norm
+            b1, b2 = 2.0 * b0, b0
+            a1 = 2.0 * (k * k - 1.0) * norm
+            a2 = (1.0 - k / q + k * k) * norm
+            # Forma direta II transposta.
+            sections.append(_StateSpaceSection(
+                np.array([[-a1, 1.0], [-a2, 0.0]]),
+                np.array([b1 - a1 * b0, b2 - a2 * b0]),
+                np.array([1.0, 0.0]),
+                b0
+            ))
+
+        if self.order % 2:
+            b0 = k / (1.0 + k)
+            a1 = (k - 1.0) / (k + 1.0)
+            sections.append(_StateSpaceSection(
+                np.array([[-a1]]), np.array([b0 - a1 * b0]), np.array([1.0]), b0
+            ))
+        return sections
+
+    def _process(self, values: np.ndarray, timestamps_ms: Optional[np.ndarray]) -> np.ndarray:
+        if self._sections is None:
+            rate = self.sample_rate_hz
+            if rate is None:
+                rate = _estimate_sample_rate(timestamps_ms)
+            self._sections = self._design(rate)
+
+        out = values
+        for section in self._sections:
+            out = section.process(out)
+        return out
+
+
+class DerivativeSignal(DerivedSignal):
+    """
+    Derivada temporal por diferenças regressivas (unidades por segundo).
+
+    Sem timestamps_ms, a derivada é calculada por amostra.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        super().reset()
+        self._prev_value: Optional[float] = None
+        self._prev_time: Optional[float] = None
+        self._sample_count: int = 0
+
+    def _process(self, values: np.ndarray, timestamps_ms: Optional[np.ndarray]) -> np.ndarray:
+        if timestamps_ms is None:
+            times = self._sample_count + np.arange(len(values), dtype='f8')
+        else:
+            times = np.asarray(timestamps_ms, dtype='f8') / 1000.0
+        self._sample_count += len(values)
+
+        if self._prev_value is None:
+            self._prev_value, self._prev_time = values[0], times[0]
+
+        dv = np.diff(values, prepend=self._prev_value)
+        dt = np.diff(times, prepend=self._prev_time)
+        self._prev_value, self._prev_time = values[-1], times[-1]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            out = dv / dt
+        # Intervalo nulo: derivada nula sem variação (primeira amostra), indefinida caso contrário.
+        stalled = dt <= 0
+        out[stalled] = np.where(dv[stalled] == 0, 0.0, np.nan)
+        return out
+
+
+class RMSEnvelope(DerivedSignal):
+    """
+    Envelope RMS causal: raiz da média móvel do quadrado do sinal.
+    """
+
+    def __init__(self, window: int = settings.FILTER_RMS_WINDOW):
+        self._mean_square = MovingAverageFilter(window)
+        self.reset()
+
+    def reset(self) -> None:
+        super().reset()
+        self._mean_square.reset()
+
+    def _process(self, values: np.ndarray, timestamps_ms: Optional[np.ndarray]) -> np.ndarray:
+        return np.sqrt(np.maximum(self._mean_square.process(values * values), 0.0))
+
+
+_SIGNAL_CLASSES = {
+    'ema': EMAFilter,
+    'moving_average': MovingAverageFilter,
+    'butterworth': ButterworthLowpass,
+    'derivative': DerivativeSignal,
+    'rms_envelope': RMSEnvelope,
+}
+
+
+def _estimate_sample_rate(timestamps_ms: Optional[np.ndarray]) -> float:
+    """Frequência de amostragem (Hz) pela mediana dos intervalos; 1 kHz por omissão."""
+    if timestamps_ms is not None and len(timestamps_ms) > 1:
+        dt = np.median(np.diff(np.asarray(timestamps_ms, dtype='f8')))
+        if dt > 0:
+            return 1000.0 / dt
+    return 1000.0
+
+
+def create_signal(kind: str, **params) -> DerivedSignal:
+    """
+    Instancia um sinal derivado pelo nome (chaves de SIGNAL_KINDS).
+
+    Os parâmetros omitidos assumem os valores por omissão de config.settings.
+    """
+    if kind not in _SIGNAL_CLASSES:
+        raise ValueError(f"Sinal derivado desconhecido: {kind}")
+    return _SIGNAL_CLASSES[kind](**params)
+
+
+def compute_signal(kind: str, values: np.ndarray, timestamps_ms: Optional[np.ndarray] = None,
+                   **params) -> np.ndarray:
+    """
+    Aplica um sinal derivado em lote a uma sessão inteira (p.ex. para a coluna
+    'filtered_col' dos exportadores).
+    """
+    return create_signal(kind, **params).process(values, timestamps_ms)
@@ -0,0 +1,176 @@
+"""
+Modo de Gravação sem Interface Gráfica (Daemon de Aquisição).
+
+Para bancadas que apenas gravam, sem supervisão e em máquinas modestas:
+arranca a base de dados, as threads de rede e o DB Writer sem importar
+customtkinter nem matplotlib. A receção UDP deixa de alimentar a fila de
+visualização (sem consumidor), pelo que cada datagrama custa apenas a
+descodificação e a persistência.
+
+A gravação é controlada por:
+    * linha de comandos: --record, --arm-trigger, --setpoint V, --duration S;
+    * sinais POSIX: SIGUSR1 inicia uma sessão, SIGUSR2 encerra-a,
+      SIGINT/SIGTERM terminam o processo após a descarga pendente;
+    * canal local HTTP (core.metrics_server, 127.0.0.1): POST /record/start,
+      /record/stop, /trigger/arm, /trigger/disarm e /setpoint?value=V,
+      além dos GET de métricas e estado.
+
+Uso (a partir da raiz do projeto):
+    python main.py --headless --record --http
+"""
+
+import queue
+import signal
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+import config.settings as settings
+import core.database as database
+import core.db_writer as db_writer
+import core.udp_server as udp_server
+from core.metrics import registry
+from core.trigger import recorder as trigger_recorder
+from core.shared_state import shared_data, data_lock
+
+# Serializa os pedidos de controlo vindos de sinais, HTTP e da linha de comandos.
+_control_lock = threading.Lock()
+
+# Ações pedidas pelos sinais, executadas no ciclo principal (fora do manipulador).
+_signal_actions: queue.Queue = queue.Queue()
+_stop = threading.Event()
+
+
+def start_recording() -> Dict[str, Any]:
+    with _control_lock:
+        database.start_new_experiment()
+        return status()
+
+
+def stop_recording() -> Dict[str, Any]:
+    with _control_lock:
+        database.close_current_experiment()
+        return status()
+
+
+def arm_trigger() -> Dict[str, Any]:
+    with _control_lock:
+        trigger_recorder.arm()
+        return status()
+
+
+def disarm_trigger() -> Dict[str, Any]:
+    with _control_lock:
+        trigger_recorder.disarm()
+        return status()
+
+
+def set_setpoint(value: float) -> Dict[str, Any]:
+    """Envia um novo setpoint (V) ao firmware pela thread de comandos UDP."""
+    with data_lock:
+        shared_data["current_setpoint"] = float(value)
+        shared_data["new_command_available"] = True
+    return {'setpoint': float(value)}
+
+
+def status() -> Dict[str, Any]:
+    return {
+        'recording': database.is_experiment_running(),
+        'experiment_id': database.current_run_id,
+        'trigger_state': trigger_recorder.state,
+    }
+
+
+# Rotas POST do canal de controlo: caminho -> função(parâmetros da query) -> resposta JSON.
+CONTROL_ACTIONS: Dict[str, Callable[[Dict[str, str]], Dict[str, Any]]] = {
+    '/record/start': lambda params: start_recording(),
+    '/record/stop': lambda params: stop_recording(),
+    '/trigger/arm': lambda params: arm_trigger(),
+    '/trigger/disarm': lambda params: disarm_trigger(),
+    '/setpoint': lambda params: set_setpoint(float(params['value'])),
+}
+
+
+def _install_signal_handlers() -> None:
+    """Os manipuladores apenas enfileiram a ação; o ciclo principal executa-a."""
+    def request_stop(signum, frame) -> None:
+        _stop.set()
+
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+    # SIGUSR1/SIGUSR2 não existem em Windows.
+    if hasattr(signal, "SIGUSR1"):
+        signal.signal(signal.SIGUSR1, lambda signum, frame: _signal_actions.put(start_recording))
+        signal.signal(signal.SIGUSR2, lambda signum, frame: _signal_actions.put(stop_recording))
+
+
+def _print_status(previous: Dict[str, int], elapsed_sec: float) -> Dict[str, int]:
+    """Linha periódica de estado (débito desde a última linha, filas e sessão)."""
+    counts = {
+        'datagrams': registry.counter('udp_datagrams_total').value,
+        'rows': registry.counter('db_rows_committed_total').value,
+        'drops': registry.counter('db_queue_drops_total').value,
+    }
+    rate = (counts['datagrams'] - previous.get('datagrams', 0)) / max(elapsed_sec, 1e-9)
+    rows = (counts['rows'] - previous.get('rows', 0)) / max(elapsed_sec, 1e-9)
+    session = f"#{database.current_run_id}" if database.is_experiment_running() else "parada"
+    print(f"Headless: {rate:,.0f} datagramas/s | {rows:,.0f} linhas/s | "
+          f"db_queue {registry.gauge('db_queue_depth').value:,} | descartes {counts['drops']:,} | "
+          f"gravação {session} | gatilho {trigger_recorder.state}")
+    return counts
+
+
+def run(writer_thread: threading.Thread, record: bool = False, arm: bool = False,
+        setpoint: Optional[float] = None, duration_sec: Optional[float] = None,
+        http: bool = False, http_port: Optional[int] = None) -> None:
+    """
+    Executa o daemon até SIGINT/SIGTERM (ou duration_sec). Os serviços de base
+    (init_db, receção UDP, DB Writer, manutenção) devem estar já arrancados,
+    com udp_server.feed_display desligado antes de start_network_threads().
+    """
+    if http or settings.METRICS_HTTP_ENABLED:
+        from core import metrics_server
+        metrics_server.start(port=http_port, control_actions=CONTROL_ACTIONS)
+
+    _install_signal_handlers()
+    if setpoint is not None:
+        set_setpoint(setpoint)
+    if record:
+        start_recording()
+    elif arm:
+        arm_trigger()
+
+    print("Headless: Em aquisição. SIGUSR1 inicia e SIGUSR2 encerra a gravação; Ctrl+C termina.")
+    started = last_status = time.monotonic()
+    counts: Dict[str, int] = {}
+    while not _stop.is_set():
+        try:
+            _signal_actions.get(timeout=0.5)()
+        except queue.Empty:
+            pass
+
+        now = time.monotonic()
+        if now - last_status >= settings.HEADLESS_STATUS_INTERVAL_SEC:
+            counts = _print_status(counts, now - last_status)
+            last_status = now
+        if duration_sec is not None and now - started >= duration_sec:
+            break
+
+    shutdown(writer_thread)
+
+
+def shutdown(writer_thread: threading.Thread) -> None:
+    """Encerra a sessão em curso e aguarda a descarga da db_queue pelo DB Writer."""
+    print("Headless: A encerrar...")
+    # Barreira: a telemetria já enfileirada fica persistida antes da consolidação da sessão.
+    flushed = threading.Event()
+    db_writer.call_after_flush(flushed.set)
+    flushed.wait(timeout=settings.HEADLESS_SHUTDOWN_TIMEOUT_SEC)
+    with _control_lock:
+        if trigger_recorder.state != 'idle':
+            trigger_recorder.disarm()
+        database.close_current_experiment()
+    udp_server.stop_capture()
+    db_writer.stop_db_writer_thread()
+    writer_thread.join(timeout=settings.HEADLESS_SHUTDOWN_TIMEOUT_SEC)
+    print("Headless: Terminado.")
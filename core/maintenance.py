@@ -0,0 +1,133 @@
+"""
+Thread de Manutenção em Segundo Plano.
+
+Executa tarefas pesadas de base de dados (consolidação de pirâmides de
+decimação, preenchimento retroativo de sessões antigas, expurgo de sessões,
+etc.) fora da thread da Interface Gráfica e fora do DB Writer, garantindo que
+nem a renderização nem a descarga de telemetria ficam bloqueadas por rotinas
+analíticas. Suporta ainda tarefas periódicas executadas apenas em tempo
+ocioso (sem tarefas pendentes na fila) e lotes de tarefas que cedem a vez às
+restantes entre itens (submit_each).
+"""
+
+import threading
+import queue
+import time
+from collections import deque
+from typing import Callable, Any, Optional, List, Dict, Iterable
+
+# Fila FIFO de tarefas (callable, args, kwargs). Sem limite: as tarefas são raras e leves de enfileirar.
+_job_queue: queue.Queue = queue.Queue()
+_maintenance_thread: Optional[threading.Thread] = None
+
+# Tarefas periódicas de tempo ocioso: {'job', 'interval_sec', 'next_run'}.
+_periodic_tasks: List[Dict[str, Any]] = []
+_periodic_lock: threading.Lock = threading.Lock()
+
+# Granularidade (s) da verificação de tarefas periódicas quando a fila está vazia.
+IDLE_POLL_SEC: float = 0.5
+
+
+def submit(job: Callable[..., Any], *args: Any, **kwargs: Any) -> None:
+    """
+    Enfileira uma tarefa para execução sequencial na thread de manutenção.
+
+    Args:
+        job (Callable[..., Any]): Rotina a executar.
+        *args, **kwargs: Argumentos repassados à rotina.
+    """
+    _job_queue.put((job, args, kwargs))
+
+
+def submit_each(job: Callable[[Any], Any], items: Iterable[Any]) -> None:
+    """
+    Executa job(item) para cada item, um item por tarefa.
+
+    Cada item seguinte só é enfileirado quando o anterior termina, indo para o
+    fim da fila: tarefas submetidas entretanto (p.ex. a reserva de um
+    experimento pelo trigger) não esperam pelo lote inteiro.
+
+    Args:
+        job (Callable[[Any], Any]): Rotina aplicada a cada item.
+        items (Iterable[Any]): Itens a processar, por ordem.
+    """
+    pending = deque(items)
+
+    def step() -> None:
+        _run_job(job, pending.popleft())
+        if pending:
+            submit(step)
+
+    if pending:
+        submit(step)
+
+
+def add_periodic_task(job: Callable[[], Any], interval_sec: float) -> None:
+    """
+    Regista uma tarefa periódica executada apenas quando a fila está ociosa.
+
+    Args:
+        job (Callable[[], Any]): Rotina curta e idempotente.
+        interval_sec (float): Intervalo mínimo entre execuções consecutivas.
+    """
+    with _periodic_lock:
+        _periodic_tasks.append({
+            'job': job,
+            'interval_sec': interval_sec,
+            'next_run': time.monotonic() + interval_sec
+        })
+
+
+def _run_job(job: Callable[..., Any], *args: Any, **kwargs: Any) -> None:
+    try:
+        job(*args, **kwargs)
+    except Exception as e:
+        print(f"Manutenção: Falha na tarefa {getattr(job, '__name__', job)}: {e}")
+
+
+def _run_due_periodic_tasks() -> None:
+    """Executa as tarefas periódicas vencidas, uma passagem de cada vez."""
+    now = time.monotonic()
+    with _periodic_lock:
+        due = [task for task in _periodic_tasks if task['next_run'] <= now]
+        for task in due:
+            task['next_run'] = now + task['interval_sec']
+
+    for task in due:
+        _run_job(task['job'])
+        if not _job_queue.empty():  # Cede imediatamente a tarefas explícitas.
+            break
+
+
+def _maintenance_loop() -> None:
+    """Consome a fila de tarefas isolando falhas individuais; em ócio, corre as periódicas."""
+    print("Manutenção: Daemon alocado e a aguardar tarefas.")
+    while True:
+        try:
+            item = _job_queue.get(timeout=IDLE_POLL_SEC)
+        except queue.Empty:
+            _run_due_periodic_tasks()
+            continue
+
+        if item is None:  # Sinal de Shutdown/Poison Pill
+            break
+
+        job, args, kwargs = item
+        _run_job(job, *args, **kwargs)
+
+    print("Manutenção: Daemon finalizado em segurança.")
+
+
+def start_maintenance_thread() -> threading.Thread:
+    """Injeta o ciclo de manutenção numa subrotina desacoplada (idempotente)."""
+    global _maintenance_thread
+    if _maintenance_thread is not None and _maintenance_thread.is_alive():
+        return _maintenance_thread
+    _maintenance_thread = threading.Thread(target=_maintenance_loop, name="maintenance", daemon=True)
+    _maintenance_thread.start()
+    return _maintenance_thread
+
+
+def stop_maintenance_thread() -> None:
+    """Injeta a diretiva de paragem (Poison Pill) após as tarefas pendentes."""
+    _job_queue.put(None)
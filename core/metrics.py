@@ -0,0 +1,157 @@
+"""
+Registo de Métricas de Execução (Contadores, Medidores e Histogramas).
+
+Instrumentação leve do pipeline (receção UDP, filas, DB Writer, renderização)
+para o painel de saúde e para a exportação de métricas. Convenções:
+
+    * Cada métrica é atualizada por uma única thread produtora (p.ex. a de
+      receção), pelo que as atualizações não usam locks: no CPython, a
+      atribuição de um inteiro/float é atómica e não há escritas concorrentes.
+      Os leitores (thread Tk, servidor de métricas) obtêm valores consistentes
+      ao nível de cada campo.
+    * Medidores podem ser calculados na leitura (fn), p.ex. a profundidade de
+      uma fila: custo nulo no caminho crítico.
+    * Histogramas têm baldes fixos (limites superiores inclusivos, estilo
+      Prometheus) e contagens não cumulativas internamente.
+
+O lock do registo protege apenas a criação de métricas, nunca as atualizações.
+"""
+
+import bisect
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+# Baldes por omissão para latências em milissegundos.
+LATENCY_BUCKETS_MS: tuple = (0.5, 1, 2, 5, 10, 20, 33, 50, 100, 200, 500, 1000, 2000)
+
+
+class Counter:
+    """Contador monotónico."""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, help_text: str = ""):
+        self.name = name
+        self.help = help_text
+        self.value = 0
+
+    def inc(self, amount: int = 1) -> None:
+        self.value += amount
+
+
+class Gauge:
+    """Valor instantâneo, definido explicitamente ou calculado na leitura."""
+
+    kind = 'gauge'
+
+    def __init__(self, name: str, help_text: str = "", fn: Optional[Callable[[], float]] = None):
+        self.name = name
+        self.help = help_text
+        self._fn = fn
+        self._value = 0.0
+
+    def set(self, value: float) -> None:
+        self._value = value
+
+    @property
+    def value(self) -> float:
+        if self._fn is not None:
+            try:
+                return self._fn()
+            except Exception:
+                return float('nan')
+        return self._value
+
+
+class Histogram:
+    """Histograma de baldes fixos com soma e contagem."""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str = "", buckets: Sequence[float] = LATENCY_BUCKETS_MS):
+        self.name = name
+        self.help = help_text
+        self.buckets: List[float] = sorted(buckets)
+        # Um balde extra para valores acima do último limite (+Inf).
+        self.counts: List[int] = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.last = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.last = value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimativa do quantil q por interpolação linear dentro do balde."""
+        counts = list(self.counts)
+        total = sum(counts)
+        if total == 0:
+            return None
+        rank = q * total
+        cumulative = 0
+        for i, n in enumerate(counts):
+            if cumulative + n >= rank and n > 0:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - cumulative) / n
+            cumulative += n
+        return self.buckets[-1]
+
+
+class MetricsRegistry:
+    """
+    Registo nomeado de métricas; as funções de criação são idempotentes.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, name: str, factory: Callable[[], Any]) -> Any:
+        metric = self._metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(name)
+                if metric is None:
+                    metric = factory()
+                    self._metrics[name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str = "") -> Counter:
+        return self._get_or_create(name, lambda: Counter(name, help_text))
+
+    def gauge(self, name: str, help_text: str = "", fn: Optional[Callable[[], float]] = None) -> Gauge:
+        return self._get_or_create(name, lambda: Gauge(name, help_text, fn))
+
+    def histogram(self, name: str, help_text: str = "", buckets: Sequence[float] = LATENCY_BUCKETS_MS) -> Histogram:
+        return self._get_or_create(name, lambda: Histogram(name, help_text, buckets))
+
+    def get(self, name: str) -> Any:
+        return self._metrics.get(name)
+
+    def all(self) -> List[Any]:
+        return list(self._metrics.values())
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Valores atuais: número (contador/medidor) ou resumo do histograma."""
+        result: Dict[str, Any] = {}
+        for metric in self.all():
+            if metric.kind == 'histogram':
+                result[metric.name] = {
+                    'count': metric.count,
+                    'sum': metric.sum,
+                    'last': metric.last,
+                    'p50': metric.quantile(0.5),
+                    'p95': metric.quantile(0.95),
+                    'buckets': dict(zip([*map(str, metric.buckets), '+Inf'], metric.counts)),
+                }
+            else:
+                result[metric.name] = metric.value
+        return result
+
+
+# Registo global do processo.
+registry = MetricsRegistry()
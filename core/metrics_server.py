@@ -0,0 +1,172 @@
+"""
+Servidor HTTP Local de Métricas e Estado (Biblioteca Padrão).
+
+Para bancadas em gravação prolongada sem supervisão: expõe, em 127.0.0.1,
+o registo de métricas (core.metrics) e o estado da aquisição, sem tocar na
+interface gráfica. Corre numa thread daemon própria (ThreadingHTTPServer);
+os pedidos apenas leem valores já mantidos pelo pipeline.
+
+Endpoints:
+    GET /metrics        Formato de texto Prometheus (0.0.4).
+    GET /metrics.json   Instantâneo do registo em JSON.
+    GET /status         Estado da gravação (database.is_experiment_running()) e do gatilho.
+    GET /latest         Últimos valores de cada canal, decimados a uma amostra por datagrama.
+
+Opcionalmente serve também um canal de controlo (pedidos POST), cujas
+rotas são fornecidas por quem arranca o servidor (p.ex. core.headless).
+
+Desativado por omissão (settings.METRICS_HTTP_ENABLED): nesse caso o módulo
+nem é importado e a receção UDP não publica a amostra mais recente.
+"""
+
+import json
+import math
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+import config.settings as settings
+import core.database as database
+import core.udp_server as udp_server
+from core.metrics import registry
+from core.trigger import recorder as trigger_recorder
+
+_server: Optional[ThreadingHTTPServer] = None
+# Rotas POST do canal de controlo: caminho -> função(parâmetros da query) -> resposta JSON.
+_control_actions: Dict[str, Callable[[Dict[str, str]], Dict[str, Any]]] = {}
+_started_at: float = time.time()
+
+# Canais publicados em /latest (os mesmos da telemetria binária).
+LATEST_CHANNELS: Tuple[str, ...] = (
+    'timestamp_amostra_ms', 'sinal_controle', 'tensao_mv', 'valor_adc', 'tensao_estimada_mv',
+    'erro_obs_mv', 'estado_1', 'estado_2', 'estado_3',
+)
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, float) and math.isnan(value):
+        return "NaN"
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def render_prometheus() -> str:
+    """Serializa o registo no formato de texto Prometheus (histogramas com baldes cumulativos)."""
+    lines: List[str] = []
+    for metric in registry.all():
+        name = f"interface_planta_{metric.name}"
+        if metric.help:
+            lines.append(f"# HELP {name} {metric.help}")
+        lines.append(f"# TYPE {name} {metric.kind}")
+        if metric.kind == 'histogram':
+            cumulative = 0
+            counts = list(metric.counts)
+            for bound, n in zip(metric.buckets, counts):
+                cumulative += n
+                lines.append(f'{name}_bucket{{le="{bound:g}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{le="+Inf"}} {cumulative + counts[-1]}')
+            lines.append(f"{name}_sum {_format_value(float(metric.sum))}")
+            lines.append(f"{name}_count {metric.count}")
+        else:
+            lines.append(f"{name} {_format_value(metric.value)}")
+    return "\n".join(lines) + "\n"
+
+
+def status() -> Dict[str, Any]:
+    return {
+        'recording': database.is_experiment_running(),
+        'experiment_id': database.current_run_id,
+        'trigger_state': trigger_recorder.state,
+        'uptime_sec': round(time.time() - _started_at, 1),
+    }
+
+
+def latest() -> Dict[str, Any]:
+    sample = udp_server.latest_sample
+    if sample is None:
+        return {'available': False}
+    values = {c: sample.get(c) for c in LATEST_CHANNELS}
+    return {'available': True, 'received_at': sample.get('timestamp_recebimento'), 'values': values}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    routes = {
+        '/metrics': lambda: (render_prometheus(), "text/plain; version=0.0.4; charset=utf-8"),
+        '/metrics.json': lambda: (json.dumps(registry.snapshot()), "application/json"),
+        '/status': lambda: (json.dumps(status()), "application/json"),
+        '/latest': lambda: (json.dumps(latest()), "application/json"),
+    }
+
+    def do_GET(self) -> None:
+        route = self.routes.get(self.path.split("?", 1)[0])
+        if route is None:
+            self.send_error(404, "Endpoint desconhecido")
+            return
+        body, content_type = route()
+        payload = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self) -> None:
+        url = urlsplit(self.path)
+        action = _control_actions.get(url.path)
+        if action is None:
+            self.send_error(404, "Ação de controlo desconhecida")
+            return
+        try:
+            result = action(dict(parse_qsl(url.query)))
+        except (KeyError, ValueError) as e:
+            self.send_error(400, f"Parâmetros inválidos: {e}")
+            return
+        payload = json.dumps(result).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        # Sem registo por pedido (a raspagem periódica inundaria a consola).
+        pass
+
+
+def start(host: str = "127.0.0.1", port: Optional[int] = None,
+          control_actions: Optional[Dict[str, Callable[[Dict[str, str]], Dict[str, Any]]]] = None
+          ) -> Optional[ThreadingHTTPServer]:
+    """
+    Inicia o servidor numa thread daemon (idempotente). Devolve None se a porta estiver ocupada.
+
+    Args:
+        control_actions: Rotas POST do canal de controlo (omitidas: servidor só de leitura).
+    """
+    global _server
+    if control_actions:
+        _control_actions.update(control_actions)
+    if _server is not None:
+        return _server
+    port = settings.METRICS_HTTP_PORT if port is None else port
+    try:
+        _server = ThreadingHTTPServer((host, port), _Handler)
+    except OSError as e:
+        print(f"Métricas HTTP: Porta {port} indisponível ({e}).")
+        return None
+    _server.daemon_threads = True
+
+    udp_server.publish_latest = True
+    threading.Thread(target=_server.serve_forever, name="metrics-http", daemon=True).start()
+    print(f"Métricas HTTP: A servir em http://{host}:{_server.server_address[1]}/metrics")
+    return _server
+
+
+def stop() -> None:
+    global _server
+    if _server is None:
+        return
+    udp_server.publish_latest = False
+    _server.shutdown()
+    _server.server_close()
+    _server = None
@@ -0,0 +1,348 @@
+"""
+Simulador Local da Planta (ESP32 + Motor DC + Tacogerador).
+
+Substitui a placa física para ensaios de carga e de regressão: modela o
+motor DC e o tacogerador como sistema em espaço de estados discreto (ZOH),
+fecha a malha com o controlador PI e o observador de Luenberger executados
+pelo firmware e emite a telemetria no formato binário exato esperado por
+core.udp_server (<I8f x 5 amostras = 180 bytes) para UDP_TELEMETRY_PORT em
+localhost. A referência (Tensão Alvo em Volts, '<f') é recebida em
+UDP_COMMAND_PORT.
+
+A malha fechada é linear, pelo que cada datagrama é avaliado num único passo
+vetorizado: z[k] = A^k z0 + sum_j A^(k-1-j) B u[j], com as potências e a
+matriz de convolução pré-calculadas. Deficiências de rede opcionais: jitter
+no instante de envio, perda e troca de ordem de datagramas.
+
+Para fechar a malha com a interface, defina ESP_IP = "127.0.0.1" em
+config/settings.py (o emissor de comandos envia para ESP_IP).
+
+Uso (a partir da raiz do projeto):
+    python -m core.plant_simulator --rate 1000 --jitter-ms 0.5 --loss 0.01 --reorder 0.005
+"""
+
+import argparse
+import heapq
+import socket
+import struct
+import threading
+import time
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+import config.settings as settings
+from core.udp_server import PACKET_DTYPE, SAMPLES_PER_PACKET, COMMAND_STRUCT_FORMAT
+
+# Limites da taxa de amostragem simulada (Hz).
+MIN_RATE_HZ: float = 200.0
+MAX_RATE_HZ: float = 20_000.0
+
+# Parâmetros físicos do motor DC, do tacogerador, do PWM e do controlador do firmware.
+PLANT_PARAMETERS: Dict[str, float] = {
+    'resistencia_ohm': 2.0,
+    'indutancia_h': 5e-3,
+    'constante_motor': 0.02,        # Kt = Ke (N.m/A = V.s/rad)
+    'inercia_kg_m2': 2e-5,
+    'atrito_viscoso': 1e-5,         # N.m.s/rad
+    'ganho_tacometro': 0.005,       # V/(rad/s)
+    'tensao_alimentacao_v': 12.0,
+    'ruido_medicao_mv': 5.0,
+    'kp': 20.0,                     # %/V
+    'ki': 200.0,                    # %/(V.s)
+    'ganho_observador': 0.1,        # Fração do erro de saída corrigida por amostra.
+}
+
+# Fundo de escala do ADC de 12 bits (mV).
+ADC_FULL_SCALE_MV: float = 3300.0
+
+
+def _expm(M: np.ndarray) -> np.ndarray:
+    """Exponencial de matriz por escalonamento e quadratura com série de Taylor (matrizes pequenas)."""
+    norm = np.linalg.norm(M, np.inf)
+    squarings = max(0, int(np.ceil(np.log2(norm))) + 1) if norm > 0.5 else 0
+    A = M / (2 ** squarings)
+    result = np.eye(len(M))
+    term = np.eye(len(M))
+    for k in range(1, 20):
+        term = term @ A / k
+        result = result + term
+    for _ in range(squarings):
+        result = result @ result
+    return result
+
+
+def closed_loop_model(rate_hz: float, params: Dict[str, float] = PLANT_PARAMETERS
+                      ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Malha fechada discreta z[k+1] = A z[k] + B u[k], y[k] = C z[k] + D u[k].
+
+    Estado z = [corrente, velocidade, integral do erro, corrente estimada,
+    velocidade estimada]; entrada u = [referência (V), ruído de medição (V)];
+    saídas y = [sinal_controle (%), tensao_mv, tensao_estimada_mv, erro_obs_mv,
+    estado_1, estado_2, estado_3].
+    """
+    dt = 1.0 / rate_hz
+    R, L = params['resistencia_ohm'], params['indutancia_h']
+    K, J, b = params['constante_motor'], params['inercia_kg_m2'], params['atrito_viscoso']
+    kg, vcc = params['ganho_tacometro'], params['tensao_alimentacao_v']
+    kp, ki, lo = params['kp'], params['ki'], params['ganho_observador']
+
+    # Planta contínua x = [i, w], entrada tensão de armadura; discretização ZOH exata.
+    Ac = np.array([[-R / L, -K / L], [K / J, -b / J]])
+    Bc = np.array([[1.0 / L], [0.0]])
+    augmented = np.zeros((3, 3))
+    augmented[:2, :2] = Ac * dt
+    augmented[:2, 2:] = Bc * dt
+    phi = _expm(augmented)
+    Ad, Bd = phi[:2, :2], phi[:2, 2]
+    Cy = np.array([0.0, kg])
+    obs_gain = np.array([0.0, lo / kg])
+
+    # Lei de controle: duty = kp (r - y) + ki q; tensão de armadura = duty/100 * vcc.
+    # Linhas de 'duty' sobre [z, u]: y medido = Cy x + ruído.
+    duty = np.zeros(7)
+    duty[0:2] = -kp * Cy
+    duty[2] = ki
+    duty[5] = kp
+    duty[6] = -kp
+    v_arm = duty * vcc / 100.0
+
+    A = np.zeros((5, 5))
+    B = np.zeros((5, 2))
+    full = np.zeros((5, 7))
+    # Planta.
+    full[0:2, 0:2] = Ad
+    full[0:2] += np.outer(Bd, v_arm)
+    # Integrador do erro.
+    full[2, 0:2] = -dt * Cy
+    full[2, 2] = 1.0
+    full[2, 5] = dt
+    full[2, 6] = -dt
+    # Observador (cópia do modelo + correção pelo erro de saída).
+    full[3:5, 3:5] = Ad - np.outer(obs_gain, Cy)
+    full[3:5] += np.outer(Bd, v_arm)
+    full[3:5, 0:2] += np.outer(obs_gain, Cy)
+    full[3:5, 6] += obs_gain
+    A[:] = full[:, :5]
+    B[:] = full[:, 5:]
+
+    out = np.zeros((7, 7))
+    out[0] = duty
+    out[1, 0:2] = 1000.0 * Cy
+    out[1, 6] = 1000.0
+    out[2, 3:5] = 1000.0 * Cy
+    out[3] = out[1] - out[2]
+    out[4, 3] = 1.0
+    out[5, 4] = 1.0
+    out[6, 2] = 1.0
+    return A, B, out[:, :5], out[:, 5:]
+
+
+class PlantSimulator:
+    """
+    Emissor de telemetria simulada com receção de referências e deficiências de rede.
+    """
+
+    def __init__(self, rate_hz: float = 1000.0, jitter_ms: float = 0.0, loss: float = 0.0,
+                 reorder: float = 0.0, host: str = "127.0.0.1",
+                 telemetry_port: int = settings.UDP_TELEMETRY_PORT,
+                 command_port: int = settings.UDP_COMMAND_PORT,
+                 initial_setpoint: float = 0.0, seed: Optional[int] = None):
+        """
+        Args:
+            rate_hz (float): Taxa de amostragem simulada, entre MIN_RATE_HZ e MAX_RATE_HZ.
+            jitter_ms (float): Desvio-padrão do atraso aleatório de cada datagrama.
+            loss (float): Probabilidade de descartar um datagrama.
+            reorder (float): Probabilidade de atrasar um datagrama para depois do seguinte.
+            host (str): Destino da telemetria.
+            telemetry_port (int): Porta UDP de telemetria do recetor.
+            command_port (int): Porta UDP onde são recebidas as referências ('<f'); 0 desativa.
+            initial_setpoint (float): Referência inicial (V).
+            seed (Optional[int]): Semente do gerador aleatório (ensaios reprodutíveis).
+        """
+        if not MIN_RATE_HZ <= rate_hz <= MAX_RATE_HZ:
+            raise ValueError(f"Taxa fora do intervalo suportado ({MIN_RATE_HZ:.0f}-{MAX_RATE_HZ:.0f} Hz): {rate_hz}")
+
+        self.rate_hz = rate_hz
+        self.jitter_ms = jitter_ms
+        self.loss = loss
+        self.reorder = reorder
+        self.address = (host, telemetry_port)
+        self.command_port = command_port
+        self.setpoint = float(initial_setpoint)
+        self.rng = np.random.default_rng(seed)
+
+        self.stats: Dict[str, int] = {'sent': 0, 'lost': 0, 'reordered': 0, 'commands': 0}
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+        # Avaliação por datagrama: potências A^k e convolução das entradas.
+        n = SAMPLES_PER_PACKET
+        A, B, self._C, self._D = closed_loop_model(rate_hz)
+        powers = [np.eye(len(A))]
+        for _ in range(n):
+            powers.append(A @ powers[-1])
+        self._powers = np.array(powers[:n])                                # (n, 5, 5)
+        self._a_block = powers[n]
+        conv = np.zeros((n, n, len(A), B.shape[1]))
+        for k in range(n):
+            for j in range(k):
+                conv[k, j] = powers[k - 1 - j] @ B
+        self._conv = conv                                                  # (n, n, 5, 2)
+        self._last_input = np.array([powers[n - 1 - j] @ B for j in range(n)])  # (n, 5, 2)
+        self._state = np.zeros(len(A))
+        self._sample_index = 0
+        self._noise_v = PLANT_PARAMETERS['ruido_medicao_mv'] / 1000.0
+
+    def set_setpoint(self, volts: float) -> None:
+        self.setpoint = float(volts)
+
+    def next_packet(self) -> bytes:
+        """Avança a simulação SAMPLES_PER_PACKET amostras e devolve o datagrama de 180 bytes."""
+        n = SAMPLES_PER_PACKET
+        inputs = np.empty((n, 2))
+        inputs[:, 0] = self.setpoint
+        inputs[:, 1] = self.rng.normal(0.0, self._noise_v, n)
+
+        z0 = self._state
+        states = self._powers @ z0 + np.einsum('kjab,jb->ka', self._conv, inputs)
+        outputs = states @ self._C.T + inputs @ self._D.T
+        self._state = self._a_block @ z0 + np.einsum('jab,jb->a', self._last_input, inputs)
+
+        packet = np.empty(n, dtype=PACKET_DTYPE)
+        indices = self._sample_index + np.arange(n)
+        self._sample_index += n
+        packet['timestamp_amostra_ms'] = (indices * 1000.0 / self.rate_hz).astype(np.uint32)
+        packet['sinal_controle'] = outputs[:, 0]
+        packet['tensao_mv'] = outputs[:, 1]
+        packet['valor_adc'] = np.clip(np.rint(outputs[:, 1] / ADC_FULL_SCALE_MV * 4095.0), 0, 4095)
+        packet['tensao_estimada_mv'] = outputs[:, 2]
+        packet['erro_obs_mv'] = outputs[:, 3]
+        packet['estado_1'] = outputs[:, 4]
+        packet['estado_2'] = outputs[:, 5]
+        packet['estado_3'] = outputs[:, 6]
+        return packet.tobytes()
+
+    def _command_loop(self) -> None:
+        """Recebe referências '<f' (V) enviadas pelo emissor de comandos da interface."""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            sock.bind(('', self.command_port))
+        except socket.error as e:
+            print(f"Simulador: Porta de comandos {self.command_port} indisponível ({e}).")
+            return
+        sock.settimeout(0.2)
+
+        while not self._stop.is_set():
+            try:
+                payload, _ = sock.recvfrom(64)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            if len(payload) == struct.calcsize(COMMAND_STRUCT_FORMAT):
+                self.set_setpoint(struct.unpack(COMMAND_STRUCT_FORMAT, payload)[0])
+                self.stats['commands'] += 1
+        sock.close()
+
+    def run(self, duration_sec: Optional[float] = None) -> Dict[str, int]:
+        """
+        Emite telemetria ao ritmo nominal até stop() ou até duration_sec.
+
+        Os datagramas são agendados numa fila de prioridade pelo instante de
+        envio (nominal + jitter, + um período se trocado de ordem); o laço
+        envia em rajada todos os vencidos, mantendo a taxa média mesmo com a
+        granularidade grosseira de time.sleep().
+        """
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 1 << 20)
+        period = SAMPLES_PER_PACKET / self.rate_hz
+        pending: List[Tuple[float, int, bytes]] = []
+        generated = 0
+        start = time.perf_counter()
+        deadline = None if duration_sec is None else start + duration_sec
+
+        while not self._stop.is_set():
+            now = time.perf_counter()
+            if deadline is not None and now >= deadline:
+                break
+
+            # Gera os datagramas cujo instante nominal já passou.
+            while start + generated * period <= now:
+                payload = self.next_packet()
+                send_at = start + generated * period
+                generated += 1
+                if self.loss and self.rng.random() < self.loss:
+                    self.stats['lost'] += 1
+                    continue
+                if self.jitter_ms:
+                    send_at += abs(self.rng.normal(0.0, self.jitter_ms / 1000.0))
+                if self.reorder and self.rng.random() < self.reorder:
+                    send_at += 1.5 * period
+                    self.stats['reordered'] += 1
+                heapq.heappush(pending, (send_at, generated, payload))
+
+            while pending and pending[0][0] <= now:
+                _, _, payload = heapq.heappop(pending)
+                try:
+                    sock.sendto(payload, self.address)
+                    self.stats['sent'] += 1
+                except OSError:
+                    self.stats['lost'] += 1
+
+            next_event = start + generated * period
+            if pending:
+                next_event = min(next_event, pending[0][0])
+            time.sleep(max(0.0, min(next_event - time.perf_counter(), 0.001)))
+
+        sock.close()
+        return self.stats
+
+    def start(self, duration_sec: Optional[float] = None) -> None:
+        """Lança a emissão (e a receção de comandos, se ativa) em threads daemon."""
+        self._stop.clear()
+        self._threads = [threading.Thread(target=self.run, args=(duration_sec,), name="plant-simulator", daemon=True)]
+        if self.command_port:
+            self._threads.append(threading.Thread(target=self._command_loop, name="plant-simulator-cmd", daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    @property
+    def running(self) -> bool:
+        return bool(self._threads) and self._threads[0].is_alive()
+
+    def stop(self) -> None:
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=float, default=1000.0, help="Taxa de amostragem (Hz), 200 a 20000.")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--loss", type=float, default=0.0, help="Probabilidade de perda por datagrama.")
+    parser.add_argument("--reorder", type=float, default=0.0, help="Probabilidade de troca de ordem.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--setpoint", type=float, default=1.5, help="Referência inicial (V).")
+    parser.add_argument("--duration", type=float, default=None, help="Duração (s); omissa = até Ctrl+C.")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    simulator = PlantSimulator(args.rate, args.jitter_ms, args.loss, args.reorder, args.host,
+                               initial_setpoint=args.setpoint, seed=args.seed)
+    print(f"Simulador: {args.rate:.0f} Hz ({args.rate / SAMPLES_PER_PACKET:.0f} datagramas/s) -> "
+          f"{args.host}:{settings.UDP_TELEMETRY_PORT}; comandos em :{settings.UDP_COMMAND_PORT}.")
+    simulator.start(args.duration)
+    try:
+        while simulator.running:
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        pass
+    simulator.stop()
+    print(f"Simulador: {simulator.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Reprodução de Experimentos Gravados pelo Pipeline em Tempo Real.
+
+Reinjeta uma sessão da base de dados (ou do arquivo) na fila de visualização
+(data_queue), pelo mesmo caminho da telemetria UDP: process_queue ->
+GraphManager. A leitura é feita em streaming por blocos
+(database.iter_telemetry_chunks), pelo que a memória ocupada fica limitada a
+um bloco mais a capacidade de data_queue, independentemente da duração da
+sessão. O ritmo segue os timestamps do firmware multiplicados pelo fator de
+velocidade; pausa, mudança de velocidade e salto (seek) são pedidos
+assíncronos atendidos pela thread de reprodução, sem bloquear a thread Tk.
+
+As amostras reproduzidas levam a chave 'reproducao' para que o painel as
+distinga da telemetria viva; antes da primeira amostra e após cada salto é
+enfileirado um marcador (chave PLAYBACK_RESET_KEY, com o início da sessão em
+'t_inicio_ms'), que limpa os buffers do gráfico.
+"""
+
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import config.settings as settings
+import core.database as database
+from core.shared_state import data_queue
+
+# Chave do marcador ordenado com os dados: o consumidor deve limpar os buffers do gráfico.
+PLAYBACK_RESET_KEY: str = 'reproducao_reset'
+
+# Granularidade (s) do agendamento: as amostras vencidas são enfileiradas em rajada.
+PACING_TICK_SEC: float = 0.01
+
+
+class ExperimentPlayback:
+    """
+    Reprodutor de uma sessão gravada numa thread daemon.
+    """
+
+    def __init__(self, exp_id: int, speed: float = 1.0,
+                 chunk_size: int = settings.PLAYBACK_CHUNK_SAMPLES,
+                 target_queue: queue.Queue = data_queue):
+        self.exp_id = exp_id
+        self.speed = float(speed)
+        self.chunk_size = chunk_size
+        self.target_queue = target_queue
+
+        bounds = database.get_experiment_time_bounds(exp_id)
+        if bounds is None:
+            raise ValueError(f"Sessão #{exp_id} sem telemetria.")
+        self.t_start_ms, self.t_end_ms, self.total_samples = bounds
+
+        self.position_ms: int = self.t_start_ms
+        self.paused: bool = False
+        self.finished: bool = False
+        self.samples_sent: int = 0
+
+        self._seek_ms: Optional[int] = self.t_start_ms
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def duration_ms(self) -> int:
+        return self.t_end_ms - self.t_start_ms
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def set_speed(self, speed: float) -> None:
+        """Altera o fator de velocidade (o relógio é reancorado na amostra seguinte)."""
+        self.speed = max(float(speed), 1e-3)
+
+    def set_paused(self, paused: bool) -> None:
+        self.paused = paused
+
+    def seek(self, t_ms: int) -> None:
+        """Pede um salto para t_ms (instante do firmware), limitado à duração da sessão."""
+        self._seek_ms = int(min(max(t_ms, self.t_start_ms), self.t_end_ms))
+        self.position_ms = self._seek_ms
+        self.finished = False
+
+    def _put(self, item: Dict[str, Any]) -> bool:
+        """Enfileira com contrapressão (sem descartar); False se a reprodução foi interrompida."""
+        while not self._stop.is_set():
+            try:
+                self.target_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self) -> None:
+        print(f"Reprodução: Sessão #{self.exp_id} ({self.total_samples:,} amostras) a {self.speed:g}x.")
+        while not self._stop.is_set():
+            if self._seek_ms is None:
+                # Fim da sessão: aguarda um salto ou a paragem.
+                time.sleep(PACING_TICK_SEC)
+                continue
+
+            t_from = self._seek_ms
+            self._seek_ms = None
+            if not self._put({PLAYBACK_RESET_KEY: True, 't_inicio_ms': self.t_start_ms}):
+                break
+            self._stream_from(t_from)
+
+        print(f"Reprodução: Sessão #{self.exp_id} terminada ({self.samples_sent:,} amostras enviadas).")
+
+    def _stream_from(self, t_from_ms: int) -> None:
+        """Percorre os blocos a partir de t_from_ms, respeitando o ritmo, pausas e saltos."""
+        anchor_wall: Optional[float] = None
+        anchor_ms = t_from_ms
+        anchor_speed = self.speed
+
+        for chunk in database.iter_telemetry_chunks(self.exp_id, self.chunk_size, t_min_ms=t_from_ms):
+            names = list(chunk.keys())
+            rows: List[Dict[str, Any]] = [dict(zip(names, values)) for values in zip(*(chunk[c].tolist() for c in names))]
+            index = 0
+
+            while index < len(rows):
+                if self._stop.is_set() or self._seek_ms is not None:
+                    return
+
+                if self.paused:
+                    anchor_wall = None
+                    time.sleep(PACING_TICK_SEC)
+                    continue
+
+                now = time.perf_counter()
+                if anchor_wall is None or anchor_speed != self.speed:
+                    # Reancoragem: arranque, retoma após pausa ou mudança de velocidade.
+                    anchor_wall, anchor_ms, anchor_speed = now, rows[index]['timestamp_amostra_ms'], self.speed
+
+                due_ms = anchor_ms + (now - anchor_wall) * 1000.0 * anchor_speed
+                while index < len(rows) and rows[index]['timestamp_amostra_ms'] <= due_ms:
+                    item = rows[index]
+                    item['reproducao'] = True
+                    if not self._put(item):
+                        return
+                    self.position_ms = item['timestamp_amostra_ms']
+                    self.samples_sent += 1
+                    index += 1
+
+                if index < len(rows):
+                    time.sleep(PACING_TICK_SEC)
+
+        self.finished = True
@@ -0,0 +1,279 @@
+"""
+Ganchos de Perfilagem por Subsistema (cProfile, tracemalloc e Intervalos Temporizados).
+
+Para diagnosticar engasgos do painel (Matplotlib, drenagem de filas, commits
+SQLite ou recolha de lixo). Ativada por variável de ambiente
+(settings.PROFILE_ENV_VAR, com "1" ou um diretório) ou pela opção --profile
+de main.py; desativada, os alvos das threads não são envolvidos e os
+intervalos custam apenas a verificação de um booleano.
+
+Ativa, grava em settings.PROFILE_DIR/perfil_<data>/:
+    * <thread>.prof   cProfile por thread (receção UDP, DB Writer, Tk),
+                      legível com pstats ou snakeviz;
+    * spans.csv       cada intervalo temporizado (process_queue,
+                      animation_update_callback, insert_data_batch e pausas
+                      do GC por geração), com instante, thread e duração;
+    * spans.json      resumo por intervalo (contagem, p50/p95, máximo);
+    * tracemalloc.txt instantâneos periódicos comparados com o anterior e
+                      com o primeiro (linhas com maior crescimento).
+
+Os intervalos também ficam no registo de métricas (span_<nome>_ms). A
+escrita em disco é feita por uma thread própria ("profiler").
+
+Nota: em Python >= 3.12 o cProfile assenta em sys.monitoring e só admite um
+perfilador ativo por processo; nesse caso apenas a primeira thread é perfilada.
+"""
+
+import atexit
+import cProfile
+import collections
+import functools
+import gc
+import json
+import marshal
+import os
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+import config.settings as settings
+from core.metrics import registry
+
+_enabled: bool = False
+_directory: Optional[str] = None
+
+# Perfiladores por nome de thread e intervalos pendentes de escrita: (instante, thread, nome, ms).
+_profilers: Dict[str, cProfile.Profile] = {}
+_spans: Deque[Tuple[float, str, str, float]] = collections.deque(maxlen=200_000)
+_span_max_ms: Dict[str, float] = {}
+_gc_start: Dict[int, float] = {}
+
+_dump_lock = threading.Lock()
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def default_profile_dir() -> str:
+    """Diretório com data/hora em settings.PROFILE_DIR (relativo à raiz do projeto)."""
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    return os.path.join(base_dir, settings.PROFILE_DIR, f"perfil_{timestamp}")
+
+
+def directory_from_environment() -> Optional[str]:
+    """Diretório pedido pela variável de ambiente ("1" = diretório por omissão), ou None."""
+    value = os.environ.get(settings.PROFILE_ENV_VAR, "").strip()
+    if value in ("", "0"):
+        return None
+    return default_profile_dir() if value == "1" else value
+
+
+def configure(directory: Optional[str] = None) -> str:
+    """
+    Ativa a perfilagem (idempotente). Deve ser chamada antes de arrancar as
+    threads a perfilar. Devolve o diretório de saída.
+    """
+    global _enabled, _directory
+    if _enabled:
+        return _directory
+    _directory = directory or default_profile_dir()
+    os.makedirs(_directory, exist_ok=True)
+    _enabled = True
+
+    gc.callbacks.append(_gc_callback)
+    if settings.PROFILE_TRACEMALLOC_INTERVAL_SEC > 0:
+        tracemalloc.start(settings.PROFILE_TRACEMALLOC_FRAMES)
+    threading.Thread(target=_writer_loop, name="profiler", daemon=True).start()
+    atexit.register(dump)
+    print(f"Perfilagem: Ativa, resultados em {_directory}")
+    return _directory
+
+
+# --- cProfile por thread ---
+
+def _enable_profiler(name: str) -> Optional[cProfile.Profile]:
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError as e:
+        print(f"Perfilagem: cProfile indisponível na thread '{name}' ({e}).")
+        return None
+    _profilers[name] = profiler
+    return profiler
+
+
+def thread_target(target: Callable[..., Any], name: str) -> Callable[..., Any]:
+    """Envolve o alvo de uma thread com cProfile; devolve-o inalterado se a perfilagem estiver inativa."""
+    if not _enabled:
+        return target
+
+    @functools.wraps(target)
+    def run(*args: Any, **kwargs: Any) -> Any:
+        profiler = _enable_profiler(name)
+        try:
+            return target(*args, **kwargs)
+        finally:
+            if profiler is not None:
+                profiler.disable()
+
+    return run
+
+
+def profile_current_thread(name: str) -> None:
+    """Perfila a thread chamadora até ao fim do processo (p.ex. a thread Tk antes do mainloop)."""
+    if _enabled:
+        _enable_profiler(name)
+
+
+# --- Intervalos temporizados ---
+
+def _record(name: str, start: float, end: float) -> None:
+    _spans.append((time.time(), threading.current_thread().name, name, (end - start) * 1000.0))
+
+
+def span(name: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorador: regista a duração de cada chamada quando a perfilagem está ativa."""
+    def decorate(fn: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not _enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _record(name, start, time.perf_counter())
+        return wrapper
+    return decorate
+
+
+def _gc_callback(phase: str, info: Dict[str, Any]) -> None:
+    """Pausas da recolha de lixo como intervalos 'gc_gen<N>'."""
+    tid = threading.get_ident()
+    if phase == "start":
+        _gc_start[tid] = time.perf_counter()
+    else:
+        start = _gc_start.pop(tid, None)
+        if start is not None:
+            _record(f"gc_gen{info.get('generation', '?')}", start, time.perf_counter())
+
+
+# --- Escrita em disco ---
+
+def _flush_spans() -> None:
+    """Drena os intervalos pendentes para spans.csv e para os histogramas do registo."""
+    if not _spans:
+        return
+    path = os.path.join(_directory, "spans.csv")
+    new_file = not os.path.exists(path)
+    with open(path, "a", encoding="utf-8") as f:
+        if new_file:
+            f.write("instante_epoch,thread,intervalo,duracao_ms\n")
+        while _spans:
+            wall, thread_name, name, ms = _spans.popleft()
+            f.write(f"{wall:.6f},{thread_name},{name},{ms:.4f}\n")
+            registry.histogram(f"span_{name}_ms", f"Duração de {name} (ms, perfilagem)").observe(ms)
+            _span_max_ms[name] = max(_span_max_ms.get(name, 0.0), ms)
+
+
+def _write_span_summary() -> None:
+    summary = {}
+    for name, max_ms in sorted(_span_max_ms.items()):
+        hist = registry.get(f"span_{name}_ms")
+        summary[name] = {
+            'count': hist.count,
+            'total_ms': round(hist.sum, 3),
+            'p50_ms': hist.quantile(0.5),
+            'p95_ms': hist.quantile(0.95),
+            'max_ms': round(max_ms, 3),
+        }
+    with open(os.path.join(_directory, "spans.json"), "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+
+
+def _write_profiles() -> None:
+    """Instantâneo de cada perfilador (sem o desativar) no formato de pstats."""
+    for name, profiler in list(_profilers.items()):
+        profiler.snapshot_stats()
+        with open(os.path.join(_directory, f"{name}.prof"), "wb") as f:
+            marshal.dump(profiler.stats, f)
+
+
+class _MemoryTracker:
+    """Instantâneos tracemalloc comparados com o anterior e com o primeiro."""
+
+    FILTERS = (
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        tracemalloc.Filter(False, "<unknown>"),
+    )
+
+    def __init__(self):
+        self.first: Optional[tracemalloc.Snapshot] = None
+        self.previous: Optional[tracemalloc.Snapshot] = None
+
+    def take(self) -> None:
+        if not tracemalloc.is_tracing():
+            return
+        snapshot = tracemalloc.take_snapshot().filter_traces(self.FILTERS)
+        current, peak = tracemalloc.get_traced_memory()
+        top = settings.PROFILE_TRACEMALLOC_TOP
+
+        lines = [f"=== {datetime.now().isoformat(timespec='seconds')} | "
+                 f"rastreado {current / 1e6:.1f} MB (pico {peak / 1e6:.1f} MB) ==="]
+        if self.previous is None:
+            lines.append("-- Maiores alocações --")
+            lines.extend(str(s) for s in snapshot.statistics("lineno")[:top])
+            self.first = snapshot
+        else:
+            lines.append("-- Crescimento desde o instantâneo anterior --")
+            lines.extend(str(s) for s in snapshot.compare_to(self.previous, "lineno")[:top])
+            lines.append("-- Crescimento desde o primeiro instantâneo --")
+            lines.extend(str(s) for s in snapshot.compare_to(self.first, "lineno")[:top])
+        self.previous = snapshot
+
+        with open(os.path.join(_directory, "tracemalloc.txt"), "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n\n")
+
+
+_memory = _MemoryTracker()
+
+
+def dump() -> None:
+    """Escreve o estado atual (intervalos, resumos e perfis). Chamada periodicamente e à saída."""
+    if not _enabled:
+        return
+    with _dump_lock:
+        try:
+            _flush_spans()
+            _write_span_summary()
+            _write_profiles()
+        except Exception as e:
+            print(f"Perfilagem: Erro ao escrever resultados: {e}")
+
+
+def _writer_loop() -> None:
+    next_dump = time.monotonic() + settings.PROFILE_DUMP_INTERVAL_SEC
+    interval = settings.PROFILE_TRACEMALLOC_INTERVAL_SEC
+    next_snapshot = time.monotonic() + interval
+
+    while True:
+        time.sleep(1.0)
+        now = time.monotonic()
+        if now >= next_dump:
+            dump()
+            next_dump = now + settings.PROFILE_DUMP_INTERVAL_SEC
+        else:
+            with _dump_lock:
+                _flush_spans()
+        if interval > 0 and now >= next_snapshot:
+            try:
+                _memory.take()
+            except Exception as e:
+                print(f"Perfilagem: Erro no instantâneo tracemalloc: {e}")
+            next_snapshot = now + interval
@@ -0,0 +1,131 @@
+"""
+Armazenamento de Segmentos Colunares Arquivados (.npz).
+
+Camada de baixo nível, sem dependências da base de dados, para os ficheiros
+de segmento produzidos por core.archive. Cada segmento é um .npz comprimido
+com um vetor por coluna. Para leitura, o segmento é expandido uma única vez
+para ficheiros .npy não comprimidos (um por coluna) numa pasta de cache
+adjacente, que são depois abertos com memory-mapping: apenas as páginas
+efetivamente acedidas (p.ex. a janela visível) são lidas do disco.
+"""
+
+import os
+import shutil
+import threading
+from collections import OrderedDict
+import numpy as np
+from typing import Dict, Optional, Sequence
+
+# Máximo de segmentos mantidos abertos; acima disso é libertado o menos usado.
+MAX_OPEN_SEGMENTS: int = 8
+
+# Vetores memory-mapped já abertos, por caminho de segmento (ordem de uso: LRU).
+_open_segments: "OrderedDict[str, Dict[str, np.ndarray]]" = OrderedDict()
+_open_lock: threading.Lock = threading.Lock()
+
+
+def _cache_dir(segment_path: str) -> str:
+    return segment_path + ".cache"
+
+
+def write_segment(segment_path: str, arrays: Dict[str, np.ndarray]) -> None:
+    """
+    Grava um segmento comprimido de forma atómica (ficheiro temporário + rename).
+
+    Args:
+        segment_path (str): Caminho final do .npz.
+        arrays (Dict[str, np.ndarray]): Vetores por coluna, todos com o mesmo comprimento.
+    """
+    os.makedirs(os.path.dirname(segment_path) or ".", exist_ok=True)
+    tmp_path = segment_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez_compressed(f, **arrays)
+    os.replace(tmp_path, segment_path)
+
+
+def _expand_to_cache(segment_path: str) -> Optional[str]:
+    """Descomprime o segmento para .npy por coluna; devolve a pasta ou None se impossível."""
+    cache_dir = _cache_dir(segment_path)
+    marker = os.path.join(cache_dir, ".completo")
+    if os.path.exists(marker):
+        return cache_dir
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with np.load(segment_path) as npz:
+            for name in npz.files:
+                tmp_path = os.path.join(cache_dir, f"{name}.tmp.npy")
+                np.save(tmp_path, npz[name])
+                os.replace(tmp_path, os.path.join(cache_dir, f"{name}.npy"))
+        open(marker, "w").close()
+        return cache_dir
+    except OSError as e:
+        print(f"Segmentos: cache não criada para {segment_path} ({e}); leitura comprimida.")
+        return None
+
+
+def load_segment(segment_path: str, columns: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+    """
+    Abre um segmento para leitura, preferindo vetores memory-mapped (só leitura).
+
+    Quando a cache não pode ser criada (p.ex. pasta sem permissões de escrita),
+    recorre à descompressão integral do .npz em memória.
+
+    Args:
+        segment_path (str): Caminho do .npz.
+        columns (Optional[Sequence[str]]): Colunas pedidas (todas por omissão).
+
+    Returns:
+        Dict[str, np.ndarray]: Vetores por coluna.
+    """
+    with _open_lock:
+        arrays = _open_segments.get(segment_path)
+        if arrays is not None:
+            _open_segments.move_to_end(segment_path)
+
+    if arrays is None:
+        cache_dir = _expand_to_cache(segment_path)
+        if cache_dir is not None:
+            arrays = {
+                name[:-4]: np.load(os.path.join(cache_dir, name), mmap_mode="r")
+                for name in os.listdir(cache_dir) if name.endswith(".npy") and ".tmp" not in name
+            }
+            with _open_lock:
+                _open_segments[segment_path] = arrays
+                while len(_open_segments) > MAX_OPEN_SEGMENTS:
+                    _open_segments.popitem(last=False)
+        else:
+            with np.load(segment_path) as npz:
+                arrays = {name: npz[name] for name in npz.files}
+
+    if columns is None:
+        return dict(arrays)
+    return {c: arrays[c] for c in columns}
+
+
+def close_segment(segment_path: str) -> None:
+    """
+    Liberta os vetores memory-mapped em cache de um segmento.
+
+    O mapeamento é desfeito quando a última vista ainda em uso (p.ex. no
+    visualizador) for recolhida; não é fechado à força, o que deixaria essas
+    vistas a apontar para memória inválida.
+    """
+    with _open_lock:
+        _open_segments.pop(segment_path, None)
+
+
+def close_all_segments() -> None:
+    """Liberta todos os segmentos em cache (ver close_segment)."""
+    with _open_lock:
+        _open_segments.clear()
+
+
+def remove_segment(segment_path: str) -> None:
+    """Remove o segmento e a respetiva cache memory-mapped."""
+    close_segment(segment_path)
+    shutil.rmtree(_cache_dir(segment_path), ignore_errors=True)
+    try:
+        os.remove(segment_path)
+    except FileNotFoundError:
+        pass
@@ -11,6 +11,9 @@ import queue
 import threading
 from typing import Dict, Any
 
+import config.settings as settings
+from core.metrics import registry
+
 # --- Filas de Comunicação (Queues) ---
 
 # Fila de visualização alocada para os gráficos em tempo real.
@@ -20,9 +23,14 @@ from typing import Dict, Any
 data_queue: queue.Queue = queue.Queue(maxsize=5000)
 
 # Fila de persistência alocada para o subsistema de gravação SQLite.
-# Configuração sem limite predefinido para garantir a integridade total
-# do registo de dados, mitigando variações na latência de I/O do disco.
-db_queue: queue.Queue = queue.Queue()
+# Limitada a settings.DB_QUEUE_MAXSIZE: absorve as variações de latência de
+# I/O do disco, mas uma paragem prolongada descarta amostras (contadas em
+# db_queue_drops_total) em vez de esgotar a memória.
+db_queue: queue.Queue = queue.Queue(maxsize=settings.DB_QUEUE_MAXSIZE)
+
+# Profundidade das filas, calculada apenas quando as métricas são lidas.
+registry.gauge('data_queue_depth', "Amostras pendentes na fila de visualização", fn=data_queue.qsize)
+registry.gauge('db_queue_depth', "Amostras pendentes na fila de persistência", fn=db_queue.qsize)
 
 # --- Variáveis de Controlo e Sincronização ---
 
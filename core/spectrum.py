@@ -0,0 +1,88 @@
+"""
+Estimativa Espectral (Densidade Espetral de Potência de Welch).
+
+Estimador de PSD pelo método de Welch (segmentos sobrepostos, remoção da
+média, janela de Hann, média dos periodogramas) pensado para atualização
+periódica no painel em tempo real: a janela, o seu fator de normalização, o
+eixo de frequências e todas as matrizes intermédias são pré-alocados e
+reutilizados entre chamadas. As FFT usam numpy.fft (pocketfft), que mantém
+em cache os planos por comprimento; como nperseg é fixo, o plano é
+calculado uma única vez.
+"""
+
+import numpy as np
+from typing import Optional, Tuple
+
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+class WelchPSD:
+    """
+    PSD unilateral de Welch com buffers reutilizáveis.
+    """
+
+    def __init__(self, nperseg: int = 256, overlap: float = 0.5, max_samples: int = 4096):
+        """
+        Args:
+            nperseg (int): Amostras por segmento (resolução = fs / nperseg).
+            overlap (float): Fração de sobreposição entre segmentos consecutivos.
+            max_samples (int): Maior janela de análise suportada (dimensiona os buffers).
+        """
+        self.nperseg = nperseg
+        self.step = max(1, int(nperseg * (1.0 - overlap)))
+        self.n_freqs = nperseg // 2 + 1
+
+        # Janela de Hann periódica (equivalente a scipy.signal.get_window('hann')).
+        self.window = 0.5 - 0.5 * np.cos(2.0 * np.pi * np.arange(nperseg) / nperseg)
+        self._window_power = float(np.sum(self.window ** 2))
+
+        max_segments = max(1, 1 + (max_samples - nperseg) // self.step)
+        self._segments = np.empty((max_segments, nperseg))
+        self._means = np.empty((max_segments, 1))
+        self._power = np.empty((max_segments, self.n_freqs))
+        self._unit_freqs = np.fft.rfftfreq(nperseg)
+        self.freqs = np.empty(self.n_freqs)
+        self.psd = np.empty(self.n_freqs)
+        self.sample_rate_hz: Optional[float] = None
+
+    def compute(self, signal: np.ndarray, sample_rate_hz: float) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Calcula a PSD das últimas amostras de 'signal'.
+
+        Os vetores devolvidos são os buffers internos (freqs, psd), reescritos
+        na chamada seguinte.
+
+        Returns:
+            Optional[Tuple[np.ndarray, np.ndarray]]: (frequências em Hz, PSD em unidades²/Hz),
+            ou None se não houver amostras para um segmento.
+        """
+        n_segments = min(len(self._segments), 1 + (len(signal) - self.nperseg) // self.step)
+        if len(signal) < self.nperseg or n_segments < 1:
+            return None
+
+        used = self.nperseg + (n_segments - 1) * self.step
+        signal = np.asarray(signal[len(signal) - used:], dtype=float)
+        if np.isnan(signal).any():
+            signal = np.nan_to_num(signal, nan=float(np.nanmean(signal)) if not np.isnan(signal).all() else 0.0)
+
+        segments = self._segments[:n_segments]
+        means = self._means[:n_segments]
+        power = self._power[:n_segments]
+
+        view = sliding_window_view(signal, self.nperseg)[::self.step]
+        np.mean(view, axis=1, keepdims=True, out=means)
+        np.subtract(view, means, out=segments)
+        segments *= self.window
+
+        np.abs(np.fft.rfft(segments, axis=1), out=power)
+        np.square(power, out=power)
+        np.mean(power, axis=0, out=self.psd)
+
+        # Normalização para densidade unilateral (DC e Nyquist não duplicados).
+        self.psd *= 1.0 / (sample_rate_hz * self._window_power)
+        self.psd[1:-1 if self.nperseg % 2 == 0 else None] *= 2.0
+
+        if sample_rate_hz != self.sample_rate_hz:
+            np.multiply(self._unit_freqs, sample_rate_hz, out=self.freqs)
+            self.sample_rate_hz = sample_rate_hz
+        return self.freqs, self.psd
@@ -0,0 +1,297 @@
+"""
+Gravação por Gatilho (Estilo Osciloscópio).
+
+Avaliado na thread de receção UDP, bloco a bloco: enquanto armado, mantém em
+memória um anel com as amostras mais recentes (janela pré-disparo) e procura,
+de forma vetorizada sobre as amostras do datagrama, a condição de disparo
+(limiar ou flanco num canal, ou mudança da referência enviada ao firmware).
+No disparo inicia um novo experimento, entrega-lhe a janela pré-disparo e
+encaminha as amostras seguintes para o DB Writer até ao fim da janela
+pós-disparo, encerrando então o experimento.
+
+A thread de receção nunca faz I/O SQLite: o registo do experimento é
+pré-alocado ('reserved') ao armar, numa thread curta própria (nunca atrás
+das tarefas longas da manutenção), o disparo apenas o ativa em memória, e a
+marcação em disco do início e a consolidação final são delegadas na thread
+de manutenção (esta última atrás de uma barreira do DB Writer, depois de
+persistida toda a janela). Um disparo detetado antes de a reserva estar
+pronta fica retido e é executado, com o instante original, quando esta
+chega; os disparos que não chegam a gravar contam em trigger_skipped_total.
+"""
+
+import collections
+import queue
+import threading
+import numpy as np
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+import config.settings as settings
+import core.database as database
+import core.db_writer as db_writer
+import core.maintenance as maintenance
+from core.metrics import registry
+from core.shared_state import db_queue, shared_data, data_lock
+
+# Modos de disparo suportados e respetivas designações na interface.
+TRIGGER_MODES: Dict[str, str] = {
+    'above': 'Acima do Limiar',
+    'below': 'Abaixo do Limiar',
+    'rising': 'Flanco Ascendente',
+    'falling': 'Flanco Descendente',
+    'setpoint': 'Mudança de Referência',
+}
+
+# Canais de telemetria que podem servir de fonte ao gatilho.
+TRIGGER_CHANNELS: tuple = (
+    'tensao_mv', 'sinal_controle', 'valor_adc', 'tensao_estimada_mv',
+    'erro_obs_mv', 'estado_1', 'estado_2', 'estado_3',
+)
+
+# Mesmo contador da receção contínua (core.udp_server): descartes da gravação por gatilho.
+_db_queue_drops = registry.counter('db_queue_drops_total', "Amostras descartadas com db_queue cheia")
+_skipped = registry.counter('trigger_skipped_total',
+                            "Disparos ignorados (gravação manual em curso ou reserva falhada)")
+
+
+class TriggeredRecorder:
+    """
+    Máquina de estados do gatilho: 'idle' -> 'armed' -> 'recording' -> ('armed' | 'idle').
+
+    A configuração é alterada pela thread Tk e lida pela thread de receção;
+    as transições de estado ficam protegidas por um lock próprio.
+    """
+
+    def __init__(self):
+        self.state: str = 'idle'
+        self.channel: str = settings.TRIGGER_CHANNEL
+        self.mode: str = settings.TRIGGER_MODE
+        self.level: float = settings.TRIGGER_LEVEL
+        self.pre_ms: int = settings.TRIGGER_PRE_MS
+        self.post_ms: int = settings.TRIGGER_POST_MS
+        self.auto_rearm: bool = settings.TRIGGER_AUTO_REARM
+
+        self.run_id: Optional[int] = None
+        # Experimento pré-alocado para o próximo disparo (None enquanto a reserva está pendente).
+        self._reserved_id: Optional[int] = None
+        self._reservation_pending: bool = False
+        # Instante do disparo detetado à espera da reserva (None se nenhum).
+        self._latched_ms: Optional[int] = None
+        self.triggers: int = 0
+        self._pre_ring: Deque[Dict[str, Any]] = collections.deque(maxlen=settings.TRIGGER_PRE_MAX_SAMPLES)
+        self._last_value: Optional[float] = None
+        self._last_setpoint: Optional[float] = None
+        self._stop_at_ms: int = 0
+        self._lock = threading.Lock()
+
+    @property
+    def active(self) -> bool:
+        """Verdadeiro quando o bloco recebido tem de ser entregue ao gatilho."""
+        return self.state != 'idle'
+
+    def configure(self, channel: Optional[str] = None, mode: Optional[str] = None,
+                  level: Optional[float] = None, pre_ms: Optional[int] = None,
+                  post_ms: Optional[int] = None) -> None:
+        """Atualiza os parâmetros do gatilho (os omitidos mantêm-se)."""
+        if channel is not None and channel not in TRIGGER_CHANNELS:
+            raise ValueError(f"Canal de gatilho inválido: {channel}")
+        if mode is not None and mode not in TRIGGER_MODES:
+            raise ValueError(f"Modo de gatilho inválido: {mode}")
+        with self._lock:
+            if channel is not None:
+                self.channel = channel
+            if mode is not None:
+                self.mode = mode
+            if level is not None:
+                self.level = float(level)
+            if pre_ms is not None:
+                self.pre_ms = int(pre_ms)
+            if post_ms is not None:
+                self.post_ms = int(post_ms)
+            self._last_value = None
+
+    def arm(self) -> None:
+        """Arma o gatilho; a janela pré-disparo começa a encher a partir deste instante."""
+        with self._lock:
+            if self.state == 'recording':
+                return
+            self._reset_detection()
+            self.state = 'armed'
+            self._request_reservation()
+        print(f"Gatilho: ARMADO ({TRIGGER_MODES[self.mode]}, canal {self.channel}, nível {self.level}).")
+
+    def disarm(self) -> None:
+        """Desarma o gatilho, encerrando uma gravação disparada que esteja em curso."""
+        with self._lock:
+            recording = self.state == 'recording'
+            self.state = 'idle'
+            self._pre_ring.clear()
+            reserved, self._reserved_id = self._reserved_id, None
+            if recording:
+                self._close_run(self.run_id)
+        if reserved is not None:
+            maintenance.submit(database.release_reserved_experiment, reserved)
+        print("Gatilho: DESARMADO.")
+
+    def _request_reservation(self) -> None:
+        """Pede a pré-alocação do experimento do próximo disparo numa thread curta dedicada."""
+        if self._reserved_id is not None or self._reservation_pending:
+            return
+        self._reservation_pending = True
+        # Fora da fila de manutenção: uma importação ou pirâmide em curso não atrasa o gatilho.
+        threading.Thread(target=self._reserve, name="trigger-reserve", daemon=True).start()
+
+    def _reserve(self) -> None:
+        exp_id = database.reserve_experiment()
+        with self._lock:
+            self._reservation_pending = False
+            if exp_id is not None and self.state == 'armed' and self._reserved_id is None:
+                self._reserved_id = exp_id
+                return
+            if exp_id is None and self._latched_ms is not None:
+                self._latched_ms = None
+                _skipped.inc()
+        # Desarmado entretanto: a reserva não é necessária.
+        if exp_id is not None:
+            database.release_reserved_experiment(exp_id)
+
+    @staticmethod
+    def _close_run(run_id: Optional[int]) -> None:
+        """Cessa a gravação em memória e consolida em disco depois de persistida toda a janela."""
+        if run_id is not None and database.detach_experiment(run_id):
+            # Via manutenção: a barreira nunca bloqueia a thread de receção com a db_queue cheia.
+            maintenance.submit(db_writer.call_after_flush,
+                               lambda: maintenance.submit(database.consolidate_experiment, run_id))
+
+    def _reset_detection(self) -> None:
+        self._pre_ring.clear()
+        self._last_value = None
+        self._latched_ms = None
+        with data_lock:
+            self._last_setpoint = shared_data["current_setpoint"]
+
+    def _find_trigger(self, block: np.ndarray) -> Optional[int]:
+        """Índice da primeira amostra do bloco que satisfaz a condição (ou None)."""
+        if self.mode == 'setpoint':
+            with data_lock:
+                setpoint = shared_data["current_setpoint"]
+            changed = setpoint != self._last_setpoint
+            self._last_setpoint = setpoint
+            return 0 if changed else None
+
+        values = block[self.channel].astype(float)
+        if self.mode == 'above':
+            hits = values >= self.level
+        elif self.mode == 'below':
+            hits = values <= self.level
+        else:
+            # Flancos: compara cada amostra com a anterior (incluindo a última do bloco anterior).
+            previous = np.empty_like(values)
+            previous[0] = values[0] if self._last_value is None else self._last_value
+            previous[1:] = values[:-1]
+            if self.mode == 'rising':
+                hits = (previous < self.level) & (values >= self.level)
+            else:
+                hits = (previous > self.level) & (values <= self.level)
+        self._last_value = float(values[-1])
+
+        index = np.flatnonzero(hits)
+        return int(index[0]) if len(index) else None
+
+    def process_block(self, block: np.ndarray, items: List[Dict[str, Any]]) -> bool:
+        """
+        Avalia um datagrama descodificado.
+
+        Args:
+            block (np.ndarray): Amostras do datagrama como vetor estruturado (um campo por canal).
+            items (List[Dict[str, Any]]): As mesmas amostras no formato das filas.
+
+        Returns:
+            bool: Verdadeiro se as amostras foram encaminhadas para a gravação pelo gatilho
+            (o chamador não as deve voltar a enfileirar para a base de dados).
+        """
+        with self._lock:
+            if self.state == 'armed':
+                return self._process_armed(block, items)
+            if self.state == 'recording':
+                return self._process_recording(items)
+            return False
+
+    def _process_armed(self, block: np.ndarray, items: List[Dict[str, Any]]) -> bool:
+        ring = self._pre_ring
+        ring.extend(items)
+        index = self._find_trigger(block)
+
+        if index is not None and self._latched_ms is None:
+            if database.is_experiment_running():
+                # Uma gravação manual em curso tem precedência.
+                _skipped.inc()
+            else:
+                self._latched_ms = items[index]['timestamp_amostra_ms']
+
+        # Sem reserva pronta o disparo fica retido (com a sua janela pré-disparo) até esta chegar.
+        trigger_ms = self._latched_ms
+        if trigger_ms is None or self._reserved_id is None:
+            oldest_ms = (items[-1]['timestamp_amostra_ms'] if trigger_ms is None else trigger_ms) - self.pre_ms
+            while ring and ring[0]['timestamp_amostra_ms'] < oldest_ms:
+                ring.popleft()
+            return False
+
+        if database.is_experiment_running():
+            # Gravação manual iniciada enquanto o disparo aguardava a reserva.
+            self._latched_ms = None
+            _skipped.inc()
+            return False
+
+        self._latched_ms = None
+        self.run_id, self._reserved_id = self._reserved_id, None
+        database.activate_reserved_experiment(self.run_id)
+        maintenance.submit(database.mark_experiment_running, self.run_id, datetime.now().isoformat())
+        self.triggers += 1
+        self._stop_at_ms = trigger_ms + self.post_ms
+        self.state = 'recording'
+        print(f"Gatilho: DISPARO #{self.triggers} em t={trigger_ms} ms -> experimento {self.run_id}.")
+
+        oldest_ms = trigger_ms - self.pre_ms
+        pending = [item for item in ring if item['timestamp_amostra_ms'] >= oldest_ms]
+        ring.clear()
+        # A janela pré-disparo já inclui o bloco atual; o excedente pós-janela é aparado abaixo.
+        self._forward(pending)
+        return True
+
+    def _process_recording(self, items: List[Dict[str, Any]]) -> bool:
+        # Gravação encerrada ou substituída manualmente entretanto: volta a armar ou para.
+        if database.current_run_id != self.run_id or not database.is_recording_enabled:
+            self._finish(close=False)
+            return False
+
+        self._forward(items)
+        return True
+
+    def _forward(self, items: List[Dict[str, Any]]) -> None:
+        """Enfileira as amostras dentro da janela pós-disparo e encerra ao atingi-la."""
+        stop_at_ms = self._stop_at_ms
+        for item in items:
+            if item['timestamp_amostra_ms'] > stop_at_ms:
+                self._finish(close=True)
+                return
+            item['id_experimento'] = self.run_id
+            try:
+                db_queue.put(item, block=False)
+            except queue.Full:
+                _db_queue_drops.inc()
+
+    def _finish(self, close: bool) -> None:
+        if close:
+            self._close_run(self.run_id)
+        print(f"Gatilho: Gravação disparada concluída (experimento {self.run_id}).")
+        if self.auto_rearm:
+            self._reset_detection()
+            self.state = 'armed'
+            self._request_reservation()
+        else:
+            self.state = 'idle'
+
+
+# Instância única partilhada pela thread de receção e pela interface.
+recorder = TriggeredRecorder()
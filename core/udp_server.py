@@ -13,10 +13,16 @@ import threading
 import time
 from datetime import datetime
 import queue
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
+
+import numpy as np
 
 import config.settings as settings
 import core.database as database
+import core.profiling as profiling
+from core.metrics import registry
+from core.capture import CaptureWriter, default_capture_path
+from core.trigger import recorder as trigger_recorder
 from core.shared_state import data_queue, db_queue, shared_data, data_lock
 
 
@@ -28,10 +34,70 @@ BYTES_PER_SAMPLE: int = 36
 # Estrutura RX (Telemetria): <I8f (1 uint32_t, 8 floats)
 TELEMETRY_STRUCT_FORMAT: str = '<I8f'
 
+# Vista estruturada do mesmo datagrama (5 amostras), usada na avaliação vetorizada do gatilho.
+PACKET_DTYPE: np.dtype = np.dtype([
+    ('timestamp_amostra_ms', '<u4'), ('sinal_controle', '<f4'), ('tensao_mv', '<f4'),
+    ('valor_adc', '<f4'), ('tensao_estimada_mv', '<f4'), ('erro_obs_mv', '<f4'),
+    ('estado_1', '<f4'), ('estado_2', '<f4'), ('estado_3', '<f4'),
+])
+
+# Métricas da receção (core.metrics); atualizadas apenas pela thread de receção.
+_datagrams = registry.counter('udp_datagrams_total', "Datagramas recebidos")
+_invalid = registry.counter('udp_invalid_datagrams_total', "Datagramas com comprimento inválido")
+_samples = registry.counter('udp_samples_total', "Amostras extraídas")
+_data_queue_drops = registry.counter('data_queue_drops_total', "Amostras descartadas com data_queue cheia")
+_db_queue_drops = registry.counter('db_queue_drops_total', "Amostras descartadas com db_queue cheia")
+
+# Alimentação da fila de visualização; desligada no modo headless (sem consumidor).
+feed_display: bool = True
+
+# Última amostra recebida (uma por datagrama), publicada apenas quando
+# publish_latest está ativo (servidor de métricas, core.metrics_server).
+publish_latest: bool = False
+latest_sample: Optional[Dict[str, Any]] = None
+
+# Captura em bruto ativa (None = desativada); alterada por start_capture/stop_capture.
+_capture: Optional[CaptureWriter] = None
+
 # Estrutura TX (Comando): <f (1 float contendo a Tensão Alvo em Volts)
 COMMAND_STRUCT_FORMAT: str = '<f'
 
 
+def decode_datagram(buffer: bytes, current_time: datetime, batch_interval_ms: float) -> List[Dict[str, Any]]:
+    """
+    Extrai as 5 amostras de um datagrama de 180 bytes via ponteiros de memória (offset).
+
+    Args:
+        buffer (bytes): Datagrama com comprimento EXPECTED_BUFFER_SIZE.
+        current_time (datetime): Instante de receção (comum às 5 amostras).
+        batch_interval_ms (float): Intervalo médio entre amostras desde o datagrama anterior.
+
+    Returns:
+        List[Dict[str, Any]]: Amostras no formato das filas de visualização e persistência.
+    """
+    received_at = current_time.isoformat()
+    items: List[Dict[str, Any]] = []
+
+    for i in range(SAMPLES_PER_PACKET):
+        offset = i * BYTES_PER_SAMPLE
+        unpacked_data = struct.unpack_from(TELEMETRY_STRUCT_FORMAT, buffer, offset)
+
+        items.append({
+            'timestamp_amostra_ms': unpacked_data[0],
+            'sinal_controle': unpacked_data[1],
+            'tensao_mv': unpacked_data[2],
+            'valor_adc': unpacked_data[3],
+            'tensao_estimada_mv': unpacked_data[4],
+            'erro_obs_mv': unpacked_data[5],
+            'estado_1': unpacked_data[6],
+            'estado_2': unpacked_data[7],
+            'estado_3': unpacked_data[8],
+            'timestamp_recebimento': received_at,
+            'batch_interval_ms': batch_interval_ms
+        })
+    return items
+
+
 def _telemetry_receiver_loop() -> None:
     """
     Laço de execução infinito para a recepção passiva de datagramas UDP.
@@ -40,6 +106,7 @@ def _telemetry_receiver_loop() -> None:
     a extração de 5 amostras sequenciais via ponteiros de memória (offset),
     injetando-as nas filas de processamento assíncrono.
     """
+    global latest_sample
     last_batch_time: Optional[datetime] = None
 
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
@@ -53,9 +120,17 @@ def _telemetry_receiver_loop() -> None:
     while True:
         try:
             buffer, _ = sock.recvfrom(512)
+
+            capture = _capture
+            if capture is not None:
+                capture.write(time.monotonic_ns(), buffer)
             
+            _datagrams.inc()
+
             # Validação estrita do loteamento exigido pela arquitetura de 1000Hz
-            if len(buffer) == EXPECTED_BUFFER_SIZE:
+            if len(buffer) != EXPECTED_BUFFER_SIZE:
+                _invalid.inc()
+            else:
                 current_time = datetime.now()
                 batch_interval_ms = 0.0
 
@@ -64,36 +139,31 @@ def _telemetry_receiver_loop() -> None:
                     batch_interval_ms = (delta.total_seconds() * 1000.0) / SAMPLES_PER_PACKET
 
                 last_batch_time = current_time
+                items = decode_datagram(buffer, current_time, batch_interval_ms)
+
+                if feed_display:
+                    for item in items:
+                        try:
+                            data_queue.put(item, block=False)
+                        except queue.Full:
+                            _data_queue_drops.inc()
 
-                for i in range(SAMPLES_PER_PACKET):
-                    offset = i * BYTES_PER_SAMPLE
-                    unpacked_data = struct.unpack_from(TELEMETRY_STRUCT_FORMAT, buffer, offset)
-
-                    item: Dict[str, Any] = {
-                        'timestamp_amostra_ms': unpacked_data[0],
-                        'sinal_controle': unpacked_data[1],
-                        'tensao_mv': unpacked_data[2],
-                        'valor_adc': unpacked_data[3],
-                        'tensao_estimada_mv': unpacked_data[4],
-                        'erro_obs_mv': unpacked_data[5],
-                        'estado_1': unpacked_data[6],
-                        'estado_2': unpacked_data[7],
-                        'estado_3': unpacked_data[8],
-                        'timestamp_recebimento': current_time.isoformat(),
-                        'batch_interval_ms': batch_interval_ms
-                    }
-
-                    try:
-                        data_queue.put(item, block=False)
-                    except queue.Full:
-                        pass
-
-                    if database.is_recording_enabled and database.current_run_id is not None:
+                _samples.inc(SAMPLES_PER_PACKET)
+                if publish_latest:
+                    latest_sample = items[-1]
+
+                # Gatilho armado: avaliação vetorizada do bloco e janela pré/pós-disparo.
+                if trigger_recorder.active and trigger_recorder.process_block(
+                        np.frombuffer(buffer, dtype=PACKET_DTYPE), items):
+                    continue
+
+                if database.is_recording_enabled and database.current_run_id is not None:
+                    for item in items:
                         item['id_experimento'] = database.current_run_id
                         try:
                             db_queue.put(item, block=False)
                         except queue.Full:
-                            pass
+                            _db_queue_drops.inc()
 
         except struct.error:
             pass
@@ -101,6 +171,32 @@ def _telemetry_receiver_loop() -> None:
             break
 
 
+def start_capture(path: Optional[str] = None) -> str:
+    """
+    Ativa a captura em bruto de todos os datagramas recebidos (core.capture).
+
+    Returns:
+        str: Caminho do ficheiro de captura.
+    """
+    global _capture
+    stop_capture()
+    _capture = CaptureWriter(path or default_capture_path())
+    print(f"UDP: Captura em bruto ATIVADA -> {_capture.path}")
+    return _capture.path
+
+
+def stop_capture() -> Optional[Dict[str, Any]]:
+    """Encerra a captura em curso, devolvendo o resumo (ou None se inativa)."""
+    global _capture
+    capture, _capture = _capture, None
+    if capture is None:
+        return None
+    capture.close()
+    print(f"UDP: Captura encerrada ({capture.records:,} datagramas, {capture.bytes / 2**20:.1f} MiB, "
+          f"{capture.drops:,} descartados).")
+    return {'path': capture.path, 'records': capture.records, 'bytes': capture.bytes, 'drops': capture.drops}
+
+
 def _command_sender_loop() -> None:
     """
     Laço de execução contínuo para transmissão ativa de comandos LQR.
@@ -128,8 +224,9 @@ def start_network_threads() -> None:
     """
     Orquestração e alocação de threads de rede em modo Daemon.
     """
-    receiver_thread = threading.Thread(target=_telemetry_receiver_loop, daemon=True)
-    sender_thread = threading.Thread(target=_command_sender_loop, daemon=True)
+    receiver_thread = threading.Thread(target=profiling.thread_target(_telemetry_receiver_loop, "udp-receiver"),
+                                       name="udp-receiver", daemon=True)
+    sender_thread = threading.Thread(target=_command_sender_loop, name="udp-command", daemon=True)
     
     receiver_thread.start()
     sender_thread.start()
\ No newline at end of file
@@ -0,0 +1,139 @@
+"""
+Gestão de Checkpoints do WAL (Write-Ahead Logging).
+
+Retira ao SQLite o controlo dos checkpoints durante gravações contínuas:
+- O DB Writer mantém uma única ligação persistente sem auto-checkpoint
+  (database.connect_writer), pelo que os seus commits nunca absorvem o custo
+  de transferir o WAL, e o -wal nunca é apagado por um "último fecho" entre
+  descargas; as restantes ligações de escrita desligam-no enquanto se grava
+  (database.connect_for_write);
+- Uma thread dedicada executa checkpoints PASSIVE periódicos, que nunca
+  bloqueiam leitores nem escritores; é independente da fila de manutenção,
+  pelo que tarefas longas (importação, pirâmides, arquivo) não os adiam e o
+  WAL não cresce sem limite durante essas tarefas;
+- A consolidação de cada experimento termina com um checkpoint TRUNCATE,
+  devolvendo o ficheiro -wal a zero bytes.
+
+O tamanho do WAL e a duração de cada checkpoint ficam disponíveis em
+get_wal_metrics(), a par da latência de commit do DB Writer.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Optional, Tuple
+
+import config.settings as settings
+import core.database as database
+import core.db_writer as db_writer
+import core.maintenance as maintenance
+
+_scheduler_thread: Optional[threading.Thread] = None
+_scheduler_stop: threading.Event = threading.Event()
+
+_stats_lock: threading.Lock = threading.Lock()
+_stats: Dict[str, Any] = {
+    'checkpoints': 0,
+    'busy_checkpoints': 0,
+    'last_mode': None,
+    'last_duration_ms': 0.0,
+    'max_duration_ms': 0.0,
+    'last_wal_pages': 0,
+    'last_checkpointed_pages': 0,
+    'wal_size_bytes': 0
+}
+
+
+def get_wal_size_bytes() -> int:
+    """Tamanho atual do ficheiro -wal (0 se inexistente)."""
+    try:
+        return os.path.getsize(database.DB_FILE + "-wal")
+    except OSError:
+        return 0
+
+
+def checkpoint(mode: str = "PASSIVE") -> Optional[Tuple[int, int, int]]:
+    """
+    Executa um checkpoint explícito do WAL e regista a sua duração.
+
+    Args:
+        mode (str): 'PASSIVE', 'FULL', 'RESTART' ou 'TRUNCATE'.
+
+    Returns:
+        Optional[Tuple[int, int, int]]: (busy, páginas no WAL, páginas transferidas),
+        ou None em caso de falha.
+    """
+    mode = mode.upper()
+    if mode not in ("PASSIVE", "FULL", "RESTART", "TRUNCATE"):
+        raise ValueError(f"Modo de checkpoint inválido: {mode}")
+
+    try:
+        conn = sqlite3.connect(database.DB_FILE)
+        start = time.perf_counter()
+        busy, wal_pages, checkpointed = conn.execute(f"PRAGMA wal_checkpoint({mode});").fetchone()
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        conn.close()
+    except Exception as e:
+        print(f"ERRO no checkpoint {mode} do WAL: {e}")
+        return None
+
+    with _stats_lock:
+        _stats['checkpoints'] += 1
+        _stats['busy_checkpoints'] += 1 if busy else 0
+        _stats['last_mode'] = mode
+        _stats['last_duration_ms'] = elapsed_ms
+        _stats['max_duration_ms'] = max(_stats['max_duration_ms'], elapsed_ms)
+        _stats['last_wal_pages'] = wal_pages
+        _stats['last_checkpointed_pages'] = checkpointed
+        _stats['wal_size_bytes'] = get_wal_size_bytes()
+
+    return busy, wal_pages, checkpointed
+
+
+def get_wal_metrics() -> Dict[str, Any]:
+    """Fotografia das métricas do WAL e da latência de commit do DB Writer."""
+    with _stats_lock:
+        metrics = dict(_stats)
+    metrics['wal_size_bytes'] = get_wal_size_bytes()
+    metrics['commit_last_ms'] = db_writer.flush_stats['last_ms']
+    metrics['commit_max_ms'] = db_writer.flush_stats['max_ms']
+    metrics['commit_count'] = db_writer.flush_stats['flushes']
+    return metrics
+
+
+def on_experiment_closed(exp_id: int) -> None:
+    """
+    Subscritor de database.close_current_experiment.
+
+    Após a descarga da telemetria pendente (e das tarefas de manutenção já
+    enfileiradas, p.ex. a pirâmide), reduz o WAL a zero com um checkpoint TRUNCATE.
+    """
+    db_writer.call_after_flush(lambda: maintenance.submit(checkpoint, "TRUNCATE"))
+
+
+def _scheduler_loop(interval_sec: float) -> None:
+    while not _scheduler_stop.wait(interval_sec):
+        checkpoint("PASSIVE")
+
+
+def start_checkpoint_scheduler(interval_sec: float = settings.WAL_CHECKPOINT_INTERVAL_SEC) -> threading.Thread:
+    """
+    Inicia a thread dos checkpoints PASSIVE periódicos (idempotente).
+
+    Não passa pela thread de manutenção: um checkpoint PASSIVE não disputa o
+    lock de escrita, pelo que pode correr em paralelo com qualquer tarefa.
+    """
+    global _scheduler_thread
+    if _scheduler_thread is not None and _scheduler_thread.is_alive():
+        return _scheduler_thread
+    _scheduler_stop.clear()
+    _scheduler_thread = threading.Thread(target=_scheduler_loop, args=(interval_sec,),
+                                         name="wal-checkpoint", daemon=True)
+    _scheduler_thread.start()
+    return _scheduler_thread
+
+
+def stop_checkpoint_scheduler() -> None:
+    """Interrompe a thread de checkpoints periódicos."""
+    _scheduler_stop.set()
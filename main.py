@@ -4,27 +4,94 @@ Ponto de entrada do Dashboard de Controlo Industrial.
 Módulo de inicialização primária responsável pelo arranque sequencial
 da camada de persistência (Base de Dados), das threads de rede (Comunicação UDP),
 e do motor de renderização gráfica (CustomTkinter).
+
+Com --headless a interface gráfica não é importada (core.headless): apenas
+aquisição e gravação, controladas pela linha de comandos, sinais ou HTTP local.
 """
 
+import argparse
+import multiprocessing
+
+import config.settings as settings
 from core import database
+from core import profiling
 from core import udp_server
 from core import db_writer
-from ui.main_app import MainApplication
+from core import maintenance
+from core import decimation
+from core import wal_checkpoint
+from core import archive
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Interface de Controlo da Planta (Tacogerador).")
+    parser.add_argument("--profile", nargs="?", const="", metavar="DIR",
+                        help="Ativa a perfilagem (core.profiling); DIR opcional para os resultados.")
+
+    headless = parser.add_argument_group("modo sem interface gráfica")
+    headless.add_argument("--headless", action="store_true",
+                          help="Apenas aquisição e gravação, sem GUI (core.headless).")
+    headless.add_argument("--record", action="store_true", help="Inicia uma sessão de gravação ao arrancar.")
+    headless.add_argument("--arm-trigger", action="store_true",
+                          help="Arma a gravação por gatilho (parâmetros TRIGGER_* de config/settings.py).")
+    headless.add_argument("--setpoint", type=float, help="Setpoint inicial (V) enviado ao firmware.")
+    headless.add_argument("--duration", type=float, help="Termina ao fim de N segundos.")
+    headless.add_argument("--http", action="store_true",
+                          help="Servidor local de métricas com canal de controlo (POST /record/start ...).")
+    headless.add_argument("--http-port", type=int, help="Porta do servidor local (METRICS_HTTP_PORT).")
+    # parse_known_args: o executável PyInstaller pode receber argumentos próprios.
+    args, _ = parser.parse_known_args()
+    return args
+
 
 def main() -> None:
     """
     Rotina principal de orquestração do sistema.
-    Inicia os subsistemas auxiliares e bloqueia a execução no MainLoop da interface.
+    Inicia os subsistemas auxiliares e bloqueia a execução no MainLoop da
+    interface (ou no ciclo do modo headless).
     """
-    
+    args = parse_args()
+    profile_dir = args.profile if args.profile is not None else profiling.directory_from_environment()
+    if profile_dir is not None:
+        profiling.configure(profile_dir or None)
+
     database.init_db()
     database.startup_cleanup()
+    database.add_close_listener(decimation.on_experiment_closed)
+    database.add_close_listener(wal_checkpoint.on_experiment_closed)
 
+    if settings.CAPTURE_ON_STARTUP:
+        udp_server.start_capture()
+    # Sem GUI não há consumidor da fila de visualização.
+    udp_server.feed_display = not args.headless
     udp_server.start_network_threads()
-    db_writer.start_db_writer_thread()
+    if settings.METRICS_HTTP_ENABLED and not args.headless:
+        # Importado só quando ativo: desativado, o servidor não tem qualquer custo.
+        from core import metrics_server
+        metrics_server.start()
+    writer_thread = db_writer.start_db_writer_thread()
+    maintenance.start_maintenance_thread()
+    for exp_id in database.get_experiments_pending_deletion():
+        maintenance.submit(database.delete_experiment, exp_id)
+    # Um experimento por tarefa: os lotes de arranque cedem a fila entre experimentos.
+    maintenance.submit_each(decimation.build_pyramid, decimation.get_experiments_without_pyramid())
+    maintenance.submit_each(archive.archive_experiment, archive.get_archivable_experiments())
+    maintenance.add_periodic_task(database.incremental_vacuum_step, interval_sec=5.0)
+    wal_checkpoint.start_checkpoint_scheduler()
+
+    if args.headless:
+        from core import headless
+        headless.run(writer_thread, record=args.record, arm=args.arm_trigger, setpoint=args.setpoint,
+                     duration_sec=args.duration, http=args.http, http_port=args.http_port)
+        return
 
+    # Importada só aqui: o modo headless não carrega customtkinter nem matplotlib.
+    from ui.main_app import MainApplication
     app = MainApplication()
+    profiling.profile_current_thread("tk")
     app.mainloop()
 
 if __name__ == "__main__":
+    # Necessário para o pool de processos da exportação em lote no executável PyInstaller.
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
@@ -0,0 +1,99 @@
+"""
+Exportação CSV/TXT vetorizada face à referência anterior (str() por valor).
+
+Os canais chegam do firmware como float32 (udp_server.PACKET_DTYPE) e são
+guardados como REAL; cada valor exportado tem de reconstruir o mesmo
+float32 que a formatação str() da implementação anterior.
+
+Uso (a partir da raiz do projeto):
+    python -m pytest -q tests
+"""
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+import core.data_exporter as data_exporter
+
+
+def _telemetry_columns(n_rows: int) -> dict:
+    """Vetores como os de database.get_telemetry_columns: float32 promovido a float64, com nulos."""
+    rng = np.random.default_rng(1)
+    f4 = lambda v: np.asarray(v, dtype='<f4').astype('f8')
+    columns = {
+        'timestamp_amostra_ms': np.arange(n_rows, dtype=np.int64) * 2,
+        'valor_adc': f4(rng.integers(0, 4096, n_rows)),
+        'tensao_mv': f4(rng.uniform(0, 3300, n_rows)),
+        'sinal_controle': f4(rng.uniform(-100, 100, n_rows)),
+        'tensao_estimada_mv': f4(rng.normal(1650, 50, n_rows)),
+        'erro_obs_mv': f4(rng.normal(0, 1e-3, n_rows)),
+        'estado_1': f4(rng.normal(0, 1e-7, n_rows)),
+        'estado_2': f4(rng.normal(0, 1e6, n_rows)),
+        'estado_3': np.zeros(n_rows),
+    }
+    columns['tensao_mv'][:2] = f4([1650.37, 1651.92])
+    columns['erro_obs_mv'][::7] = np.nan
+    columns['estado_3'][1::3] = f4(-2.5)
+    return columns
+
+
+def _baseline_text(columns: dict, sep: str, null_token: str) -> list:
+    """Linhas da implementação anterior: str() de cada valor Python (None -> marcador de nulo)."""
+    names = list(columns)
+    rows = zip(*(columns[c].tolist() for c in names))
+    return [[null_token if v != v else str(v) for v in row] for row in rows]
+
+
+class ExportPrecisionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.columns = _telemetry_columns(5000)
+        self.tmp = tempfile.mkdtemp()
+
+    def _read(self, filename: str, sep: str) -> list:
+        with open(filename, encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        self.assertEqual(lines[0].split(sep), list(self.columns))
+        return [line.split(sep) for line in lines[1:]]
+
+    def _assert_matches_baseline(self, exported: list, sep: str, null_token: str) -> None:
+        baseline = _baseline_text(self.columns, sep, null_token)
+        self.assertEqual(len(exported), len(baseline))
+        for row, expected in zip(exported, baseline):
+            for field, reference in zip(row, expected):
+                if reference == null_token:
+                    self.assertEqual(field, null_token)
+                else:
+                    self.assertEqual(np.float32(float(field)), np.float32(float(reference)),
+                                     f"{field!r} != {reference!r}")
+
+    def test_csv_round_trips_float32(self):
+        filename = os.path.join(self.tmp, 'a.csv')
+        data_exporter.export_to_csv(self.columns, filename)
+        self._assert_matches_baseline(self._read(filename, ','), ',', '')
+
+    def test_txt_round_trips_float32(self):
+        filename = os.path.join(self.tmp, 'a.txt')
+        data_exporter.export_to_txt(self.columns, filename)
+        self._assert_matches_baseline(self._read(filename, '\t'), '\t', 'None')
+
+    def test_fractional_voltage_is_not_rounded(self):
+        filename = os.path.join(self.tmp, 'a.csv')
+        data_exporter.export_to_csv(self.columns, filename)
+        rows = self._read(filename, ',')
+        index = list(self.columns).index('tensao_mv')
+        self.assertEqual([rows[0][index], rows[1][index]], ['1650.37', '1651.92'])
+
+    def test_streaming_matches_single_block(self):
+        single = os.path.join(self.tmp, 'a.csv')
+        streamed = os.path.join(self.tmp, 'b.csv')
+        data_exporter.export_to_csv(self.columns, single)
+        chunks = ({c: v[i:i + 1000] for c, v in self.columns.items()} for i in range(0, 5000, 1000))
+        data_exporter.export_chunks_to_csv(chunks, streamed)
+        self.assertEqual(self._read(streamed, ','), self._read(single, ','))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+"""
+Diálogo de Exportação em Lote.
+
+Janela secundária do visualizador de histórico que seleciona experimentos
+por intervalo de IDs, de datas ou etiqueta e os exporta em paralelo
+(core.batch_export), reportando progresso e débito sem bloquear a thread Tk.
+"""
+
+import customtkinter as ctk
+import threading
+from tkinter import messagebox, filedialog as fd
+from typing import Any, Dict, Optional
+
+import core.database as database
+import core.batch_export as batch_export
+
+# Período (ms) de amostragem do progresso da exportação.
+PROGRESS_POLL_MS: int = 200
+
+
+class BatchExportDialog(ctk.CTkToplevel):
+    """
+    Formulário de critérios de seleção e acompanhamento da exportação em lote.
+    """
+
+    def __init__(self, master: Any):
+        super().__init__(master)
+        self.title("Exportação em Lote")
+        self.geometry("460x420")
+        self.resizable(False, False)
+
+        self._state: Optional[Dict[str, Any]] = None
+
+        self.grid_columnconfigure(1, weight=1)
+        self.entries: Dict[str, ctk.CTkEntry] = {}
+
+        fields = [
+            ("id_min", "ID mínimo:"),
+            ("id_max", "ID máximo:"),
+            ("date_from", "Desde (AAAA-MM-DD):"),
+            ("date_to", "Até (AAAA-MM-DD):"),
+            ("tag", "Etiqueta:"),
+        ]
+        for row, (key, label) in enumerate(fields):
+            ctk.CTkLabel(self, text=label).grid(row=row, column=0, padx=(20, 10), pady=5, sticky="w")
+            entry = ctk.CTkEntry(self)
+            entry.grid(row=row, column=1, padx=(0, 20), pady=5, sticky="ew")
+            self.entries[key] = entry
+
+        ctk.CTkLabel(self, text="Formato:").grid(row=5, column=0, padx=(20, 10), pady=5, sticky="w")
+        self.format_menu = ctk.CTkOptionMenu(self, values=[f.upper() for f in batch_export.EXPORT_FORMATS])
+        self.format_menu.grid(row=5, column=1, padx=(0, 20), pady=5, sticky="ew")
+
+        self.export_button = ctk.CTkButton(self, text="Selecionar Pasta e Exportar", command=self.on_export_pressed)
+        self.export_button.grid(row=6, column=0, columnspan=2, padx=20, pady=(15, 5), sticky="ew")
+
+        self.progress_bar = ctk.CTkProgressBar(self)
+        self.progress_bar.grid(row=7, column=0, columnspan=2, padx=20, pady=5, sticky="ew")
+        self.progress_bar.set(0)
+
+        self.status_label = ctk.CTkLabel(self, text="", justify="left")
+        self.status_label.grid(row=8, column=0, columnspan=2, padx=20, pady=5, sticky="w")
+
+    def _read_int(self, key: str) -> Optional[int]:
+        value = self.entries[key].get().strip()
+        return int(value) if value else None
+
+    def on_export_pressed(self) -> None:
+        """Resolve a seleção, pede a pasta de destino e lança o pool numa thread auxiliar."""
+        if self._state is not None:
+            return
+
+        try:
+            exp_ids = database.select_experiments(
+                self._read_int("id_min"), self._read_int("id_max"),
+                self.entries["date_from"].get().strip() or None,
+                self.entries["date_to"].get().strip() or None,
+                self.entries["tag"].get().strip() or None
+            )
+        except ValueError:
+            messagebox.showerror("Critérios Inválidos", "Os IDs devem ser números inteiros.", parent=self)
+            return
+
+        if not exp_ids:
+            messagebox.showinfo("Exportação em Lote", "Nenhum experimento corresponde aos critérios.", parent=self)
+            return
+
+        out_dir = fd.askdirectory(title="Pasta de Destino da Exportação", parent=self)
+        if not out_dir:
+            return
+
+        fmt = self.format_menu.get().lower()
+        state: Dict[str, Any] = {'progress': {'done': 0, 'total': len(exp_ids)}, 'result': None, 'error': None}
+        self._state = state
+
+        def on_progress(progress: Dict[str, Any]) -> None:
+            state['progress'] = progress
+
+        def run() -> None:
+            try:
+                state['result'] = batch_export.batch_export(exp_ids, out_dir, fmt, progress_callback=on_progress)
+            except Exception as e:
+                state['error'] = str(e)
+                state['result'] = {}
+
+        self.export_button.configure(state="disabled")
+        self.status_label.configure(text=f"A exportar {len(exp_ids)} experimento(s)...")
+        threading.Thread(target=run, daemon=True).start()
+        self.after(PROGRESS_POLL_MS, self._poll_progress)
+
+    def _poll_progress(self) -> None:
+        """Reflete o progresso e o débito agregados do pool de processos."""
+        state = self._state
+        if state is None:
+            return
+
+        progress = state['progress']
+        self.progress_bar.set(progress['done'] / progress['total'] if progress['total'] else 0.0)
+        if progress.get('elapsed'):
+            self.status_label.configure(
+                text=f"{progress['done']}/{progress['total']} experimentos | "
+                     f"{progress['rows']:,} linhas | {progress['rows_per_sec']:,.0f} linhas/s | "
+                     f"{progress['bytes'] / 2**20 / progress['elapsed']:.1f} MiB/s"
+            )
+
+        if state['result'] is None:
+            self.after(PROGRESS_POLL_MS, self._poll_progress)
+            return
+
+        self._state = None
+        self.export_button.configure(state="normal")
+        if state['error']:
+            messagebox.showerror("Falha Operacional", f"Exportação em lote interrompida: {state['error']}", parent=self)
+            return
+
+        errors = [r for r in state['result'].get('results', []) if r['error']]
+        if errors:
+            messagebox.showwarning(
+                "Exportação Parcial",
+                f"{len(errors)} experimento(s) falharam: " + ", ".join(f"#{r['exp_id']}" for r in errors),
+                parent=self
+            )
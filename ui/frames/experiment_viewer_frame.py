@@ -3,8 +3,8 @@ Módulo de Visualização de Histórico (Experiment Viewer).
 
 Gere a interface gráfica destinada à análise assíncrona de dados persistidos.
 Permite o carregamento de matrizes de telemetria de experiências passadas,
-renderização estática de gráficos vetoriais (Sinal vs. Tensão) e exportação
-para formatos de integração externa (CSV, TXT, NumPy).
+renderização de gráficos vetoriais (Sinal vs. Tensão) com nível de detalhe
+dinâmico (LOD) e exportação para formatos de integração externa (CSV, TXT, NumPy).
 """
 
 import customtkinter as ctk
@@ -12,11 +12,28 @@ import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
 from tkinter import messagebox, filedialog as fd
 import os
-from typing import Any
+import threading
+from typing import Any, Dict, List
 
 import core.database as database
+import core.maintenance as maintenance
 import core.data_exporter as data_exporter
+import core.derived_signals as derived_signals
+import core.data_importer as data_importer
 from ui.plot_manager import apply_style_from_settings
+from ui.lod_engine import LevelOfDetailEngine
+from ui.frames.batch_export_dialog import BatchExportDialog
+
+# Atraso (ms) para agrupar eventos consecutivos de zoom/pan num único pedido LOD.
+LOD_REFRESH_DELAY_MS: int = 60
+
+# Período (ms) de amostragem do progresso de expurgos em segundo plano.
+DELETE_PROGRESS_POLL_MS: int = 100
+
+# Catálogo: período (ms) de espera pela consulta em segundo plano e botões criados
+# por iteração do ciclo Tk (listas longas não bloqueiam a interface).
+CATALOG_POLL_MS: int = 50
+CATALOG_BUTTONS_PER_TICK: int = 40
 
 
 class ExperimentViewerFrame(ctk.CTkFrame):
@@ -38,8 +55,18 @@ class ExperimentViewerFrame(ctk.CTkFrame):
         super().__init__(master)
         self.controller = controller
 
-        self.current_loaded_data = None
         self.current_loaded_exp_id = None
+        self.lod_engine = None
+        self.line_controle = None
+        self.line_tensao = None
+        self._lod_after_id = None
+        self._xlim_cid = None
+
+        # Estado partilhado com a thread de manutenção durante um expurgo (escrita atómica por chave).
+        self._delete_state = None
+        self._import_state = None
+        # Geração do catálogo: resultados de consultas anteriores a um novo pedido são ignorados.
+        self._catalog_generation = 0
 
         self.grid_rowconfigure(1, weight=1)
         self.grid_columnconfigure(0, weight=0, minsize=300)
@@ -55,6 +82,10 @@ class ExperimentViewerFrame(ctk.CTkFrame):
             .pack(side="right", padx=20)
         ctk.CTkButton(top_bar, text="Sincronizar Registo I/O", command=self.populate_experiment_list) \
             .pack(side="right", padx=5)
+        self.import_button = ctk.CTkButton(top_bar, text="Importar Ficheiros", command=self.on_import_pressed)
+        self.import_button.pack(side="right", padx=5)
+        ctk.CTkButton(top_bar, text="Exportação em Lote", command=self.open_batch_export) \
+            .pack(side="right", padx=5)
 
         # --- 2. Painel Lateral de Navegação de Dados ---
         sidebar_container = ctk.CTkFrame(self, fg_color="transparent")
@@ -101,7 +132,7 @@ class ExperimentViewerFrame(ctk.CTkFrame):
         self.buttons_container = ctk.CTkFrame(self.graph_frame, fg_color="transparent")
         self.buttons_container.grid(row=2, column=0, pady=(10, 5), sticky="ew")
         self.buttons_container.grid_columnconfigure(0, weight=1)
-        self.buttons_container.grid_columnconfigure(1, weight=1)
+        self.buttons_container.grid_columnconfigure(2, weight=1)
 
         self.export_button = ctk.CTkButton(self.buttons_container, 
                                            text="Exportar Matriz de Dados",
@@ -109,31 +140,78 @@ class ExperimentViewerFrame(ctk.CTkFrame):
                                            state="disabled")
         self.export_button.grid(row=0, column=0, padx=5, sticky="e") 
 
+        self.playback_button = ctk.CTkButton(self.buttons_container,
+                                             text="Reproduzir no Painel",
+                                             command=self.on_playback_pressed,
+                                             state="disabled")
+        self.playback_button.grid(row=0, column=1, padx=5)
+
         self.delete_button = ctk.CTkButton(self.buttons_container,
                                            text="Expurgar Registo",
                                            command=self.delete_current_experiment,
                                            state="disabled",
                                            fg_color="#D9534F", hover_color="#C9302C")
-        self.delete_button.grid(row=0, column=1, padx=5, sticky="w") 
+        self.delete_button.grid(row=0, column=2, padx=5, sticky="w") 
+
+        self.delete_progress_label = ctk.CTkLabel(self.buttons_container, text="")
+        self.delete_progress_label.grid(row=1, column=0, columnspan=3, pady=(5, 0))
+        self.delete_progress_bar = ctk.CTkProgressBar(self.buttons_container)
+        self.delete_progress_bar.grid(row=2, column=0, columnspan=3, padx=20, pady=(0, 5), sticky="ew")
+        self.delete_progress_label.grid_remove()
+        self.delete_progress_bar.grid_remove()
 
         self.populate_experiment_list()
 
     def populate_experiment_list(self) -> None:
         """
-        Executa a varredura do SQLite e instancia os nós de interface
-        para cada matriz de dados consolidada.
+        Executa a varredura do SQLite numa thread auxiliar e instancia, por
+        blocos, os nós de interface para cada matriz de dados consolidada.
         """
+        self._catalog_generation += 1
+        generation = self._catalog_generation
+
         for widget in self.scroll_frame.winfo_children():
             widget.destroy()
+        ctk.CTkLabel(self.scroll_frame, text="A carregar registos...").pack(pady=10)
+
+        state: Dict[str, Any] = {'result': None}
+
+        def load() -> None:
+            try:
+                state['result'] = database.get_completed_experiments()
+            except Exception as e:
+                print(f"Visualizador: Erro ao carregar o catálogo: {e}")
+                state['result'] = []
+
+        threading.Thread(target=load, name="catalog-loader", daemon=True).start()
+        self.after(CATALOG_POLL_MS, self._poll_catalog, generation, state)
+
+    def _poll_catalog(self, generation: int, state: Dict[str, Any]) -> None:
+        """Aguarda a consulta do catálogo e inicia a criação dos botões."""
+        if generation != self._catalog_generation:
+            return
+        if state['result'] is None:
+            self.after(CATALOG_POLL_MS, self._poll_catalog, generation, state)
+            return
 
-        experiments = database.get_completed_experiments()
+        for widget in self.scroll_frame.winfo_children():
+            widget.destroy()
 
+        experiments = state['result']
         if not experiments:
             ctk.CTkLabel(self.scroll_frame, text="Nenhum registo persistido foi encontrado.") \
                 .pack(pady=10)
             return
 
-        for exp in experiments:
+        self._add_catalog_buttons(generation, experiments, 0)
+
+    def _add_catalog_buttons(self, generation: int, experiments: List[Dict[str, Any]], start: int) -> None:
+        """Cria um bloco de botões do catálogo e agenda o seguinte."""
+        if generation != self._catalog_generation:
+            return
+
+        end = min(start + CATALOG_BUTTONS_PER_TICK, len(experiments))
+        for exp in experiments[start:end]:
             text =  f"{exp['nome']}\n" \
                     f"Cronologia: {exp['inicio_str']} -> {exp['fim_str']}\n" \
                     f"Intervalo Total: {exp['duracao_str']}"
@@ -144,53 +222,53 @@ class ExperimentViewerFrame(ctk.CTkFrame):
                                 command=lambda e=exp['id']: self.load_experiment_data(e))
             btn.pack(pady=5, padx=5, fill="x")
 
+        if end < len(experiments):
+            self.after(1, self._add_catalog_buttons, generation, experiments, end)
+
     def load_experiment_data(self, exp_id: int) -> None:
         """
-        Executa a extração em lote da base de dados e gera o mapa vetorial estático.
+        Instancia o motor LOD da sessão e renderiza a vista de conjunto decimada.
+
+        Apenas a janela visível é extraída da base de dados; cada zoom ou pan
+        subsequente reemite uma consulta por intervalo (ver _refresh_lod).
 
         Args:
             exp_id (int): Identificador primário da sessão de teste.
         """
-        self.current_loaded_data = None
         self.current_loaded_exp_id = None
         self.export_button.configure(state="disabled")
+        self.playback_button.configure(state="disabled")
         self.delete_button.configure(state="disabled")
+        self._reset_plot()
 
-        telemetry_data = database.get_telemetry_for_experiment(exp_id)
+        engine = LevelOfDetailEngine(exp_id, ['sinal_controle', 'tensao_mv'])
 
-        self.ax.clear()
-        if self.ax2:
-            self.ax2.remove()
-            self.ax2 = None
-
-        if not telemetry_data:
+        if engine.is_empty:
             self.ax.set_title(f"Sessão #{exp_id} - Matriz Vazia")
             self.canvas.draw()
             return
 
         try:
-            self.current_loaded_data = telemetry_data
+            self.lod_engine = engine
             self.current_loaded_exp_id = exp_id
             self.export_button.configure(state="normal")
+            self.playback_button.configure(state="normal")
             self.delete_button.configure(state="normal")
 
-            start_time_ms = telemetry_data[0]['timestamp_amostra_ms']
-
-            time_sec = [(d['timestamp_amostra_ms'] - start_time_ms) / 1000.0 for d in telemetry_data]
-            sinal_controle = [d.get('sinal_controle', 0.0) for d in telemetry_data]
-            tensao_mv = [d.get('tensao_mv', 0.0) for d in telemetry_data]
+            view = engine.fetch_overview(self._get_pixel_width())
+            duration_sec = max((engine.t_end_ms - engine.t_start_ms) / 1000.0, 0.001)
 
             self.ax.set_title(f"Análise Consolidada - Sessão #{exp_id}")
             self.ax.set_xlabel("Cronologia Relativa (s)")
 
-            self.ax.plot(time_sec, sinal_controle, color='tab:blue', marker='o', markersize=2, linestyle='-', label='Sinal de Controlo LQR (%)')
+            self.line_controle, = self.ax.plot(view['t'], view['sinal_controle'], color='tab:blue', marker='o', markersize=2, linestyle='-', label='Sinal de Controlo LQR (%)')
             self.ax.set_ylabel('Sinal LQR (%)', color='tab:blue')
             self.ax.set_ylim(0, 100)
             self.ax.tick_params(axis='y', labelcolor='tab:blue')
             self.ax.grid(True, axis='y', linestyle='--', color='tab:blue', alpha=0.5)
 
             self.ax2 = self.ax.twinx()
-            self.ax2.plot(time_sec, tensao_mv, color='tab:red', marker='x', markersize=2, linestyle='-', label='Tensão Real (mV)')
+            self.line_tensao, = self.ax2.plot(view['t'], view['tensao_mv'], color='tab:red', marker='x', markersize=2, linestyle='-', label='Tensão Real (mV)')
 
             self.ax2.set_ylabel('Potencial (mV)', color='tab:red')
             self.ax2.set_ylim(0, 3300)
@@ -201,19 +279,67 @@ class ExperimentViewerFrame(ctk.CTkFrame):
             lines2, labels2 = self.ax2.get_legend_handles_labels()
             self.ax.legend(lines1 + lines2, labels1 + labels2, loc='upper left')
 
+            self.ax.set_xlim(0.0, duration_sec)
+            self._xlim_cid = self.ax.callbacks.connect('xlim_changed', self._on_xlim_changed)
+
             self.fig.tight_layout()
             self.canvas.draw()
         except Exception:
-            self.ax.clear()
+            self._reset_plot()
             self.ax.set_title(f"Erro de processamento vetorial - Sessão #{exp_id}")
             self.canvas.draw()
 
+    def _reset_plot(self) -> None:
+        """Desliga o motor LOD e limpa as primitivas gráficas da sessão anterior."""
+        if self._lod_after_id:
+            try: self.after_cancel(self._lod_after_id)
+            except Exception: pass
+            self._lod_after_id = None
+        if self._xlim_cid is not None:
+            self.ax.callbacks.disconnect(self._xlim_cid)
+            self._xlim_cid = None
+
+        self.lod_engine = None
+        self.line_controle = None
+        self.line_tensao = None
+
+        self.ax.clear()
+        if self.ax2:
+            self.ax2.remove()
+            self.ax2 = None
+
+    def _get_pixel_width(self) -> int:
+        """Largura útil (px) do eixo principal, usada como orçamento de resolução."""
+        try:
+            return max(1, int(self.ax.get_window_extent().width))
+        except Exception:
+            return 1000
+
+    def _on_xlim_changed(self, _ax: Any) -> None:
+        """Agenda (com debounce) a atualização LOD após zoom ou pan da toolbar."""
+        if self._lod_after_id:
+            self.after_cancel(self._lod_after_id)
+        self._lod_after_id = self.after(LOD_REFRESH_DELAY_MS, self._refresh_lod)
+
+    def _refresh_lod(self) -> None:
+        """Extrai apenas o intervalo visível na resolução do ecrã e reinjeta as linhas."""
+        self._lod_after_id = None
+        if self.lod_engine is None or self.line_controle is None:
+            return
+
+        t_min, t_max = self.ax.get_xlim()
+        view = self.lod_engine.fetch(t_min, t_max, self._get_pixel_width())
+
+        self.line_controle.set_data(view['t'], view['sinal_controle'])
+        self.line_tensao.set_data(view['t'], view['tensao_mv'])
+        self.canvas.draw_idle()
+
     def on_export_pressed(self) -> None:
         """
         Gere a ponte de diálogo de sistema operativo e aciona o módulo de 
         desserialização em formatos standard de processamento (CSV, TXT, NPY).
         """
-        if not self.current_loaded_data:
+        if not self.current_loaded_exp_id:
             return
 
         file_types = [
@@ -238,26 +364,98 @@ class ExperimentViewerFrame(ctk.CTkFrame):
         _base, ext = os.path.splitext(filepath)
         ext = ext.lower()
 
-        data_to_export = self.current_loaded_data
+        # A vista LOD não retém a sessão em memória: extração colunar integral apenas na exportação.
+        data_to_export = database.get_telemetry_columns(self.current_loaded_exp_id)
+
+        # Coluna filtrada (mesmo filtro do painel em tempo real, aplicado em lote à sessão).
+        filtered_col = None
+        filter_kind = getattr(self.controller, "active_filter", None)
+        if filter_kind and len(data_to_export['tensao_mv']):
+            filtered_col = derived_signals.compute_signal(
+                filter_kind, data_to_export['tensao_mv'], data_to_export['timestamp_amostra_ms']
+            )
 
         try:
             if ext == '.csv':
-                data_exporter.export_to_csv(data_to_export, filepath)
+                data_exporter.export_to_csv(data_to_export, filepath, filtered_col)
             elif ext == '.txt':
-                data_exporter.export_to_txt(data_to_export, filepath)
+                data_exporter.export_to_txt(data_to_export, filepath, filtered_col)
             elif ext == '.npy':
                 data_exporter.export_to_npy(data_to_export, filepath)
             else:
-                data_exporter.export_to_csv(data_to_export, filepath)
+                data_exporter.export_to_csv(data_to_export, filepath, filtered_col)
         except Exception:
             pass
 
+    def on_playback_pressed(self) -> None:
+        """Reproduz a sessão carregada no painel em tempo real, pelo pipeline da telemetria UDP."""
+        if not self.current_loaded_exp_id:
+            return
+        self.controller.show_frame("Live")
+        self.controller.get_frame("Live").start_playback(self.current_loaded_exp_id)
+
+    def open_batch_export(self) -> None:
+        """Abre (ou traz para a frente) o diálogo de exportação paralela em lote."""
+        dialog = getattr(self, "_batch_export_dialog", None)
+        if dialog is not None and dialog.winfo_exists():
+            dialog.focus()
+            return
+        self._batch_export_dialog = BatchExportDialog(self)
+
+    def on_import_pressed(self) -> None:
+        """
+        Seleciona ficheiros exportados (CSV, TXT, NPY) e importa-os como novos
+        experimentos na thread de manutenção, sem bloquear a interface.
+        """
+        if self._import_state is not None:
+            return
+
+        filepaths = fd.askopenfilenames(
+            title="Importar Matrizes de Telemetria",
+            filetypes=[
+                ('Ficheiros de Telemetria', '*.csv *.txt *.npy'),
+                ('Todos os arquivos', '*.*')
+            ]
+        )
+        if not filepaths:
+            return
+
+        state = {'total': len(filepaths), 'result': None}
+        self._import_state = state
+        self.import_button.configure(state="disabled", text=f"A importar {len(filepaths)} ficheiro(s)...")
+
+        def run_import() -> None:
+            state['result'] = data_importer.import_files(list(filepaths))
+
+        maintenance.submit(run_import)
+        self.after(DELETE_PROGRESS_POLL_MS, self._poll_import_progress)
+
+    def _poll_import_progress(self) -> None:
+        """Aguarda o término da importação e atualiza a listagem."""
+        state = self._import_state
+        if state is None:
+            return
+        if state['result'] is None:
+            self.after(DELETE_PROGRESS_POLL_MS, self._poll_import_progress)
+            return
+
+        self._import_state = None
+        self.import_button.configure(state="normal", text="Importar Ficheiros")
+        self.populate_experiment_list()
+
+        imported = state['result']
+        if len(imported) < state['total']:
+            messagebox.showwarning(
+                "Importação Parcial",
+                f"{len(imported)} de {state['total']} ficheiro(s) importado(s). Consulte a consola para detalhes."
+            )
+
     def delete_current_experiment(self) -> None:
         """
-        Emite rotina de destruição de referências SQL e atualiza a view.
-        Protegido por confirmação estrita do operador.
+        Emite rotina de destruição de referências SQL em segundo plano e
+        acompanha o progresso na view. Protegido por confirmação estrita do operador.
         """
-        if not self.current_loaded_exp_id:
+        if not self.current_loaded_exp_id or self._delete_state is not None:
             return
 
         confirm = messagebox.askyesno(
@@ -265,22 +463,63 @@ class ExperimentViewerFrame(ctk.CTkFrame):
             f"Confirma o expurgo definitivo dos dados da Sessão #{self.current_loaded_exp_id}?\nNão existe reversão para este comando I/O."
         )
 
-        if confirm:
-            success = database.delete_experiment(self.current_loaded_exp_id)
+        if not confirm:
+            return
+
+        exp_id = self.current_loaded_exp_id
+        self.current_loaded_exp_id = None
+        self._reset_plot()
+        self.ax.set_title(f"A expurgar a Sessão #{exp_id}...")
+        self.canvas.draw()
+
+        self.export_button.configure(state="disabled")
+        self.playback_button.configure(state="disabled")
+        self.delete_button.configure(state="disabled")
+
+        self._delete_state = {'exp_id': exp_id, 'removed': 0, 'total': 0, 'result': None}
+        self.delete_progress_bar.set(0)
+        self.delete_progress_label.configure(text=f"Expurgo da Sessão #{exp_id}: 0%")
+        self.delete_progress_label.grid()
+        self.delete_progress_bar.grid()
+
+        state = self._delete_state
+
+        def on_progress(removed: int, total: int) -> None:
+            state['removed'], state['total'] = removed, total
+
+        def run_delete() -> None:
+            state['result'] = database.delete_experiment(exp_id, progress_callback=on_progress)
+
+        # O expurgo corre em blocos na thread de manutenção; a UI apenas amostra o progresso.
+        maintenance.submit(run_delete)
+        self.after(DELETE_PROGRESS_POLL_MS, self._poll_delete_progress)
+
+    def _poll_delete_progress(self) -> None:
+        """Reflete o progresso do expurgo em segundo plano e finaliza a view no término."""
+        state = self._delete_state
+        if state is None:
+            return
+
+        fraction = state['removed'] / state['total'] if state['total'] else 0.0
+        self.delete_progress_bar.set(fraction)
+        self.delete_progress_label.configure(
+            text=f"Expurgo da Sessão #{state['exp_id']}: {fraction * 100:.0f}% "
+                 f"({state['removed']}/{state['total']} amostras)"
+        )
+
+        if state['result'] is None:
+            self.after(DELETE_PROGRESS_POLL_MS, self._poll_delete_progress)
+            return
+
+        self._delete_state = None
+        self.delete_progress_label.grid_remove()
+        self.delete_progress_bar.grid_remove()
 
-            if success:
-                self.current_loaded_exp_id = None
-                self.current_loaded_data = None
-                self.ax.clear()
-                if self.ax2: 
-                    self.ax2.remove()
-                    self.ax2 = None
+        # Só após o término: antes disso a sessão pode ainda não estar marcada como 'deleting'.
+        self.populate_experiment_list()
+        if state['result']:
+            if self.lod_engine is None:
                 self.ax.set_title("Registo Expurgado com Sucesso")
                 self.canvas.draw()
-
-                self.export_button.configure(state="disabled")
-                self.delete_button.configure(state="disabled")
-
-                self.populate_experiment_list()
-            else:
-                messagebox.showerror("Falha Operacional", "Falha de transação na exclusão do registo SQL.")
\ No newline at end of file
+        else:
+            messagebox.showerror("Falha Operacional", "Falha de transação na exclusão do registo SQL.")
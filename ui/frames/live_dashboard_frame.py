@@ -7,17 +7,36 @@ Gere os túneis bidirecionais de sinalização com o firmware.
 """
 
 import customtkinter as ctk
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
 import matplotlib.pyplot as plt
 import matplotlib.animation as animation
 from datetime import datetime
 import os
-from typing import Any
+import queue
+import time
+from typing import Any, Optional
 
+import config.settings as settings
 import core.database as database
+import core.derived_signals as derived_signals
+import core.profiling as profiling
+import core.udp_server as udp_server
+from core.playback import ExperimentPlayback, PLAYBACK_RESET_KEY
+from core.metrics import registry
+from core.trigger import recorder as trigger_recorder, TRIGGER_MODES, TRIGGER_CHANNELS
 from core.shared_state import data_queue, shared_data, data_lock
 from ui.plot_manager import GraphManager, apply_style_from_settings
 
+# Período (ms) de atualização do painel de saúde (apenas quando expandido).
+HEALTH_REFRESH_MS: int = 1000
+
+# Drenagem da data_queue por tick de process_queue: período (ms), máximo de
+# itens e orçamento de tempo (s). Com atraso acumulado, o tick seguinte é
+# agendado de imediato em vez de esperar o período completo.
+PROCESS_QUEUE_INTERVAL_MS: int = 33
+PROCESS_QUEUE_MAX_ITEMS: int = 200
+PROCESS_QUEUE_BUDGET_SEC: float = 0.008
+
 
 class LiveDashboardFrame(ctk.CTkFrame):
     """
@@ -46,6 +65,45 @@ class LiveDashboardFrame(ctk.CTkFrame):
         ctk.CTkButton(self.sidebar_frame, text="Erro do Observador", command=lambda: self.select_graph('erro_observador'), fg_color="#8E44AD", hover_color="#732D91").pack(pady=10, padx=20)
         ctk.CTkButton(self.sidebar_frame, text="Tempo de Ciclo", command=lambda: self.select_graph('ciclo')).pack(pady=10, padx=20)
         ctk.CTkButton(self.sidebar_frame, text="Estados do Sistema", command=lambda: self.select_graph('estados_sistema'), fg_color="#2E86C1", hover_color="#1B4F72").pack(pady=10, padx=20)
+        ctk.CTkButton(self.sidebar_frame, text="Espectro (PSD)", command=lambda: self.select_graph('espectro')).pack(pady=10, padx=20)
+
+        # Vistas múltiplas: várias famílias em grelha com eixo de tempo partilhado.
+        self.layout_menu = ctk.CTkOptionMenu(self.sidebar_frame, values=list(settings.DASHBOARD_LAYOUTS.keys()),
+                                             command=self.select_layout)
+        self.layout_menu.set("Vista Múltipla")
+        self.layout_menu.pack(pady=10, padx=20)
+
+        # Filtro da tensão (Controle e Tensão); também aplicado à exportação no visualizador.
+        self._filter_kinds = {derived_signals.SIGNAL_KINDS[k]: k for k in ('ema', 'moving_average', 'butterworth')}
+        self.filter_switch = ctk.CTkSwitch(self.sidebar_frame, text="Filtro (EMA)", command=self.on_filter_changed)
+        self.filter_switch.pack(pady=(20, 5), padx=20, anchor="w")
+        self.filter_menu = ctk.CTkOptionMenu(self.sidebar_frame, values=list(self._filter_kinds.keys()),
+                                             command=lambda _label: self.on_filter_changed())
+        self.filter_menu.pack(pady=5, padx=20)
+
+        # Gravação por gatilho (limiar/flanco num canal ou mudança de referência).
+        self._trigger_modes = {label: mode for mode, label in TRIGGER_MODES.items()}
+        self.trigger_switch = ctk.CTkSwitch(self.sidebar_frame, text="Gatilho", command=self.on_trigger_changed)
+        self.trigger_switch.pack(pady=(20, 5), padx=20, anchor="w")
+        self.trigger_mode_menu = ctk.CTkOptionMenu(self.sidebar_frame, values=list(self._trigger_modes.keys()),
+                                                   command=lambda _label: self.on_trigger_changed())
+        self.trigger_mode_menu.set(TRIGGER_MODES[trigger_recorder.mode])
+        self.trigger_mode_menu.pack(pady=5, padx=20)
+        self.trigger_channel_menu = ctk.CTkOptionMenu(self.sidebar_frame, values=list(TRIGGER_CHANNELS),
+                                                      command=lambda _label: self.on_trigger_changed())
+        self.trigger_channel_menu.set(trigger_recorder.channel)
+        self.trigger_channel_menu.pack(pady=5, padx=20)
+        self.trigger_level_entry = ctk.CTkEntry(self.sidebar_frame, placeholder_text="Nível")
+        self.trigger_level_entry.insert(0, str(trigger_recorder.level))
+        self.trigger_level_entry.bind("<Return>", lambda _event: self.on_trigger_changed())
+        self.trigger_level_entry.pack(pady=5, padx=20)
+        self._trigger_state = trigger_recorder.state
+
+        # Captura em bruto dos datagramas recebidos (reprodutível com python -m core.capture).
+        self.capture_switch = ctk.CTkSwitch(self.sidebar_frame, text="Captura UDP", command=self.on_capture_changed)
+        self.capture_switch.pack(pady=(20, 5), padx=20, anchor="w")
+        if settings.CAPTURE_ON_STARTUP:
+            self.capture_switch.select()
 
         self.main_frame = ctk.CTkFrame(self) 
         self.main_frame.grid(row=0, column=1, padx=10, pady=10, sticky="nsew")
@@ -58,6 +116,9 @@ class LiveDashboardFrame(ctk.CTkFrame):
         self.pause_button.pack(side="right", padx=(5, 0))
         self.save_button = ctk.CTkButton(self.graph_controls_frame, text="Salvar Gráfico", width=120, command=self.save_graph)
         self.save_button.pack(side="right")
+        self.health_button = ctk.CTkButton(self.graph_controls_frame, text="Saúde ▸", width=80,
+                                           fg_color="gray", command=self.toggle_health_panel)
+        self.health_button.pack(side="right", padx=(0, 5))
 
         apply_style_from_settings()
         self.fig, self.ax = plt.subplots()
@@ -65,6 +126,54 @@ class LiveDashboardFrame(ctk.CTkFrame):
         self.canvas = FigureCanvasTkAgg(self.fig, master=self.main_frame)
         self.canvas_widget = self.canvas.get_tk_widget()
         self.canvas_widget.grid(row=1, column=0, sticky="nsew")
+
+        # Barra de navegação (pan/zoom) sobre o instantâneo; só visível em pausa.
+        self.toolbar = NavigationToolbar2Tk(self.canvas, self.main_frame, pack_toolbar=False)
+        self.toolbar.grid(row=2, column=0, sticky="ew")
+        self.toolbar.grid_remove()
+
+        # Barra de reprodução de sessões gravadas (visível apenas durante a reprodução).
+        self.playback: Optional[ExperimentPlayback] = None
+        self._seek_touched = 0.0
+        self.playback_bar = ctk.CTkFrame(self.main_frame, fg_color="transparent")
+        self.playback_bar.grid(row=3, column=0, sticky="ew", padx=5, pady=(5, 0))
+        self.playback_bar.grid_columnconfigure(3, weight=1)
+        self.playback_label = ctk.CTkLabel(self.playback_bar, text="Reprodução")
+        self.playback_label.grid(row=0, column=0, padx=(0, 10))
+        self.playback_pause_button = ctk.CTkButton(self.playback_bar, text="Pausar", width=80,
+                                                   command=self.toggle_playback_pause)
+        self.playback_pause_button.grid(row=0, column=1, padx=5)
+        self.playback_speed_menu = ctk.CTkOptionMenu(self.playback_bar, width=80,
+                                                     values=[f"{s:g}x" for s in settings.PLAYBACK_SPEEDS],
+                                                     command=self.on_playback_speed_changed)
+        self.playback_speed_menu.set("1x")
+        self.playback_speed_menu.grid(row=0, column=2, padx=5)
+        self.playback_slider = ctk.CTkSlider(self.playback_bar, from_=0, to=1, command=self.on_playback_seek)
+        self.playback_slider.grid(row=0, column=3, padx=5, sticky="ew")
+        self.playback_position_label = ctk.CTkLabel(self.playback_bar, text="0.0 / 0.0 s", width=110)
+        self.playback_position_label.grid(row=0, column=4, padx=5)
+        ctk.CTkButton(self.playback_bar, text="Terminar", width=80, fg_color="gray",
+                      command=self.stop_playback).grid(row=0, column=5, padx=(5, 0))
+        self.playback_bar.grid_remove()
+
+        # Painel de saúde do pipeline (core.metrics), recolhível.
+        self.health_visible = False
+        self._after_id_health = None
+        self._health_previous: Optional[tuple] = None
+        self.health_frame = ctk.CTkFrame(self.main_frame)
+        self.health_frame.grid(row=4, column=0, sticky="ew", padx=5, pady=(5, 0))
+        self.health_labels = {}
+        health_fields = [
+            ('packets', "Pacotes/s"), ('drops', "Descartes (gráfico/BD)"), ('data_queue', "Fila do gráfico"),
+            ('db_queue', "Fila da BD"), ('flush', "Flush BD (últ./p95)"), ('fps', "FPS (quadro p95)"),
+        ]
+        for column, (key, title) in enumerate(health_fields):
+            self.health_frame.grid_columnconfigure(column, weight=1)
+            ctk.CTkLabel(self.health_frame, text=title, text_color="gray",
+                         font=ctk.CTkFont(size=11)).grid(row=0, column=column, padx=5)
+            self.health_labels[key] = ctk.CTkLabel(self.health_frame, text="--", font=ctk.CTkFont(size=13, weight="bold"))
+            self.health_labels[key].grid(row=1, column=column, padx=5, pady=(0, 5))
+        self.health_frame.grid_remove()
         
         self.initial_message_label = ctk.CTkLabel(self.main_frame, text="Selecione um Gráfico", font=ctk.CTkFont(size=24, weight="bold"))
         self.initial_message_label.grid(row=1, column=0)
@@ -130,10 +239,11 @@ class LiveDashboardFrame(ctk.CTkFrame):
                 cache_frame_data=False
             )
 
-        try:
-            self.anim.event_source.start()
-        except Exception:
-            pass
+        if not self.is_paused:
+            try:
+                self.anim.event_source.start()
+            except Exception:
+                pass
 
         self.process_queue()
 
@@ -154,38 +264,221 @@ class LiveDashboardFrame(ctk.CTkFrame):
             self._after_id_process_queue = None
 
     def on_closing(self) -> None:
+        if self.health_visible:
+            self.toggle_health_panel()
+        self.stop_playback()
         self.stop_loops()
 
     def toggle_pause(self) -> None:
-        """Congela a atualização do gráfico sem perder a coleta de dados de fundo."""
+        """
+        Congela o gráfico num instantâneo do histórico recente, navegável com
+        pan/zoom, sem interromper a coleta de dados para os buffers vivos.
+        """
         self.is_paused = not self.is_paused
-        
-        if self.anim and self.anim.event_source:
-            if self.is_paused:
+
+        if self.is_paused:
+            if self.anim and self.anim.event_source:
                 self.anim.event_source.stop()
-                self.pause_button.configure(text="Retomar Gráfico")
-            else:
+            self.plotter.freeze()
+            self.toolbar.update()
+            self.toolbar.grid()
+            self.pause_button.configure(text="Retomar Gráfico")
+        else:
+            # Desativa um modo pan/zoom ainda ativo antes de voltar à animação.
+            if self.toolbar.mode == 'pan/zoom':
+                self.toolbar.pan()
+            elif self.toolbar.mode == 'zoom rect':
+                self.toolbar.zoom()
+            self.toolbar.grid_remove()
+            self.plotter.resume()
+            if self.plotter.filter_kind != self.controller.active_filter:
+                self.plotter.set_filter(self.controller.active_filter)
+            if self.anim and self.anim.event_source:
                 self.anim.event_source.start()
-                self.pause_button.configure(text="Pausar Gráfico")
-
+            self.pause_button.configure(text="Pausar Gráfico")
+
+        if self.is_graph_visible:
+            self.canvas.draw()
+
+    def toggle_health_panel(self) -> None:
+        """Expande/recolhe o painel de saúde; recolhido, não tem custo de atualização."""
+        self.health_visible = not self.health_visible
+        self.health_button.configure(text="Saúde ▾" if self.health_visible else "Saúde ▸")
+        if self.health_visible:
+            self.health_frame.grid()
+            self._health_previous = None
+            self._refresh_health_panel()
+        else:
+            self.health_frame.grid_remove()
+            if self._after_id_health:
+                self.after_cancel(self._after_id_health)
+                self._after_id_health = None
+
+    def _refresh_health_panel(self) -> None:
+        """Taxas calculadas pela diferença dos contadores entre atualizações."""
+        now = time.monotonic()
+        datagrams = registry.counter('udp_datagrams_total').value
+        frames_hist = registry.histogram('ui_frame_ms')
+        flush_hist = registry.histogram('db_flush_ms')
+
+        if self._health_previous is not None:
+            t_prev, datagrams_prev, frames_prev = self._health_previous
+            dt = max(now - t_prev, 1e-6)
+            self.health_labels['packets'].configure(text=f"{(datagrams - datagrams_prev) / dt:,.0f}")
+            self.health_labels['fps'].configure(
+                text=f"{(frames_hist.count - frames_prev) / dt:.0f} ({frames_hist.quantile(0.95) or 0:.0f} ms)")
+        self._health_previous = (now, datagrams, frames_hist.count)
+
+        self.health_labels['drops'].configure(
+            text=f"{registry.counter('data_queue_drops_total').value:,} / {registry.counter('db_queue_drops_total').value:,}")
+        self.health_labels['data_queue'].configure(text=f"{data_queue.qsize():,}")
+        self.health_labels['db_queue'].configure(text=f"{registry.gauge('db_queue_depth').value:,}")
+        p95 = flush_hist.quantile(0.95)
+        self.health_labels['flush'].configure(
+            text=f"{flush_hist.last:.1f} / {p95:.1f} ms" if p95 is not None else "--")
+
+        self._after_id_health = self.after(HEALTH_REFRESH_MS, self._refresh_health_panel)
+
+    @profiling.span('process_queue')
     def process_queue(self) -> None:
         """Extrai blocos de telemetria da fila garantindo integridade de frame."""
         if not self.is_running:
             return
 
+        backlog = False
         try:
             data_processed = False
-            while not data_queue.empty():
-                data = data_queue.get_nowait()
+            playback = self.playback
+            deadline = time.perf_counter() + PROCESS_QUEUE_BUDGET_SEC
+            for _ in range(PROCESS_QUEUE_MAX_ITEMS):
+                if time.perf_counter() >= deadline:
+                    break
+                try:
+                    data = data_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if playback is not None:
+                    # Durante a reprodução a telemetria viva não é desenhada (continua a ser gravada).
+                    if data.get(PLAYBACK_RESET_KEY):
+                        self.plotter.clear_data(data['t_inicio_ms'])
+                        continue
+                    if not data.get('reproducao'):
+                        continue
                 self.plotter.append_plot_data(data)
                 data_processed = True
+            backlog = not data_queue.empty()
+
+            if playback is not None:
+                self._update_playback_bar()
 
             if data_processed and not self.is_paused:
                 self._update_stats_bar()
 
+            # Disparos e fins de janela ocorrem na thread de receção.
+            if trigger_recorder.state != self._trigger_state:
+                self._trigger_state = trigger_recorder.state
+                self.update_rec_buttons()
+
         finally:
             if self.is_running:
-                self._after_id_process_queue = self.after(33, self.process_queue)
+                # Com itens por drenar cede o ciclo Tk (eventos e redesenho) e retoma logo a seguir.
+                delay = 1 if backlog else PROCESS_QUEUE_INTERVAL_MS
+                self._after_id_process_queue = self.after(delay, self.process_queue)
+
+    def start_playback(self, exp_id: int) -> None:
+        """Reproduz uma sessão gravada no gráfico em tempo real (core.playback)."""
+        self.stop_playback()
+        try:
+            playback = ExperimentPlayback(exp_id, speed=float(self.playback_speed_menu.get().rstrip("x")))
+        except ValueError as e:
+            print(f"Reprodução: {e}")
+            return
+
+        if self.is_paused:
+            self.toggle_pause()
+        if not self.is_graph_visible:
+            self.select_graph('controle_tensao')
+
+        self.playback = playback
+        self.playback_label.configure(text=f"Reprodução #{exp_id}")
+        self.playback_pause_button.configure(text="Pausar")
+        self.playback_slider.configure(to=max(playback.duration_ms, 1))
+        self.playback_slider.set(0)
+        self.playback_bar.grid()
+        playback.start()
+
+    def stop_playback(self) -> None:
+        """Termina a reprodução e devolve o gráfico à telemetria viva."""
+        if self.playback is None:
+            return
+        self.playback.stop()
+        self.playback = None
+        self.playback_bar.grid_remove()
+        self.plotter.clear_data()
+        if self.is_graph_visible:
+            self.canvas.draw()
+
+    def toggle_playback_pause(self) -> None:
+        if self.playback is None:
+            return
+        self.playback.set_paused(not self.playback.paused)
+        self.playback_pause_button.configure(text="Retomar" if self.playback.paused else "Pausar")
+
+    def on_playback_speed_changed(self, label: str) -> None:
+        if self.playback is not None:
+            self.playback.set_speed(float(label.rstrip("x")))
+
+    def on_playback_seek(self, value: float) -> None:
+        if self.playback is not None:
+            self._seek_touched = time.monotonic()
+            self.playback.seek(self.playback.t_start_ms + int(value))
+
+    def _update_playback_bar(self) -> None:
+        playback = self.playback
+        elapsed_ms = playback.position_ms - playback.t_start_ms
+        # Não contraria o cursor enquanto o utilizador o arrasta.
+        if time.monotonic() - self._seek_touched > 0.5:
+            self.playback_slider.set(elapsed_ms)
+        suffix = " (fim)" if playback.finished else ""
+        self.playback_position_label.configure(
+            text=f"{elapsed_ms / 1000.0:.1f} / {playback.duration_ms / 1000.0:.1f} s{suffix}"
+        )
+
+    def on_filter_changed(self) -> None:
+        """Aplica o estado do interruptor e o tipo de filtro ao gráfico e à exportação."""
+        label = self.filter_menu.get()
+        self.filter_switch.configure(text=f"Filtro ({label})")
+        kind = self._filter_kinds[label] if self.filter_switch.get() else None
+        self.controller.active_filter = kind
+        if self.is_paused:
+            # O instantâneo mantém a série filtrada original; aplica-se ao retomar.
+            return
+        self.plotter.set_filter(kind)
+        if self.is_graph_visible:
+            self.canvas.draw()
+
+    def on_trigger_changed(self) -> None:
+        """Aplica os parâmetros do gatilho e arma-o ou desarma-o conforme o interruptor."""
+        try:
+            level = float(self.trigger_level_entry.get())
+        except ValueError:
+            level = None
+        trigger_recorder.configure(channel=self.trigger_channel_menu.get(),
+                                   mode=self._trigger_modes[self.trigger_mode_menu.get()],
+                                   level=level)
+
+        if self.trigger_switch.get():
+            trigger_recorder.arm()
+        elif trigger_recorder.active:
+            trigger_recorder.disarm()
+        self._trigger_state = trigger_recorder.state
+        self.update_rec_buttons()
+
+    def on_capture_changed(self) -> None:
+        if self.capture_switch.get():
+            udp_server.start_capture()
+        else:
+            udp_server.stop_capture()
 
     def toggle_recording(self) -> None:
         if database.is_experiment_running():
@@ -202,6 +495,13 @@ class LiveDashboardFrame(ctk.CTkFrame):
             self.btn_rec.configure(text="Iniciar Gravação", fg_color="#5CB85C", hover_color="#4CAE4C")
             self.status_label.configure(text="Status: PARADO", text_color="gray")
 
+        if trigger_recorder.state == 'recording':
+            self.status_label.configure(text="Status: GRAVANDO (GATILHO)")
+        elif trigger_recorder.state == 'armed' and not database.is_experiment_running():
+            self.status_label.configure(text="Status: ARMADO", text_color="#F0AD4E")
+        elif trigger_recorder.state == 'idle' and self.trigger_switch.get():
+            self.trigger_switch.deselect()
+
     def save_graph(self) -> None:
         try:
             os.makedirs("images", exist_ok=True)
@@ -220,7 +520,10 @@ class LiveDashboardFrame(ctk.CTkFrame):
 
             self.label_last_x.configure(text=f"Tempo (s): {stats.get('last_x', '--')}")
 
-            if 'last_y1' in stats:
+            if 'peak_tensao' in stats:
+                self.label_last_y.configure(text=f"Pico Tensão: {stats.get('peak_tensao', '--')} Hz")
+                self.label_avg_y.configure(text=f"Pico ADC: {stats.get('peak_adc', '--')} Hz")
+            elif 'last_y1' in stats:
                 self.label_last_y.configure(text=f"Controle: {stats.get('last_y1', '--')} %")
                 self.label_avg_y.configure(text=f"Tensão: {stats.get('last_y2', '--')} mV")
             elif self.plotter.current_graph == 'erro_observador':
@@ -242,13 +545,22 @@ class LiveDashboardFrame(ctk.CTkFrame):
         except ValueError:
             pass
 
-    def select_graph(self, graph_key: str) -> None:
+    def _show_canvas(self) -> None:
         if not self.is_graph_visible:
             self.initial_message_label.grid_forget()
             self.canvas_widget.grid(row=1, column=0, sticky="nsew")
             self.is_graph_visible = True
-            
+
+    def select_graph(self, graph_key: str) -> None:
+        self._show_canvas()
         self.plotter.select_graph(graph_key)
+        self.layout_menu.set("Vista Múltipla")
+        self.canvas.draw()
+
+    def select_layout(self, layout_name: str) -> None:
+        """Mostra as famílias da vista múltipla escolhida numa única figura."""
+        self._show_canvas()
+        self.plotter.select_layout(settings.DASHBOARD_LAYOUTS[layout_name])
         self.canvas.draw()
 
     def validate_numeric_input(self, value_if_allowed: str) -> bool:
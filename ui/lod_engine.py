@@ -0,0 +1,118 @@
+"""
+Motor de Nível de Detalhe (LOD) para o Visualizador de Histórico.
+
+Evita a renderização integral de sessões com milhões de amostras. Cada pedido
+de vista (zoom/pan) é resolvido apenas para o intervalo visível de
+timestamp_amostra_ms, na resolução exigida pela largura do ecrã:
+- Intervalos com poucas amostras são servidos em bruto (leitura colunar indexada);
+- Intervalos densos são servidos como envelope min/max, lido da pirâmide de
+  decimação pré-calculada quando existe, ou agregado em SQL caso contrário.
+"""
+
+import numpy as np
+from typing import Dict, List, Optional, Sequence
+
+import core.database as database
+import core.decimation as decimation
+
+
+class LevelOfDetailEngine:
+    """
+    Fonte de dados decimados por janela temporal para uma única sessão.
+    """
+
+    def __init__(self, exp_id: int, channels: Sequence[str], raw_points_per_pixel: float = 2.0):
+        """
+        Args:
+            exp_id (int): Identificador da sessão persistida.
+            channels (Sequence[str]): Colunas de telemetria a servir.
+            raw_points_per_pixel (float): Densidade máxima servida em bruto antes
+                de se recorrer ao envelope min/max.
+        """
+        self.exp_id = exp_id
+        self.channels: List[str] = list(channels)
+        self.raw_points_per_pixel = raw_points_per_pixel
+
+        bounds = database.get_experiment_time_bounds(exp_id)
+        if bounds is None:
+            self.t_start_ms, self.t_end_ms, self.total_samples = 0, 0, 0
+        else:
+            self.t_start_ms, self.t_end_ms, self.total_samples = bounds
+
+        self.has_pyramid = decimation.has_pyramid(exp_id)
+        self.last_mode: Optional[str] = None
+
+    @property
+    def is_empty(self) -> bool:
+        return self.total_samples == 0
+
+    def fetch(self, t_min_s: float, t_max_s: float, pixel_width: int) -> Dict[str, np.ndarray]:
+        """
+        Resolve a janela visível (em segundos relativos ao início da sessão).
+
+        Returns:
+            Dict[str, np.ndarray]: 't' (segundos relativos) e um vetor por canal,
+            prontos a injetar em Line2D.set_data().
+        """
+        if self.is_empty:
+            return self._empty()
+
+        pixel_width = max(1, int(pixel_width))
+        t_min_ms = max(self.t_start_ms, self.t_start_ms + int(np.floor(t_min_s * 1000.0)))
+        t_max_ms = min(self.t_end_ms, self.t_start_ms + int(np.ceil(t_max_s * 1000.0)))
+        if t_max_ms < t_min_ms:
+            return self._empty()
+
+        raw_budget = int(pixel_width * self.raw_points_per_pixel)
+        if self.has_pyramid:
+            in_range = decimation.count_samples_in_range(self.exp_id, t_min_ms, t_max_ms)
+        else:
+            in_range = database.count_telemetry_in_range(self.exp_id, t_min_ms, t_max_ms)
+
+        if in_range <= raw_budget:
+            self.last_mode = "raw"
+            return self._fetch_raw(t_min_ms, t_max_ms)
+
+        return self._fetch_envelope(t_min_ms, t_max_ms, pixel_width, in_range)
+
+    def fetch_overview(self, pixel_width: int) -> Dict[str, np.ndarray]:
+        """Vista de conjunto decimada da sessão completa."""
+        return self.fetch(0.0, (self.t_end_ms - self.t_start_ms) / 1000.0, pixel_width)
+
+    def _fetch_raw(self, t_min_ms: int, t_max_ms: int) -> Dict[str, np.ndarray]:
+        columns = database.get_telemetry_columns(self.exp_id, self.channels, t_min_ms, t_max_ms)
+        result = {'t': (columns['timestamp_amostra_ms'] - self.t_start_ms) / 1000.0}
+        for channel in self.channels:
+            result[channel] = columns[channel]
+        return result
+
+    def _fetch_envelope(self, t_min_ms: int, t_max_ms: int, pixel_width: int, in_range: int) -> Dict[str, np.ndarray]:
+        rows = None
+        if self.has_pyramid:
+            rows = decimation.get_pyramid_envelope(self.exp_id, t_min_ms, t_max_ms, pixel_width,
+                                                   self.channels, samples_in_range=in_range)
+        if rows is not None:
+            self.last_mode = "pyramid"
+        else:
+            self.last_mode = "envelope"
+            bucket_ms = max(1, int(np.ceil((t_max_ms - t_min_ms + 1) / pixel_width)))
+            rows = database.get_telemetry_envelope(self.exp_id, t_min_ms, t_max_ms, bucket_ms, self.channels)
+        if not rows:
+            return self._empty()
+
+        matrix = np.array(rows, dtype=float)
+        # Cada balde origina dois vértices (min, max) no mesmo instante: segmento vertical.
+        t = np.repeat((matrix[:, 0] - self.t_start_ms) / 1000.0, 2)
+        result = {'t': t}
+        for i, channel in enumerate(self.channels):
+            envelope = np.empty(2 * len(matrix))
+            envelope[0::2] = matrix[:, 1 + 2 * i]
+            envelope[1::2] = matrix[:, 2 + 2 * i]
+            result[channel] = envelope
+        return result
+
+    def _empty(self) -> Dict[str, np.ndarray]:
+        result = {'t': np.empty(0)}
+        for channel in self.channels:
+            result[channel] = np.empty(0)
+        return result
@@ -6,20 +6,28 @@ Ele atua como o container principal para todas as telas (Frames) e gerencia:
 1. A inicialização da janela e configurações de tema.
 2. A navegação entre telas (Roteamento).
 3. O ciclo de vida da aplicação (Inicialização e Encerramento Seguro).
+
+As telas são importadas e construídas na primeira navegação: a janela
+inicial aparece sem carregar o matplotlib, que só é importado com o painel
+em tempo real ou o visualizador.
 """
 
 import customtkinter as ctk
+import importlib
 import sys
-from typing import Dict, Type
+from typing import Dict, Optional, Tuple, Type
 
 # Módulos internos
 from core import db_writer
+from core import udp_server
 from config import settings
 
-# Importação das telas (Frames)
-from ui.frames.live_dashboard_frame import LiveDashboardFrame 
-from ui.frames.home_screen_frame import HomeScreenFrame
-from ui.frames.experiment_viewer_frame import ExperimentViewerFrame
+# Registo das telas: chave -> (módulo, classe). Adicione novas telas aqui se o projeto crescer.
+FRAME_REGISTRY: Dict[str, Tuple[str, str]] = {
+    "Home": ("ui.frames.home_screen_frame", "HomeScreenFrame"),
+    "Live": ("ui.frames.live_dashboard_frame", "LiveDashboardFrame"),
+    "Experiments": ("ui.frames.experiment_viewer_frame", "ExperimentViewerFrame"),
+}
 
 class MainApplication(ctk.CTk):
     """
@@ -29,7 +37,7 @@ class MainApplication(ctk.CTk):
 
     def __init__(self, *args, **kwargs):
         """
-        Inicializa a janela principal, configura o tema e instancia todas as telas.
+        Inicializa a janela principal, configura o tema e exibe a tela inicial.
         """
 
         super().__init__(*args, **kwargs)
@@ -41,23 +49,17 @@ class MainApplication(ctk.CTk):
         self.geometry(settings.DEFAULT_WINDOW_SIZE)
 
         # Container principal que empilha todas as telas (Frames)
-        container = ctk.CTkFrame(self)
-        container.pack(side="top", fill="both", expand=True)
-        container.grid_rowconfigure(0, weight=1)
-        container.grid_columnconfigure(0, weight=1)
+        self.container = ctk.CTkFrame(self)
+        self.container.pack(side="top", fill="both", expand=True)
+        self.container.grid_rowconfigure(0, weight=1)
+        self.container.grid_columnconfigure(0, weight=1)
+
+        # Filtro da tensão ativo no painel em tempo real (core.derived_signals),
+        # incluído como coluna 'tensao_filtrada_mv' nas exportações do visualizador.
+        self.active_filter: Optional[str] = None
 
-        # Dicionário para armazenar as instâncias das telas
+        # Instâncias das telas já construídas (ver get_frame)
         self.frames = {}
-        
-        # Loop para instanciar e registrar todas as telas disponíveis
-        # (Adicione novas telas nesta tupla se o projeto crescer)
-        for F, key in ( (HomeScreenFrame, "Home"), 
-                        (LiveDashboardFrame, "Live"), 
-                        (ExperimentViewerFrame, "Experiments")):
-            frame = F(container, self)
-            self.frames[key] = frame
-            # Coloca todos os frames na mesma célula do grid (empilhados)
-            frame.grid(row=0, column=0, sticky="nsew")
 
         # Inicia exibindo a tela Home
         self.show_frame("Home")
@@ -65,6 +67,31 @@ class MainApplication(ctk.CTk):
         # Intercepta o evento de fechar a janela (X) para garantir shutdown seguro
         self.protocol("WM_DELETE_WINDOW", self.on_closing)
 
+    def get_frame(self, page_key: str) -> ctk.CTkFrame:
+        """
+        Devolve a tela pedida, importando o seu módulo e construindo-a na primeira utilização.
+
+        Args:
+            page_key (str): A chave identificadora da tela (ver FRAME_REGISTRY).
+        """
+        frame = self.frames.get(page_key)
+        if frame is not None:
+            return frame
+
+        # Cursor de espera durante a importação (matplotlib) e construção da tela.
+        self.configure(cursor="watch")
+        self.update_idletasks()
+        try:
+            module_name, class_name = FRAME_REGISTRY[page_key]
+            frame_class = getattr(importlib.import_module(module_name), class_name)
+            frame = frame_class(self.container, self)
+            self.frames[page_key] = frame
+            # Coloca todos os frames na mesma célula do grid (empilhados)
+            frame.grid(row=0, column=0, sticky="nsew")
+        finally:
+            self.configure(cursor="")
+        return frame
+
     def show_frame(self, page_key: str) -> None:
         """
         Eleva a tela solicitada para o topo da pilha de visualização.
@@ -77,16 +104,16 @@ class MainApplication(ctk.CTk):
         """
 
         # Otimização: Se sair da tela Live, para a animação
-        if page_key != "Live":
+        if page_key != "Live" and "Live" in self.frames:
             self.frames["Live"].stop_loops()
 
-        # Traz o frame desejado para frente
-        frame = self.frames[page_key]
+        # Traz o frame desejado para frente (construindo-o na primeira visita)
+        frame = self.get_frame(page_key)
         frame.tkraise()
 
         # Se entrar na tela Live, inicia a animação
         if page_key == "Live":
-            self.frames["Live"].start_loops()
+            frame.start_loops()
 
     def on_closing(self) -> None:
         """
@@ -101,7 +128,8 @@ class MainApplication(ctk.CTk):
 
         # 1. Tenta parar os loops da interface (Gráficos)
         try:
-            self.frames["Live"].on_closing()
+            if "Live" in self.frames:
+                self.frames["Live"].on_closing()
         except Exception as e:
             print(f"Erro ao fechar frame: {e}")
 
@@ -111,6 +139,12 @@ class MainApplication(ctk.CTk):
         except Exception as e:
             print(f"Erro ao parar DB Writer: {e}")
 
+        # Fecha a captura em bruto (se ativa), descarregando o buffer do ficheiro.
+        try:
+            udp_server.stop_capture()
+        except Exception as e:
+            print(f"Erro ao encerrar captura: {e}")
+
         # 3. Aguarda um curto período para processamento pendente e força saída
         print("Aguardando 200ms para tarefas do Tkinter finalizarem...")
         self.after(200, self.perform_shutdown)
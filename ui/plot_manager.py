@@ -10,9 +10,18 @@ import matplotlib.pyplot as plt
 from matplotlib.figure import Figure
 from matplotlib.axes import Axes
 import numpy as np
-from typing import Dict, Optional, Any, Tuple
+import time
+from typing import Dict, List, Optional, Any, Sequence, Tuple
 
 import config.settings as settings
+import core.derived_signals as derived_signals
+import core.profiling as profiling
+from core.metrics import registry
+from core.spectrum import WelchPSD
+
+
+# Duração dos quadros de animação (ms); a contagem dá os FPS efetivos.
+_frame_ms = registry.histogram('ui_frame_ms', "Duração do quadro de animação (ms)")
 
 
 def apply_style_from_settings() -> None:
@@ -65,6 +74,48 @@ class RingBuffer:
         self.data = np.empty(capacity, dtype=dtype)
         self.index = 0
         self.is_full = False
+        # Conteúdo congelado por pin(): (vetor, índice, cheio).
+        self._pinned: Optional[Tuple[np.ndarray, int, bool]] = None
+
+    @staticmethod
+    def _chronological(data: np.ndarray, index: int, is_full: bool) -> np.ndarray:
+        if not is_full:
+            return data[:index]
+        return np.concatenate((data[index:], data[:index]))
+
+    def pin(self) -> None:
+        """
+        Congela o conteúdo atual sem o copiar (copy-on-write ao nível do vetor).
+
+        O vetor existente passa a pertencer ao instantâneo e as escritas
+        seguintes vão para um vetor novo; get_pinned() devolve o instantâneo.
+        """
+        if self._pinned is not None:
+            return
+        self._pinned = (self.data, self.index, self.is_full)
+        self.data = np.empty(self.capacity, dtype=self.data.dtype)
+        self.index = 0
+        self.is_full = False
+
+    def get_pinned(self) -> np.ndarray:
+        """Instantâneo congelado em ordem cronológica (ou os dados atuais, se não houver)."""
+        if self._pinned is None:
+            return self.get_data()
+        return self._chronological(*self._pinned)
+
+    def unpin(self) -> None:
+        """Liberta o instantâneo, completando o histórico vivo com a sua parte mais recente."""
+        if self._pinned is None:
+            return
+        old = self._chronological(*self._pinned)
+        self._pinned = None
+        size = self.capacity if self.is_full else self.index
+        keep = min(len(old), self.capacity - size)
+        if keep:
+            merged = np.concatenate((old[len(old) - keep:], self.data[:size]))
+            self.data[:len(merged)] = merged
+            self.index = len(merged) % self.capacity
+            self.is_full = len(merged) == self.capacity
 
     def append(self, value: float) -> None:
         self.data[self.index] = value
@@ -73,10 +124,42 @@ class RingBuffer:
             self.index = 0
             self.is_full = True
 
+    def extend(self, values: np.ndarray) -> None:
+        """Acrescenta um bloco de valores com no máximo duas cópias contíguas."""
+        n = len(values)
+        if n == 0:
+            return
+        if n >= self.capacity:
+            self.data[:] = values[n - self.capacity:]
+            self.index = 0
+            self.is_full = True
+            return
+
+        end = self.index + n
+        if end <= self.capacity:
+            self.data[self.index:end] = values
+        else:
+            split = self.capacity - self.index
+            self.data[self.index:] = values[:split]
+            self.data[:n - split] = values[split:]
+        if end >= self.capacity:
+            self.is_full = True
+        self.index = end % self.capacity
+
+    def clear(self) -> None:
+        self.index = 0
+        self.is_full = False
+
+    def get_recent(self, n: int) -> np.ndarray:
+        """Últimas n amostras em ordem cronológica (vista sem cópia quando contíguas)."""
+        size = self.capacity if self.is_full else self.index
+        n = min(n, size)
+        if n <= self.index:
+            return self.data[self.index - n:self.index]
+        return np.concatenate((self.data[self.capacity - (n - self.index):], self.data[:self.index]))
+
     def get_data(self) -> np.ndarray:
-        if not self.is_full:
-            return self.data[:self.index]
-        return np.concatenate((self.data[self.index:], self.data[:self.index]))
+        return self._chronological(self.data, self.index, self.is_full)
 
     def get_last(self) -> float:
         if self.index == 0 and not self.is_full:
@@ -90,9 +173,56 @@ class RingBuffer:
         return np.mean(arr[-window:]) if len(arr) >= window else np.mean(arr)
 
 
+def decimate_min_max(x: np.ndarray, y: np.ndarray, n_buckets: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reduz uma série a um par (mínimo, máximo) por balde, preservando a ordem temporal.
+
+    Com um balde por píxel, a linha desenhada é visualmente idêntica à
+    original; os baldes são alinhados ao fim da série (amostras mais recentes)
+    e o resto inicial é mantido sem decimação. Baldes só com NaN mantêm a lacuna.
+    """
+    n = len(y)
+    bucket = n // max(n_buckets, 1)
+    if bucket < 3:
+        return x, y
+
+    start = n - n_buckets * bucket
+    yb = y[start:].reshape(n_buckets, bucket)
+    xb = x[start:].reshape(n_buckets, bucket)
+    invalid = np.isnan(yb)
+    i_min = np.argmin(np.where(invalid, np.inf, yb), axis=1)
+    i_max = np.argmax(np.where(invalid, -np.inf, yb), axis=1)
+    first, second = np.minimum(i_min, i_max), np.maximum(i_min, i_max)
+
+    rows = np.arange(n_buckets)
+    x_out = np.concatenate((x[:start], np.column_stack((xb[rows, first], xb[rows, second])).ravel()))
+    y_out = np.concatenate((y[:start], np.column_stack((yb[rows, first], yb[rows, second])).ravel()))
+    return x_out, y_out
+
+
+class _Panel:
+    """
+    Família de gráficos instalada numa célula da grelha do painel.
+    """
+
+    def __init__(self, key: str, axes: List[Axes], lines: Dict[str, Any],
+                 interval_sec: float, time_based: bool):
+        self.key = key
+        self.axes = axes
+        self.lines = lines
+        self.interval_sec = interval_sec
+        self.time_based = time_based
+        self.last_update: float = 0.0
+
+
 class GraphManager:
     """
     Controlador de Estado e Geometria para gráficos acelerados.
+
+    Os gráficos são organizados em painéis (uma família por célula de uma
+    grelha configurável). Todas as famílias temporais partilham o mesmo
+    buffer de tempo e o mesmo eixo X; cada painel tem a sua cadência de
+    atualização e todos os artistas são devolvidos numa única passagem de blit.
     """
 
     def __init__(self, fig: Figure, ax: Axes, max_points: int = 2000):
@@ -104,16 +234,20 @@ class GraphManager:
         self.ax2: Optional[Axes] = None
         self.max_points = max_points
 
+        # Eixo de tempo (s) comum a todas as famílias temporais.
+        self.time_buffer = RingBuffer(max_points)
+
         self.plot_data = {
             'controle_tensao': {
-                'x': RingBuffer(max_points),
+                'x': self.time_buffer,
                 'y1': RingBuffer(max_points),
                 'y2': RingBuffer(max_points),
                 'y_est': RingBuffer(max_points),
+                'y_filt': RingBuffer(max_points),
                 'label': 'Controle e Tensão'
             },
             'valor_adc': {
-                'x': RingBuffer(max_points),
+                'x': self.time_buffer,
                 'y': RingBuffer(max_points),
                 'label': 'Valor Discreto ADC'
             },
@@ -123,90 +257,296 @@ class GraphManager:
                 'label': 'Tempo de Ciclo (ms)'
             },
             'erro_observador': {
-                'x': RingBuffer(max_points),
+                'x': self.time_buffer,
                 'y': RingBuffer(max_points),
                 'label': 'Erro do Observador (mV)'
             },
             'estados_sistema': {
-                'x': RingBuffer(max_points),
+                'x': self.time_buffer,
                 'y1': RingBuffer(max_points),
                 'y2': RingBuffer(max_points),
                 'y3': RingBuffer(max_points),
                 'label': 'Estados do Sistema'
             },
+            # Sem buffers próprios: analisa as janelas recentes de tensão e ADC.
+            'espectro': {
+                'label': 'Densidade Espetral de Potência (Welch)'
+            },
         }
 
+        # Estimadores de Welch pré-alocados do painel espetral.
+        self._spectrum_window = min(settings.SPECTRUM_WINDOW_SAMPLES, max_points)
+        self._psd_tensao = WelchPSD(settings.SPECTRUM_NPERSEG, max_samples=self._spectrum_window)
+        self._psd_adc = WelchPSD(settings.SPECTRUM_NPERSEG, max_samples=self._spectrum_window)
+        self.spectrum_peaks: Dict[str, float] = {}
+
+        self.panels: List[_Panel] = []
+        self.layout: Tuple[str, ...] = ()
+
+        # Vista pausada: instantâneo dos buffers (pin) explorável com pan/zoom.
+        self.frozen: bool = False
         self.current_graph: Optional[str] = None
         self.last_sample_time: Optional[int] = None
         self.sample_index: int = 0
         self.start_time_ms: Optional[int] = None
 
+        # Tempo de preparação de cada quadro (ms) face a settings.FRAME_BUDGET_MS.
+        self.frame_stats: Dict[str, float] = {'frames': 0, 'last_ms': 0.0, 'max_ms': 0.0, 'over_budget': 0}
+
+        # Filtro causal da tensão (core.derived_signals), alimentado por blocos.
+        self.signal_filter: Optional[derived_signals.DerivedSignal] = None
+        self.filter_kind: Optional[str] = None
+        self._filter_values: list = []
+        self._filter_times: list = []
+
         self.line1, = self.ax.plot([], [], marker='o', markersize=2, linestyle='-', animated=True)
-        self.line2 = None
-        self.line_est = None
-        self.line_est1 = None
-        self.line_est2 = None
-        self.line_est3 = None
 
     def select_graph(self, graph_key: str) -> None:
         """
-        Reestrutura a matriz dimensional e reinstancia as primitivas gráficas.
+        Mostra uma única família de gráficos (grelha 1x1).
+        """
+        self.select_layout((graph_key,))
+
+    def select_layout(self, graph_keys: Sequence[str], n_cols: Optional[int] = None) -> None:
+        """
+        Reestrutura a figura numa grelha de painéis e reinstancia as primitivas gráficas.
+
+        Args:
+            graph_keys (Sequence[str]): Famílias a mostrar, por ordem de leitura.
+            n_cols (Optional[int]): Colunas da grelha (por omissão, settings.DASHBOARD_GRID_COLUMNS
+                a partir de três painéis).
         """
-        if self.current_graph == graph_key:
+        graph_keys = tuple(graph_keys)
+        if graph_keys == self.layout:
             return
 
-        self.current_graph = graph_key
+        if n_cols is None:
+            n_cols = 1 if len(graph_keys) <= 2 else settings.DASHBOARD_GRID_COLUMNS
+        n_rows = -(-len(graph_keys) // n_cols)
+
         self.fig.clear()
-        self.ax2 = None
+        grid = self.fig.add_gridspec(n_rows, n_cols)
+        self.panels = []
+        shared_time_ax: Optional[Axes] = None
+
+        for i, key in enumerate(graph_keys):
+            panel = self._build_panel(key, grid[i // n_cols, i % n_cols], shared_time_ax)
+            if panel.time_based and shared_time_ax is None:
+                shared_time_ax = panel.axes[0]
+            self.panels.append(panel)
+
+        self.layout = graph_keys
+        self.current_graph = graph_keys[0]
+        self.ax = self.panels[0].axes[0]
+        self.ax2 = self.panels[0].axes[1] if len(self.panels[0].axes) > 1 else None
+        self.fig.tight_layout()
+        if self.frozen:
+            self._render_snapshot()
 
+    def clear_data(self, start_time_ms: Optional[int] = None) -> None:
+        """
+        Esvazia todos os buffers (p.ex. ao iniciar ou saltar numa reprodução).
+
+        Args:
+            start_time_ms (Optional[int]): Origem do eixo de tempo; por omissão, a primeira amostra seguinte.
+        """
+        for buffer in self._ring_buffers():
+            buffer.clear()
+        self.start_time_ms = start_time_ms
+        self.last_sample_time = None
+        self.sample_index = 0
+        self._filter_values.clear()
+        self._filter_times.clear()
+        if self.signal_filter is not None:
+            self.signal_filter.reset()
+
+    def _ring_buffers(self) -> List[RingBuffer]:
+        """Todos os buffers circulares distintos (o de tempo é partilhado)."""
+        unique = {}
+        for family in self.plot_data.values():
+            for value in family.values():
+                if isinstance(value, RingBuffer):
+                    unique[id(value)] = value
+        return list(unique.values())
+
+    def freeze(self) -> None:
+        """
+        Congela a vista: fixa (pin) o histórico recente de todos os buffers sem
+        cópia e desenha-o à resolução integral como linhas estáticas, para
+        navegação com pan/zoom. A ingestão continua nos buffers vivos.
+        """
+        if self.frozen:
+            return
+        self._flush_filter()
+        for buffer in self._ring_buffers():
+            buffer.pin()
+        self.frozen = True
+        self._render_snapshot()
+
+    def _render_snapshot(self) -> None:
+        """Injeta o instantâneo nas linhas, que passam a ser desenhadas pelo draw() normal."""
+        time_axis = self.time_buffer.get_pinned()
+        for panel in self.panels:
+            for line in panel.lines.values():
+                line.set_animated(False)
+            if panel.key == 'espectro':
+                continue
+
+            data = self.plot_data[panel.key]
+            x_data = data['x'].get_pinned() if panel.key == 'ciclo' else time_axis
+            for name, line in panel.lines.items():
+                y = data[name].get_pinned()
+                if len(y) == len(x_data):
+                    line.set_data(x_data, y)
+            if len(x_data) > 1:
+                panel.axes[0].set_xlim(x_data[0], x_data[-1])
+
+    def resume(self) -> None:
+        """
+        Liberta o instantâneo e reconstrói a grelha com os limites por omissão (vista ao vivo).
+
+        Cada buffer funde o instantâneo com o histórico vivo por si, mas durante
+        a pausa a série filtrada fica atrasada face às restantes (bloco ainda por
+        filtrar) ou pode ter sido refeita por set_filter; por isso o filtro é
+        recalculado sobre a janela fundida, realinhando-a com o eixo de tempo.
+        """
+        if not self.frozen:
+            return
+        for buffer in self._ring_buffers():
+            buffer.unpin()
+        if self.signal_filter is not None:
+            self._refilter_history()
+        self.frozen = False
+        layout, self.layout = self.layout, ()
+        if layout:
+            self.select_layout(layout)
+
+    def _build_panel(self, graph_key: str, spec: Any, shared_time_ax: Optional[Axes]) -> _Panel:
+        """Cria os eixos e as linhas animadas de uma família numa célula da grelha."""
         data = self.plot_data[graph_key]
+        interval = settings.DASHBOARD_PANEL_INTERVAL_SEC.get(graph_key, 0.0)
 
         if graph_key == 'controle_tensao':
-            self.ax = self.fig.add_subplot(2, 1, 1)
-            self.ax2 = self.fig.add_subplot(2, 1, 2, sharex=self.ax)
-
-            self.ax.set_title(data['label'])
-            self.ax.set_ylabel('Sinal (%)', color='tab:blue')
-            self.line1, = self.ax.plot([], [], color='tab:blue', linestyle='-', animated=True, label='Sinal de Controle (%)')
-            self.ax.set_ylim(0, 100)
-            self.ax.legend(loc='upper left')
-
-            self.ax2.set_xlabel("Tempo (s)")
-            self.ax2.set_ylabel('Tensão (mV)', color='tab:red')
-            self.line2, = self.ax2.plot([], [], color='tab:red', linestyle='-', animated=True, alpha=0.6, label='Tensão Real')
-            self.line_est, = self.ax2.plot([], [], color='tab:orange', linestyle='--', animated=True, label='Tensão Estimada')
-            
-            self.ax2.set_ylim(0, 3300)
-            self.ax2.legend(loc='upper left')
-
-        elif graph_key == 'estados_sistema':
-            self.ax = self.fig.add_subplot(1, 1, 1)
-            self.ax.set_title(data['label'])
-            self.ax.set_xlabel("Tempo (s)")
-            self.ax.set_ylabel("Amplitude")
-            
-            self.line_est1, = self.ax.plot([], [], color='tab:blue', linestyle='-', animated=True, label='x1')
-            self.line_est2, = self.ax.plot([], [], color='tab:green', linestyle='-', animated=True, label='x2')
-            self.line_est3, = self.ax.plot([], [], color='tab:orange', linestyle='-', animated=True, label='x3')
-            self.ax.legend(loc='upper left')
-
-        elif graph_key == 'erro_observador':
-            self.ax = self.fig.add_subplot(1, 1, 1)
-            self.line1, = self.ax.plot([], [], color='tab:purple', linestyle='-', animated=True)
-            self.ax.set_title(data['label'])
-            self.ax.set_xlabel("Tempo (s)")
-            self.ax.axhline(0, color='gray', linestyle='--', alpha=0.5)
-
+            cell = spec.subgridspec(2, 1)
+            ax = self.fig.add_subplot(cell[0], sharex=shared_time_ax)
+            ax2 = self.fig.add_subplot(cell[1], sharex=ax)
+
+            ax.set_title(data['label'])
+            ax.set_ylabel('Sinal (%)', color='tab:blue')
+            line_ctrl, = ax.plot([], [], color='tab:blue', linestyle='-', animated=True, label='Sinal de Controle (%)')
+            ax.set_ylim(0, 100)
+            ax.legend(loc='upper left')
+
+            ax2.set_xlabel("Tempo (s)")
+            ax2.set_ylabel('Tensão (mV)', color='tab:red')
+            line_tensao, = ax2.plot([], [], color='tab:red', linestyle='-', animated=True, alpha=0.6, label='Tensão Real')
+            line_est, = ax2.plot([], [], color='tab:orange', linestyle='--', animated=True, label='Tensão Estimada')
+            line_filt, = ax2.plot([], [], color='tab:green', linestyle='-', animated=True, label='Tensão Filtrada')
+            line_filt.set_visible(self.signal_filter is not None)
+            ax2.set_ylim(0, 3300)
+            self._voltage_legend(ax2)
+
+            lines = {'y1': line_ctrl, 'y2': line_tensao, 'y_est': line_est, 'y_filt': line_filt}
+            return _Panel(graph_key, [ax, ax2], lines, interval, time_based=True)
+
+        if graph_key == 'espectro':
+            cell = spec.subgridspec(2, 1)
+            ax = self.fig.add_subplot(cell[0])
+            ax2 = self.fig.add_subplot(cell[1], sharex=ax)
+
+            ax.set_title(data['label'])
+            ax.set_ylabel('Tensão (mV²/Hz)', color='tab:red')
+            ax.set_yscale('log')
+            line_tensao, = ax.plot([], [], color='tab:red', linestyle='-', animated=True)
+
+            ax2.set_xlabel("Frequência (Hz)")
+            ax2.set_ylabel('ADC (LSB²/Hz)', color='tab:blue')
+            ax2.set_yscale('log')
+            line_adc, = ax2.plot([], [], color='tab:blue', linestyle='-', animated=True)
+
+            interval = settings.DASHBOARD_PANEL_INTERVAL_SEC.get(graph_key, settings.SPECTRUM_UPDATE_INTERVAL_SEC)
+            return _Panel(graph_key, [ax, ax2], {'tensao_mv': line_tensao, 'valor_adc': line_adc},
+                          interval, time_based=False)
+
+        time_based = graph_key != 'ciclo'
+        ax = self.fig.add_subplot(spec, sharex=shared_time_ax if time_based else None)
+        ax.set_title(data['label'])
+        ax.set_xlabel("Tempo (s)" if time_based else "Amostra N")
+
+        if graph_key == 'estados_sistema':
+            ax.set_ylabel("Amplitude")
+            lines = {}
+            for name, label, color in (('y1', 'x1', 'tab:blue'), ('y2', 'x2', 'tab:green'), ('y3', 'x3', 'tab:orange')):
+                lines[name], = ax.plot([], [], color=color, linestyle='-', animated=True, label=label)
+            ax.legend(loc='upper left')
+            return _Panel(graph_key, [ax], lines, interval, time_based)
+
+        if graph_key == 'erro_observador':
+            line, = ax.plot([], [], color='tab:purple', linestyle='-', animated=True)
+            ax.axhline(0, color='gray', linestyle='--', alpha=0.5)
         else:
-            self.ax = self.fig.add_subplot(1, 1, 1)
-            self.line1, = self.ax.plot([], [], linestyle='-', animated=True)
-            self.ax.set_title(data['label'])
-            self.ax.set_xlabel("Tempo (s)" if graph_key == 'valor_adc' else "Amostra N")
-            
+            line, = ax.plot([], [], linestyle='-', animated=True)
             if graph_key == 'valor_adc':
-                self.ax.set_ylim(0, 4095)
+                ax.set_ylim(0, 4095)
+        return _Panel(graph_key, [ax], {'y': line}, interval, time_based)
 
-        self.fig.tight_layout()
+    @staticmethod
+    def _voltage_legend(ax: Axes) -> None:
+        """Legenda do eixo de tensão só com as curvas visíveis (a filtrada depende do filtro)."""
+        ax.legend(handles=[line for line in ax.get_lines() if line.get_visible()], loc='upper left')
+
+    def _panel(self, graph_key: str) -> Optional[_Panel]:
+        for panel in self.panels:
+            if panel.key == graph_key:
+                return panel
+        return None
+
+    def set_filter(self, kind: Optional[str]) -> None:
+        """
+        Ativa (kind de derived_signals.SIGNAL_KINDS) ou desativa (None) o filtro da tensão.
+
+        Ao ativar, o filtro é aquecido em lote sobre o histórico já presente no
+        buffer, ficando a série filtrada alinhada com as restantes; a partir daí
+        é atualizado incrementalmente a cada bloco recebido.
+        """
+        self._filter_values.clear()
+        self._filter_times.clear()
+        self.plot_data['controle_tensao']['y_filt'].clear()
+        self.filter_kind = kind
+
+        if kind is None:
+            self.signal_filter = None
+        else:
+            self.signal_filter = derived_signals.create_signal(kind)
+            self._refilter_history()
+
+        panel = self._panel('controle_tensao')
+        if panel is not None:
+            panel.lines['y_filt'].set_visible(kind is not None)
+            self._voltage_legend(panel.axes[1])
+
+    def _refilter_history(self) -> None:
+        """Filtra em lote, desde o estado inicial, todo o histórico de tensão presente no buffer."""
+        buffers = self.plot_data['controle_tensao']
+        buffers['y_filt'].clear()
+        self._filter_values.clear()
+        self._filter_times.clear()
+        self.signal_filter.reset()
+        history = buffers['y2'].get_data()
+        if len(history):
+            times_ms = buffers['x'].get_data() * 1000.0
+            buffers['y_filt'].extend(self.signal_filter.process(history, times_ms))
+
+    def _flush_filter(self) -> None:
+        """Filtra, num único bloco vetorizado, as amostras acumuladas desde o último quadro."""
+        if self.signal_filter is None or not self._filter_values:
+            return
+        filtered = self.signal_filter.process(
+            np.array(self._filter_values, dtype=float), np.array(self._filter_times, dtype=float)
+        )
+        self.plot_data['controle_tensao']['y_filt'].extend(filtered)
+        self._filter_values.clear()
+        self._filter_times.clear()
 
     def append_plot_data(self, data: Dict[str, Any]) -> None:
         """
@@ -219,20 +559,22 @@ class GraphManager:
         if self.start_time_ms is None:
             self.start_time_ms = timestamp_amostra
 
-        current_time_sec = (timestamp_amostra - self.start_time_ms) / 1000.0
+        self.time_buffer.append((timestamp_amostra - self.start_time_ms) / 1000.0)
 
-        self.plot_data['controle_tensao']['x'].append(current_time_sec)
         self.plot_data['controle_tensao']['y1'].append(data.get('sinal_controle', 0.0))
         self.plot_data['controle_tensao']['y2'].append(data.get('tensao_mv', 0.0))
         self.plot_data['controle_tensao']['y_est'].append(data.get('tensao_estimada_mv', np.nan))
+        if self.signal_filter is not None:
+            self._filter_values.append(data.get('tensao_mv', 0.0))
+            self._filter_times.append(timestamp_amostra)
+            # Com o gráfico pausado ou noutra vista, o bloco pendente não cresce além do buffer.
+            if len(self._filter_values) >= self.max_points:
+                self._flush_filter()
 
-        self.plot_data['erro_observador']['x'].append(current_time_sec)
         self.plot_data['erro_observador']['y'].append(data.get('erro_obs_mv', np.nan))
 
-        self.plot_data['valor_adc']['x'].append(current_time_sec)
         self.plot_data['valor_adc']['y'].append(data.get('valor_adc', 0))
 
-        self.plot_data['estados_sistema']['x'].append(current_time_sec)
         self.plot_data['estados_sistema']['y1'].append(data.get('estado_1', 0.0))
         self.plot_data['estados_sistema']['y2'].append(data.get('estado_2', 0.0))
         self.plot_data['estados_sistema']['y3'].append(data.get('estado_3', 0.0))
@@ -244,78 +586,166 @@ class GraphManager:
             
         self.last_sample_time = timestamp_amostra
 
+    @profiling.span('animation_update_callback')
     def animation_update_callback(self, frame: int) -> Tuple:
         """
         Rotina de injeção vetorial exigida pelo backend FuncAnimation.
-        Gere os redimensionamentos dinâmicos de eixo (Auto-Scaling) assegurando
-        a coerência da renderização através de chamadas draw_idle().
+
+        Atualiza os painéis cuja cadência expirou e devolve os artistas de
+        todos os painéis para uma única passagem de blit. Os limites dos eixos
+        só mudam quando os dados saem da vista (com folga), e apenas nesse caso
+        é pedido um redesenho integral (draw_idle) para os eixos e a grelha.
         """
-        if not self.current_graph:
+        if not self.panels:
             return (self.line1,)
-
-        data = self.plot_data[self.current_graph]
-        x_data = data['x'].get_data()
-
-        if len(x_data) == 0:
+        if self.frozen:
             return ()
 
-        # --- 1. Ajuste Dinâmico do Eixo X (Janela Deslizante de Tempo) ---
-        current_x_min = x_data[0]
-        current_x_max = x_data[-1]
+        start = time.perf_counter()
+        self._flush_filter()
 
-        if current_x_max == current_x_min:
-            current_x_max = current_x_min + 0.1
+        x_data = self.time_buffer.get_data()
+        needs_redraw = False
+        if len(x_data) and any(p.time_based for p in self.panels):
+            shared_ax = next(p for p in self.panels if p.time_based).axes[0]
+            needs_redraw |= self._scroll_x(shared_ax, x_data[0], x_data[-1])
 
-        self.ax.set_xlim(current_x_min, current_x_max)
-        if self.ax2:
-            self.ax2.set_xlim(current_x_min, current_x_max)
+        artists = []
+        for panel in self.panels:
+            if start - panel.last_update >= panel.interval_sec:
+                panel.last_update = start
+                needs_redraw |= self._update_panel(panel, x_data)
+            artists.extend(panel.lines.values())
 
-        # --- 2. Injeção de Primitivas e Ajuste Condicional do Eixo Y ---
-        if self.current_graph == 'controle_tensao':
-            self.line1.set_data(x_data, data['y1'].get_data())
-            self.line2.set_data(x_data, data['y2'].get_data())
-            self.line_est.set_data(x_data, data['y_est'].get_data())
-            
-            artists = [self.line1, self.line2, self.line_est]
-            
-            # Repinta a grelha e marcadores para a janela deslizante
+        # Repinta a grelha e marcadores apenas quando os limites mudaram.
+        if needs_redraw:
             self.fig.canvas.draw_idle()
-            return tuple(artists)
 
-        elif self.current_graph == 'estados_sistema':
-            y1 = data['y1'].get_data()
-            y2 = data['y2'].get_data()
-            y3 = data['y3'].get_data()
-            
-            self.line_est1.set_data(x_data, y1)
-            self.line_est2.set_data(x_data, y2)
-            self.line_est3.set_data(x_data, y3)
-            
-            # Filtra pacotes perdidos ou inválidos para calcular Limites Verticais
-            valid_y = np.concatenate([y1[~np.isnan(y1)], y2[~np.isnan(y2)], y3[~np.isnan(y3)]])
-            if len(valid_y) > 0:
-                y_min, y_max = np.min(valid_y), np.max(valid_y)
-                margin = (y_max - y_min) * 0.1 if y_max != y_min else 1.0
-                self.ax.set_ylim(y_min - margin, y_max + margin)
-
-            self.fig.canvas.draw_idle()
-            return self.line_est1, self.line_est2, self.line_est3
-
-        else:
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        stats = self.frame_stats
+        stats['frames'] += 1
+        stats['last_ms'] = elapsed_ms
+        stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+        if elapsed_ms > settings.FRAME_BUDGET_MS:
+            stats['over_budget'] += 1
+        _frame_ms.observe(elapsed_ms)
+        return tuple(artists)
+
+    def _update_panel(self, panel: _Panel, x_data: np.ndarray) -> bool:
+        """Injeta os dados de um painel; devolve True se algum limite de eixo mudou."""
+        key = panel.key
+        if key == 'espectro':
+            return self._update_spectrum(panel)
+
+        data = self.plot_data[key]
+        if key == 'ciclo':
+            x_data = data['x'].get_data()
+            if len(x_data) == 0:
+                return False
             y = data['y'].get_data()
-            self.line1.set_data(x_data, y)
-            
-            # O Valor ADC opera numa arquitetura fixa de 12-bits (0-4095).
-            # Apenas Ciclo e Erro devem flutuar.
-            if self.current_graph in ['erro_observador', 'ciclo']:
-                valid_y = y[~np.isnan(y)]
-                if len(valid_y) > 0:
-                    y_min, y_max = np.min(valid_y), np.max(valid_y)
-                    margin = (y_max - y_min) * 0.1 if y_max != y_min else 1.0
-                    self.ax.set_ylim(y_min - margin, y_max + margin)
-            
-            self.fig.canvas.draw_idle()
-            return (self.line1,)
+            panel.lines['y'].set_data(*self._decimate(panel.axes[0], x_data, y))
+            return self._scroll_x(panel.axes[0], x_data[0], x_data[-1]) | self._autoscale_y(panel.axes[0], (y,))
+
+        if len(x_data) == 0:
+            return False
+
+        if key == 'controle_tensao':
+            for name, line in panel.lines.items():
+                if name != 'y_filt' or self.signal_filter is not None:
+                    line.set_data(*self._decimate(line.axes, x_data, data[name].get_data()))
+            return False
+
+        series = [data[name].get_data() for name in panel.lines]
+        for line, y in zip(panel.lines.values(), series):
+            line.set_data(*self._decimate(panel.axes[0], x_data, y))
+
+        # O Valor ADC opera numa arquitetura fixa de 12-bits (0-4095).
+        # Apenas Ciclo, Erro e Estados devem flutuar.
+        if key == 'valor_adc':
+            return False
+        return self._autoscale_y(panel.axes[0], series)
+
+    @staticmethod
+    def _decimate(ax: Axes, x: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Envelope min/max com um balde por píxel da largura atual do eixo."""
+        return decimate_min_max(x, y, int(ax.bbox.width))
+
+    @staticmethod
+    def _scroll_x(ax: Axes, x_min: float, x_max: float) -> bool:
+        """
+        Janela deslizante por degraus: quando os dados saem da vista, os limites
+        avançam com uma folga de DASHBOARD_X_SCROLL_STEP da largura, evitando
+        redesenhar os eixos a cada quadro.
+        """
+        span = max(x_max - x_min, 0.1)
+        low, high = ax.get_xlim()
+        if x_min >= low and x_max <= high and (high - low) <= span * (1.0 + 2.0 * settings.DASHBOARD_X_SCROLL_STEP):
+            return False
+        ax.set_xlim(x_min, x_min + span * (1.0 + settings.DASHBOARD_X_SCROLL_STEP))
+        return True
+
+    @staticmethod
+    def _autoscale_y(ax: Axes, series: Sequence[np.ndarray]) -> bool:
+        """Ajusta o eixo Y (margem de 10%) só quando os dados saem da vista ou ocupam menos de metade."""
+        # Filtra pacotes perdidos ou inválidos para calcular Limites Verticais
+        valid_y = np.concatenate([y[~np.isnan(y)] for y in series])
+        if len(valid_y) == 0:
+            return False
+        y_min, y_max = np.min(valid_y), np.max(valid_y)
+        margin = (y_max - y_min) * 0.1 if y_max != y_min else 1.0
+        low, high = ax.get_ylim()
+        target_low, target_high = y_min - margin, y_max + margin
+        if y_min >= low and y_max <= high and (high - low) <= 2.0 * (target_high - target_low):
+            return False
+        ax.set_ylim(target_low, target_high)
+        return True
+
+    def _estimate_sample_rate(self, n: int) -> Optional[float]:
+        """Frequência de amostragem (Hz) pela mediana dos intervalos recentes."""
+        times = self.time_buffer.get_recent(n)
+        if len(times) < 2:
+            return None
+        dt = float(np.median(np.diff(times)))
+        return 1.0 / dt if dt > 0 else None
+
+    def _update_spectrum(self, panel: _Panel) -> bool:
+        """
+        Recalcula as PSD de tensao_mv e valor_adc sobre a janela deslizante mais
+        recente (a cadência do painel é settings.SPECTRUM_UPDATE_INTERVAL_SEC).
+        """
+        fs = self._estimate_sample_rate(self._spectrum_window)
+        if fs is None:
+            return False
+
+        ax, ax2 = panel.axes
+        sources = (
+            (self._psd_tensao, self.plot_data['controle_tensao']['y2'], ax, 'tensao_mv'),
+            (self._psd_adc, self.plot_data['valor_adc']['y'], ax2, 'valor_adc'),
+        )
+        rescale = False
+        for estimator, buffer, axis, name in sources:
+            result = estimator.compute(buffer.get_recent(self._spectrum_window), fs)
+            if result is None:
+                continue
+            freqs, psd = result
+            panel.lines[name].set_data(freqs, psd)
+            # Pico fora da componente DC, para a barra de estatísticas.
+            self.spectrum_peaks[name] = float(freqs[1 + np.argmax(psd[1:])])
+
+            positive = psd[psd > 0]
+            if len(positive):
+                low, high = positive.min() * 0.5, positive.max() * 2.0
+                y_min, y_max = axis.get_ylim()
+                # Só reescala quando a gama sai dos limites ou encolhe muito (evita redesenhos a cada quadro).
+                if low < y_min or high > y_max or high < y_max * 1e-3:
+                    axis.set_ylim(low, high)
+                    rescale = True
+
+        x_max = fs / 2.0
+        if abs(ax.get_xlim()[1] - x_max) > 0.01 * x_max:
+            ax.set_xlim(0.0, x_max)
+            rescale = True
+        return rescale
 
     def get_current_stats(self) -> Dict[str, str]:
         """
@@ -324,6 +754,15 @@ class GraphManager:
         if not self.current_graph:
             return {}
 
+        if self.current_graph == 'espectro':
+            last_x = self.plot_data['controle_tensao']['x'].get_last()
+            peaks = self.spectrum_peaks
+            return {
+                'last_x': f"{last_x:.2f}" if last_x else "--",
+                'peak_tensao': f"{peaks['tensao_mv']:.1f}" if 'tensao_mv' in peaks else "--",
+                'peak_adc': f"{peaks['valor_adc']:.1f}" if 'valor_adc' in peaks else "--"
+            }
+
         data = self.plot_data[self.current_graph]
         
         last_x = data['x'].get_last()